@@ -1,8 +1,12 @@
 import pandas as pd
 from collections import defaultdict
 from typing import List, Dict, Set
+from employee_store import EmployeeTable
+from local_search import improve
 
 class Employee:
+    __slots__ = ['id', 'grade', 'manager', 'business', 'city']
+
     def __init__(self, id: str, grade: str, manager: str, business: str, city: str):
         self.id = id
         self.grade = grade
@@ -10,81 +14,153 @@ class Employee:
         self.business = business
         self.city = city
 
-def create_groups(df: pd.DataFrame) -> List[List[str]]:
-    employees = [Employee(row['EmployeeID'], row['Grade'], row['Manager'], row['Business'], row['City']) 
-                 for _, row in df.iterrows()]
+class Group:
+    """Member ids plus the managers and businesses already in the group.
+
+    Every member shares the group's city, so compatibility is three set/equality checks
+    instead of a pass over the members. Missing values (NaN) never clash, as with the
+    `!=` comparisons they replace, so they are left out of the sets.
+    """
+    __slots__ = ['ids', 'managers', 'businesses', 'city']
+
+    def __init__(self, first: Employee):
+        self.ids = []
+        self.managers = set()
+        self.businesses = set()
+        self.city = first.city
+        self.add(first)
+
+    def add(self, emp: Employee) -> None:
+        self.ids.append(emp.id)
+        if emp.manager == emp.manager:
+            self.managers.add(emp.manager)
+        if emp.business == emp.business:
+            self.businesses.add(emp.business)
+
+    def accepts(self, emp: Employee) -> bool:
+        return (emp.city == self.city and
+                not (emp.manager == emp.manager and emp.manager in self.managers) and
+                not (emp.business == emp.business and emp.business in self.businesses))
+
+    def accepts_group(self, other: 'Group') -> bool:
+        # Every member of `other` checked against this group's members only
+        return (other.city == self.city and
+                self.managers.isdisjoint(other.managers) and self.businesses.isdisjoint(other.businesses))
+
+    def merge(self, other: 'Group') -> None:
+        self.ids.extend(other.ids)
+        self.managers |= other.managers
+        self.businesses |= other.businesses
+
+def create_groups(df: pd.DataFrame, improve_seconds: float = 0.0) -> List[List[str]]:
+    employees = EmployeeTable.from_frame(df).employees(Employee)
     
     # Sort employees by grade (C15/C16 first, then others)
     employees.sort(key=lambda e: (e.grade not in ['C15', 'C16'], e.grade))
     
-    # Create indexes for fast lookup
+    # Candidates for the leaders' first members, per city in the same order
     city_index = defaultdict(list)
     for emp in employees:
-        city_index[emp.city].append(emp)
-    
-    groups = []
+        if emp.grade <= 'C14':
+            city_index[emp.city].append(emp)
+    # Next position in each city list that may still be unused; used ones are skipped
+    # once and then jumped over (path-halving, as in union-find)
+    skip = {city: list(range(len(candidates) + 1)) for city, candidates in city_index.items()}
+
+    groups: Dict[int, Group] = {}  # in output order; dicts keep insertion order
     used = set()
 
-    def is_compatible(group: List[Employee], candidate: Employee) -> bool:
-        return all(
-            candidate.manager != emp.manager and
-            candidate.business != emp.business and
-            candidate.city == emp.city
-            for emp in group
-        )
+    def next_unused(city, pos: int) -> int:
+        candidates, jump = city_index[city], skip[city]
+        while True:
+            while jump[pos] != pos:
+                jump[pos] = jump[jump[pos]]
+                pos = jump[pos]
+            if pos == len(candidates) or candidates[pos].id not in used:
+                return pos
+            jump[pos] = pos + 1
 
-    def find_matches(leader: Employee, num_needed: int) -> List[Employee]:
-        candidates = city_index[leader.city]
+    def find_matches(group: Group, leader: Employee, num_needed: int) -> List[Employee]:
         matches = []
-        for candidate in candidates:
-            if (candidate.id not in used and 
-                candidate.id != leader.id and
-                candidate.grade <= 'C14' and
-                is_compatible([leader] + matches, candidate)):
+        if leader.city not in city_index:
+            return matches
+        candidates = city_index[leader.city]
+        pos = next_unused(leader.city, 0)
+        while pos < len(candidates):
+            candidate = candidates[pos]
+            if candidate.id != leader.id and group.accepts(candidate):
+                group.add(candidate)
                 matches.append(candidate)
                 if len(matches) == num_needed:
                     break
+            pos = next_unused(leader.city, pos + 1)
         return matches
 
     # Create initial groups
     for emp in employees:
         if emp.id not in used and emp.grade in ['C15', 'C16']:
-            group = [emp]
-            matches = find_matches(emp, 2)
-            group.extend(matches)
-            if len(group) >= 3:
-                groups.append([e.id for e in group])
-                used.update(e.id for e in group)
-
-    # Handle remaining employees
+            group = Group(emp)
+            matches = find_matches(group, emp, 2)
+            if len(matches) >= 2:
+                groups[id(group)] = group
+                used.add(emp.id)
+                used.update(e.id for e in matches)
+
+    # Handle remaining employees, joining the oldest open group of their city
+    open_groups = defaultdict(dict)
+    for group in groups.values():
+        if len(group.ids) < 4:
+            open_groups[group.city][id(group)] = group
     remaining = [emp for emp in employees if emp.id not in used]
     for emp in remaining:
-        added = False
-        for group in groups:
-            group_employees = [next(e for e in employees if e.id == id) for id in group]
-            if len(group) < 4 and is_compatible(group_employees, emp):
-                group.append(emp.id)
-                used.add(emp.id)
-                added = True
+        for key, group in open_groups.get(emp.city, {}).items():
+            if group.accepts(emp):
+                group.add(emp)
+                if len(group.ids) == 4:
+                    del open_groups[emp.city][key]
                 break
-        if not added:
-            groups.append([emp.id])
-            used.add(emp.id)
+        else:
+            group = Group(emp)
+            groups[id(group)] = group
+            if emp.city == emp.city:
+                open_groups[emp.city][id(group)] = group
+        used.add(emp.id)
 
-    # Attempt to merge small groups
-    small_groups = [g for g in groups if len(g) < 3]
+    # Attempt to merge small groups, each into the first group of its city (in the
+    # current order) that takes all of its members
+    city_groups = defaultdict(dict)
+    for key, group in groups.items():
+        city_groups[group.city][key] = group
+    small_groups = [group for group in groups.values() if len(group.ids) < 3]
     for group in small_groups:
-        groups.remove(group)
-        group_employees = [next(e for e in employees if e.id == id) for id in group]
-        for other_group in groups:
-            other_employees = [next(e for e in employees if e.id == id) for id in other_group]
-            if all(is_compatible(other_employees, emp) for emp in group_employees):
-                other_group.extend(group)
-                break
+        key = id(group)
+        del groups[key]
+        same_city = city_groups[group.city]
+        del same_city[key]
+        if group.city == group.city:
+            for other in same_city.values():
+                if other.accepts_group(group):
+                    other.merge(group)
+                    break
+            else:
+                groups[key] = group  # If no merge possible, add back to groups
+                same_city[key] = group
         else:
-            groups.append(group)  # If no merge possible, add back to groups
+            groups[key] = group
+            same_city[key] = group
 
-    return groups
+    result = [group.ids for group in groups.values()]
+    if improve_seconds:
+        # Shrink the undersized groups by moving people between groups (see local_search)
+        by_id = {}
+        for emp in employees:
+            by_id.setdefault(emp.id, emp)
+        improved = improve(list(by_id.values()), [[by_id[id] for id in group] for group in result],
+                           key=lambda e: e.city,
+                           compatible=lambda a, b: a.manager != b.manager and a.business != b.business,
+                           min_size=3, max_size=4, seconds=improve_seconds)
+        result = [[e.id for e in group] for group in improved]
+    return result
 
 # Example usage:
 # df = pd.read_excel('employee_data.xlsx')
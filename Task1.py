@@ -1,8 +1,15 @@
 import pandas as pd
 from collections import defaultdict
 import random
+from employee_store import EmployeeTable
+from local_search import improve
+
+# Columns of the manager-chain export, name first
+EMPLOYEE_FIELDS = ('Employee', 'Direct Manager', 'Middle Manager', 'Top Manager', 'City')
 
 class Employee:
+    __slots__ = ['name', 'direct_manager', 'middle_manager', 'top_manager', 'managers', 'city', 'time_zone']
+
     def __init__(self, name, direct_manager, middle_manager, top_manager, city):
         self.name = name
         self.direct_manager = direct_manager
@@ -22,58 +29,71 @@ def get_time_zone(city):
 
 def load_data(file_path):
     df = pd.read_excel(file_path)
-    employees = {}
-    for _, row in df.iterrows():
-        emp = Employee(row['Employee'], row['Direct Manager'], row['Middle Manager'], 
-                       row['Top Manager'], row['City'])
-        employees[emp.name] = emp
-    return employees
+    table = EmployeeTable.from_frame(df, fields=EMPLOYEE_FIELDS)
+    return {emp.name: emp for emp in table.employees(Employee)}
 
-def create_groups(employees, min_group_size=3, max_group_size=5):
-    groups = []
-    city_employees = defaultdict(list)
-    time_zone_employees = defaultdict(list)
-    
-    # O(n) - Partition employees by city and time zone
-    for emp in employees.values():
-        city_employees[emp.city].append(emp)
-        time_zone_employees[emp.time_zone].append(emp)
-    
-    def try_add_to_group(emp, group):
-        if (emp.direct_manager not in {e.direct_manager for e in group} and
-            not any(emp.name in e.managers or e.name in emp.managers for e in group)):
-            group.append(emp)
-            return True
-        return False
-    
-    def create_group_from_pool(pool):
-        group = []
-        random.shuffle(pool)  # Randomize to avoid bias towards certain employees
-        for emp in pool[:]:
-            if try_add_to_group(emp, group):
-                pool.remove(emp)
-                if len(group) == max_group_size:
-                    break
-        return group if len(group) >= min_group_size else []
-    
-    # O(n) - Try to create groups from each city
-    for city_pool in city_employees.values():
-        while len(city_pool) >= min_group_size:
-            group = create_group_from_pool(city_pool)
-            if group:
-                groups.append(group)
-            else:
+def compatible(a, b):
+    # Different direct managers (a missing one, NaN, clashes with none) and neither manages the other
+    return (a.direct_manager != b.direct_manager and
+            a.name not in b.managers and b.name not in a.managers)
+
+def try_add_to_group(emp, group):
+    if all(compatible(emp, e) for e in group):
+        group.append(emp)
+        return True
+    return False
+
+def create_group_from_pool(pool, min_group_size, max_group_size, shuffle=random.shuffle):
+    group = []
+    shuffle(pool)  # Randomize to avoid bias towards certain employees
+    for emp in pool[:]:
+        if try_add_to_group(emp, group):
+            pool.remove(emp)
+            if len(group) == max_group_size:
                 break
+    return group if len(group) >= min_group_size else []
+
+def groups_from_pool(pool, min_group_size, max_group_size, shuffle=random.shuffle):
+    groups = []
+    while len(pool) >= min_group_size:
+        group = create_group_from_pool(pool, min_group_size, max_group_size, shuffle)
+        if group:
+            groups.append(group)
+        else:
+            break
+    return groups
+
+def create_groups(employees, min_group_size=3, max_group_size=5, improve_seconds=0.0, workers=1, seed=0):
+    if workers != 1:
+        # Cities, then time zones, on a process pool with a seeded shuffle per pool (see partitioned)
+        from partitioned import partitioned_task1
+        groups = partitioned_task1(employees, min_group_size, max_group_size, workers, seed)
+    else:
+        groups = []
+        city_employees = defaultdict(list)
+        time_zone_employees = defaultdict(list)
+        
+        # O(n) - Partition employees by city and time zone
+        for emp in employees.values():
+            city_employees[emp.city].append(emp)
+            time_zone_employees[emp.time_zone].append(emp)
+        
+        # O(n) - Try to create groups from each city
+        for city_pool in city_employees.values():
+            groups.extend(groups_from_pool(city_pool, min_group_size, max_group_size))
+        
+        # O(n) - Try to create groups from each time zone with remaining employees
+        grouped = {id(emp) for group in groups for emp in group}
+        for tz_pool in time_zone_employees.values():
+            tz_pool = [emp for emp in tz_pool if id(emp) not in grouped]
+            groups.extend(groups_from_pool(tz_pool, min_group_size, max_group_size))
     
-    # O(n) - Try to create groups from each time zone with remaining employees
-    for tz_pool in time_zone_employees.values():
-        tz_pool = [emp for emp in tz_pool if not any(emp in group for group in groups)]
-        while len(tz_pool) >= min_group_size:
-            group = create_group_from_pool(tz_pool)
-            if group:
-                groups.append(group)
-            else:
-                break
+    if improve_seconds:
+        # Pull the people left over into groups by moving and swapping (see local_search)
+        groups = improve(list(employees.values()), groups, key=lambda e: e.time_zone,
+                         compatible=compatible,
+                         min_size=min_group_size, max_size=max_group_size, seconds=improve_seconds)
+        groups = [group for group in groups if len(group) >= min_group_size]
     
     return groups
 
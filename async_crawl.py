@@ -0,0 +1,175 @@
+import asyncio
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from http_client import get_client
+from parse_pool import ParseStage, StageStats
+from scrape import search_url, country_url, region_url, city_url, fetch_filters, parse_facets
+from scrape import fetch as fetch_page
+
+
+class HostRateLimiter:
+    """Token bucket per host, so a burst of tasks cannot exceed `rate` requests/second on one site."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = defaultdict(lambda: float(burst))
+        self._updated = {}
+        self._locks = defaultdict(asyncio.Lock)
+
+    async def wait(self, host: str) -> None:
+        if not self.rate or self.rate <= 0:
+            return
+        async with self._locks[host]:
+            while True:
+                now = time.monotonic()
+                elapsed = now - self._updated.get(host, now)
+                self._updated[host] = now
+                self._tokens[host] = min(self.burst, self._tokens[host] + elapsed * self.rate)
+                if self._tokens[host] >= 1:
+                    self._tokens[host] -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens[host]) / self.rate)
+
+
+class AsyncCrawler:
+    """Walks industry -> country -> region -> city, fetching every level concurrently.
+
+    The blocking calls on the shared HttpClient run on a thread pool; `concurrency` caps
+    how many are in flight at once and `rate_per_host` caps how fast they are started.
+    With `parse_workers` the payloads are parsed on a process pool (see parse_pool)
+    instead of on the event loop thread.
+    """
+
+    def __init__(self, concurrency: int = 16, rate_per_host: float = 10.0, sink=None, frontier=None,
+                 parse_workers: int = 0, parse_queue: int = 64):
+        self.concurrency = concurrency
+        self.rate_limiter = HostRateLimiter(rate_per_host)
+        self.sink = sink
+        self.frontier = frontier
+        self.requests_made = 0
+        self.parse_stage = ParseStage(parse_workers, parse_queue) if parse_workers else None
+        self.fetch_stats = StageStats('fetch', concurrency)
+        self.parse_stats = self.parse_stage.stats if self.parse_stage else StageStats('parse (inline)', 1)
+        self._semaphore = None
+        self._executor = None
+
+    async def _run(self, func, url: str, hand_off=None):
+        async with self._semaphore:
+            await self.rate_limiter.wait(urlsplit(get_client().rebase(url)).netloc)
+            self.requests_made += 1
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            result = await loop.run_in_executor(self._executor, func, url)
+            self.fetch_stats.record(time.perf_counter() - start)
+            if hand_off is not None:
+                # Hold the fetch slot until the next stage accepts the payload (backpressure)
+                return await hand_off(result)
+            return result
+
+    def emit(self, path: List[str], facet) -> None:
+        # Stream each facet out (e.g. to a JsonlSink) as soon as its listing is parsed
+        if self.sink is not None:
+            self.sink.write_facet(path, facet[1], facet[2])
+
+    async def fetch_facets(self, url: str, toggle_id: str, path: List[str]) -> List[List[str]]:
+        if self.frontier is None:
+            return await self._fetch_facets(url, toggle_id)
+
+        # Listings finished by an earlier, interrupted run come straight from the checkpoint
+        facets = self.frontier.result(url)
+        if facets is not None:
+            return facets
+        self.frontier.schedule(url, toggle_id, path)
+        try:
+            facets = await self._fetch_facets(url, toggle_id)
+        except Exception as e:
+            self.frontier.fail(url, e)
+            raise
+        self.frontier.complete(url, facets)
+        return facets
+
+    async def _fetch_facets(self, url: str, toggle_id: str) -> List[List[str]]:
+        if url == search_url:
+            fetch = lambda url: fetch_page(url).content
+        else:
+            fetch = fetch_filters
+        if self.parse_stage is not None:
+            parsed = await self._run(fetch, url, lambda html_content: self.parse_stage.submit(html_content, toggle_id))
+            return await parsed
+
+        html_content = await self._run(fetch, url)
+        start = time.perf_counter()
+        facets = parse_facets(html_content, toggle_id)
+        self.parse_stats.record(time.perf_counter() - start)
+        return facets
+
+    async def fetch_industries(self) -> List[List[str]]:
+        return await self.fetch_facets(search_url, 'industry-toggle', [])
+
+    async def crawl_cities(self, country, region, industry_name: str, path: List[str]) -> List[str]:
+        facets = await self.fetch_facets(city_url(country, region, industry_name), 'city-toggle', path)
+        for city in facets:
+            self.emit(path + [city[0]], city)
+        return [facet[0] for facet in facets]
+
+    async def crawl_regions(self, country, industry_name: str, path: List[str]) -> Dict[str, List[str]]:
+        regions = await self.fetch_facets(region_url(country), 'region-toggle', path)
+        for region in regions:
+            self.emit(path + [region[0]], region)
+        cities = await asyncio.gather(*(self.crawl_cities(country, region, industry_name, path + [region[0]])
+                                        for region in regions))
+        return {region[0]: region_cities for region, region_cities in zip(regions, cities)}
+
+    async def crawl_countries(self, industry) -> Dict[str, Dict[str, List[str]]]:
+        industry_name = industry[0]
+        countries = await self.fetch_facets(country_url(industry), 'country-toggle', [industry[0]])
+        for country in countries:
+            self.emit([industry[0], country[0]], country)
+        regions = await asyncio.gather(*(self.crawl_regions(country, industry_name, [industry[0], country[0]])
+                                         for country in countries))
+        return {country[0]: country_regions for country, country_regions in zip(countries, regions)}
+
+    async def crawl_industries(self) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+        industries = await self.fetch_industries()
+        for industry in industries:
+            self.emit([industry[0]], industry)
+        countries = await asyncio.gather(*(self.crawl_countries(industry) for industry in industries))
+        return {industry[0]: industry_countries for industry, industry_countries in zip(industries, countries)}
+
+    def stage_report(self) -> List[dict]:
+        return [self.fetch_stats.report(), self.parse_stats.report()]
+
+    async def crawl(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        if self.parse_stage is not None:
+            await self.parse_stage.start()
+        try:
+            return await self.crawl_industries()
+        finally:
+            self._executor.shutdown(wait=False)
+            if self.parse_stage is not None:
+                await self.parse_stage.close()
+
+
+def print_stage_report(crawler: AsyncCrawler) -> None:
+    for stage in crawler.stage_report():
+        print(f"{stage['stage']}: {stage['items']} items, {stage['items_per_sec']:.1f}/s with {stage['workers']} "
+              f"workers, {stage['utilisation']:.0%} busy, {stage['mean_item_ms']:.1f} ms/item, "
+              f"{stage['mean_queue_wait_ms']:.1f} ms queued (max depth {stage['max_queue_depth']})")
+
+
+def crawl(concurrency: int = 16, rate_per_host: float = 10.0, sink=None, frontier=None,
+          parse_workers: int = 0, parse_queue: int = 64):
+    # Same nested {industry: {country: {region: [city, ...]}}} dict that scrape.main() builds
+    crawler = AsyncCrawler(concurrency=concurrency, rate_per_host=rate_per_host, sink=sink, frontier=frontier,
+                           parse_workers=parse_workers, parse_queue=parse_queue)
+    result = asyncio.run(crawler.crawl())
+    print(f"{crawler.requests_made} requests")
+    print_stage_report(crawler)
+    return result
@@ -0,0 +1,143 @@
+import argparse
+import contextlib
+import io
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from facet_query import DedupingClient
+from http_client import HttpClient, set_client
+from mock_site import MockSite, SyntheticSite
+
+MODES = ('sequential', 'async', 'trio')
+
+
+def count_facets(tree) -> int:
+    # Every industry, country, region and city in the nested result
+    if isinstance(tree, dict):
+        return sum(1 + count_facets(children) for children in tree.values())
+    return len(tree)
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_crawl(mode: str, base_url: str, concurrency: int) -> dict:
+    """One crawl in this process, against `base_url`; meant to run in a fresh interpreter."""
+    client = set_client(HttpClient(pool_size=concurrency, base_url=base_url))
+    set_client(DedupingClient(client))
+    wall, cpu = time.perf_counter(), time.process_time()
+    # The crawl functions print their progress; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'sequential':
+            from scrape import fetch_industry, fetch_countries_and_regions
+            tree = {industry[0]: fetch_countries_and_regions(industry) for industry in fetch_industry()}
+        elif mode == 'async':
+            from async_crawl import crawl
+            tree = crawl(concurrency=concurrency, rate_per_host=0)
+        else:
+            from trio_crawl import crawl
+            tree = crawl(concurrency=concurrency)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    stats = client.stats.summary()
+    facets = count_facets(tree)
+    return {
+        'mode': mode,
+        'requests': stats['requests'],
+        'retries': stats['retries'],
+        'facets': facets,
+        'wall_s': wall,
+        'requests_per_sec': stats['requests'] / wall if wall else 0.0,
+        'cpu_ms_per_facet': 1000 * cpu / facets if facets else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'p95_ms': 1000 * stats.get('p95', 0.0),
+    }
+
+
+def run_isolated(mode: str, base_url: str, concurrency: int) -> dict:
+    # A fresh process per mode keeps peak RSS and imports from leaking between runs
+    output = subprocess.run([sys.executable, __file__, '--child', mode, '--base-url', base_url,
+                             '--concurrency', str(concurrency)], check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than the baseline by more than `tolerance` (a fraction)."""
+    regressions = []
+    for result in results:
+        before = baseline.get(result['mode'])
+        if before is None:
+            continue
+        for metric in ('wall_s', 'cpu_ms_per_facet', 'peak_rss_mb'):
+            if before[metric] and result[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{result['mode']} {metric}: {before[metric]:.3f} -> {result[metric]:.3f}")
+        if result['requests_per_sec'] < before['requests_per_sec'] * (1 - tolerance):
+            regressions.append(f"{result['mode']} requests_per_sec: "
+                               f"{before['requests_per_sec']:.1f} -> {result['requests_per_sec']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crawl modes against a local mock of the jobs site")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per mode; the fastest is reported")
+    parser.add_argument("--fixtures", default=None,
+                        help="replay this response cache, recorded beforehand with scrape.py --cache FILE against "
+                             "the live site (none ships with the repo); without it every response is synthetic")
+    parser.add_argument("--size", type=int, nargs=4, default=[4, 8, 4, 5], metavar=("IND", "CTRY", "REG", "CITY"),
+                        help="synthetic industries, countries, regions per country and cities per region")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of mock responses that are 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of mock responses that are 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="JSON file from an earlier --save to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown against the baseline before exiting with status 1")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_crawl(args.child, args.base_url, args.concurrency)))
+        return
+
+    site = MockSite(fixtures=args.fixtures, synthetic=SyntheticSite(*args.size), latency=args.latency,
+                    jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=args.seed)
+    base_url = site.start()
+    results = []
+    try:
+        for mode in args.modes:
+            runs = [run_isolated(mode, base_url, args.concurrency) for _ in range(args.repeat)]
+            results.append(min(runs, key=lambda run: run['wall_s']))
+    finally:
+        site.stop()
+
+    print(f"{'mode':<12}{'requests':>9}{'retries':>8}{'facets':>8}{'wall s':>9}{'req/s':>9}{'cpu ms/facet':>14}"
+          f"{'peak MB':>9}{'p95 ms':>8}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['requests']:>9}{r['retries']:>8}{r['facets']:>8}{r['wall_s']:>9.2f}{r['requests_per_sec']:>9.1f}"
+              f"{r['cpu_ms_per_facet']:>14.3f}{r['peak_rss_mb']:>9.1f}{r['p95_ms']:>8.1f}")
+    print(site.counts())
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({r['mode']: r for r in results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
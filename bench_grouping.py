@@ -0,0 +1,118 @@
+import argparse
+import json
+import math
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+GRADES = ('C11', 'C12', 'C13', 'C14', 'C15', 'C16')
+
+
+def synthetic_frame(n: int, cities: int = 20, businesses: int = 6, leader_share: float = 0.1,
+                    seed: int = 0) -> pd.DataFrame:
+    """An employee export with a random reporting tree, in shuffled row order."""
+    rng = np.random.default_rng(seed)
+    ids = np.array([f'E{i}' for i in range(n)], dtype=object)
+    # Everyone but the first reports to someone hired before them
+    managers = ids[(rng.random(n) * np.arange(n)).astype(np.int64)]
+    managers[0] = np.nan
+    others = rng.choice(GRADES[:4], n)
+    grades = np.where(rng.random(n) < leader_share, rng.choice(GRADES[4:], n), others)
+    df = pd.DataFrame({
+        'EmployeeID': ids,
+        'Grade': grades,
+        'Manager': managers,
+        'Business': rng.choice([f'B{i}' for i in range(businesses)], n),
+        'City': rng.choice([f'City {i}' for i in range(cities)], n),
+    })
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def run_taks3(df: pd.DataFrame, improve_seconds: float = 0.0) -> List[List[str]]:
+    from Taks3 import create_groups
+    return create_groups(df, improve_seconds=improve_seconds)
+
+
+def run_leaders(df: pd.DataFrame, improve_seconds: float = 0.0) -> List[List[str]]:
+    # Already assigned by augmenting paths; nothing for the local search to add
+    from employee_store import EmployeeTable
+    from leader_matching import match_leaders
+    from Taks3 import Employee
+    groups, _ = match_leaders(EmployeeTable.from_frame(df).employees(Employee), 3, 4)
+    return groups
+
+
+def run_leaders_pool(df: pd.DataFrame, improve_seconds: float = 0.0) -> List[List[str]]:
+    # The same groups as run_leaders, one city per core (see partitioned)
+    from employee_store import EmployeeTable
+    from partitioned import partitioned_leaders
+    from Taks3 import Employee
+    groups, _ = partitioned_leaders(EmployeeTable.from_frame(df).employees(Employee), 3, 4)
+    return groups
+
+
+STRATEGIES: Dict[str, Callable[..., List[List[str]]]] = {
+    'taks3': run_taks3,
+    'leaders': run_leaders,
+    'leaders-pool': run_leaders_pool,
+}
+
+
+def measure(strategy: str, df: pd.DataFrame, repeat: int, improve_seconds: float = 0.0) -> dict:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        groups = STRATEGIES[strategy](df, improve_seconds)
+        runs.append(time.perf_counter() - start)
+    seconds = min(runs)
+    return {
+        'strategy': strategy,
+        'rows': len(df),
+        'seconds': seconds,
+        'rows_per_sec': len(df) / seconds if seconds else 0.0,
+        'groups': len(groups),
+        'grouped': sum(len(group) for group in groups if len(group) >= 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the grouping strategies on synthetic exports of growing size")
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--cities", type=int, default=20)
+    parser.add_argument("--businesses", type=int, default=6)
+    parser.add_argument("--leader-share", type=float, default=0.1, help="share of C15/C16 employees")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per size; the fastest is reported")
+    parser.add_argument("--improve", type=float, default=0.0,
+                        help="seconds of local search after the greedy pass (see local_search)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", default=None, help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'strategy':<14}{'rows':>10}{'seconds':>10}{'rows/s':>12}{'groups':>9}{'grouped':>10}{'scaling':>9}")
+    for strategy in args.strategies:
+        previous = None
+        for size in args.sizes:
+            df = synthetic_frame(size, args.cities, args.businesses, args.leader_share, args.seed)
+            result = measure(strategy, df, args.repeat, args.improve)
+            # Growth exponent against the previous size: 1.0 is linear, 2.0 quadratic
+            scaling = ''
+            if previous and previous['seconds'] and result['seconds'] and size != previous['rows']:
+                exponent = math.log(result['seconds'] / previous['seconds']) / math.log(size / previous['rows'])
+                result['scaling'] = exponent
+                scaling = f"{exponent:.2f}"
+            results.append(result)
+            previous = result
+            print(f"{strategy:<14}{size:>10}{result['seconds']:>10.3f}{result['rows_per_sec']:>12.0f}"
+                  f"{result['groups']:>9}{result['grouped']:>10}{scaling:>9}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
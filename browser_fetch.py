@@ -0,0 +1,178 @@
+import base64
+import json
+import queue
+import threading
+import time
+from typing import List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from http_client import ClientStats, RequestRecord
+
+# Resources a facet or results page never needs; blocked through CDP before they are requested
+BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+                '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*.css']
+RESULTS_XHR = 'search-jobs/results'
+
+
+def _chrome_options() -> webdriver.ChromeOptions:
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    # The performance log carries the CDP Network.* events we read responses from
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def _network_events(driver) -> List[dict]:
+    events = []
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message['method'].startswith('Network.'):
+            events.append(message)
+    return events
+
+
+class BrowserFetcher:
+    """Fetcher backend that loads pages in a pool of warm headless Chrome sessions.
+
+    It has the same get()/rebase()/stats/close() surface as http_client.HttpClient, so
+    it can be installed with http_client.set_client() and every fetch_* function in
+    scrape.py goes through it unchanged. Images, fonts and stylesheets are blocked
+    with Network.setBlockedURLs, and response bodies are read from the CDP network
+    log rather than from the rendered DOM.
+    """
+
+    def __init__(self, sessions: int = 2, timeout: float = 30.0, base_url: Optional[str] = None,
+                 blocked_urls: Optional[List[str]] = None):
+        self.timeout = timeout
+        self.base_url = base_url
+        self.blocked_urls = BLOCKED_URLS if blocked_urls is None else blocked_urls
+        self.stats = ClientStats()
+        self.sessions = 0
+        self._drivers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        for _ in range(sessions):
+            self._idle.put(self._start_driver())
+            self.sessions += 1
+
+    def _start_driver(self):
+        driver = webdriver.Chrome(options=_chrome_options())
+        driver.set_page_load_timeout(self.timeout)
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def rebase(self, url: str) -> str:
+        if not self.base_url:
+            return url
+        base = urlsplit(self.base_url)
+        return urlunsplit(urlsplit(url)._replace(scheme=base.scheme, netloc=base.netloc))
+
+    def _body(self, driver, request_id: str) -> bytes:
+        body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        if body.get('base64Encoded'):
+            return base64.b64decode(body['body'])
+        return body['body'].encode('utf-8')
+
+    def _wait_for(self, driver, match) -> List[tuple]:
+        """Poll the network log until every response picked by `match` has finished loading."""
+        deadline = time.monotonic() + self.timeout
+        responses, finished = {}, set()
+        while True:
+            for event in _network_events(driver):
+                params = event['params']
+                if event['method'] == 'Network.responseReceived' and match(params):
+                    responses[params['requestId']] = params['response']
+                elif event['method'] in ('Network.loadingFinished', 'Network.loadingFailed'):
+                    finished.add(params['requestId'])
+            if responses and set(responses) <= finished:
+                return list(responses.items())
+            if time.monotonic() > deadline:
+                raise TimeoutError('timed out waiting for the response in the browser network log')
+            time.sleep(0.05)
+
+    def _acquire(self):
+        driver = self._idle.get()
+        if driver is None:
+            # The pool is empty for good; pass the marker on to the next waiter
+            self._idle.put(None)
+            raise WebDriverException('no browser sessions left: every one crashed and could not be restarted')
+        return driver
+
+    def _replace(self, driver):
+        """Quit a crashed session and start a new one; None if that fails and the pool shrinks."""
+        with self._lock:
+            self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+        try:
+            return self._start_driver()
+        except Exception:
+            with self._lock:
+                self.sessions -= 1
+                empty = self.sessions == 0
+            if empty:
+                self._idle.put(None)
+            return None
+
+    def _load(self, url: str, match) -> List[requests.Response]:
+        driver = self._acquire()
+        start = time.perf_counter()
+        status = None
+        try:
+            _network_events(driver)  # drop events left over from the previous page
+            driver.get(url)
+            responses = []
+            for request_id, received in self._wait_for(driver, match):
+                response = requests.Response()
+                response.status_code = received['status']
+                response.url = received['url']
+                response.headers = CaseInsensitiveDict(received.get('headers', {}))
+                response._content = self._body(driver, request_id)
+                response.encoding = requests.utils.get_encoding_from_headers(response.headers) or 'utf-8'
+                responses.append(response)
+            status = responses[0].status_code
+            return responses
+        except WebDriverException:
+            # A crashed session is replaced so the pool stays at full size; only a
+            # session that did start goes back into the pool
+            driver = self._replace(driver)
+            raise
+        finally:
+            self.stats.record(RequestRecord(url, status, time.perf_counter() - start, 1))
+            if driver is not None:
+                self._idle.put(driver)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        # The main document as served (HTML page or the results JSON endpoint itself)
+        response = self._load(self.rebase(url), lambda params: params.get('type') == 'Document')[0]
+        response.raise_for_status()
+        return response
+
+    def results_payloads(self, page_url: str) -> List[dict]:
+        # Load a search page and return the search-jobs/results XHR payloads it requested
+        responses = self._load(self.rebase(page_url), lambda params: params.get('type') == 'XHR'
+                               and RESULTS_XHR in params['response']['url'])
+        return [response.json() for response in responses if response.ok]
+
+    def close(self) -> None:
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except WebDriverException:
+                pass
@@ -0,0 +1,112 @@
+from typing import Dict, Iterator, List, Sequence
+
+
+class AvailabilityIndex:
+    """Free candidates per city and business, in file order, with O(1) removal.
+
+    Each (city, business) bucket keeps its free rows in a doubly linked list, so taking
+    a candidate unlinks it and a lookup walks only rows that are still free instead of
+    rescanning everyone already placed in a group. Buckets come in order of their
+    business's first appearance in the city, rows in file order, which is the order the
+    greedy grouping visited them.
+
+    Bucket sizes and free counts per bucket and per city are kept as counters, so the
+    "same city" / "same business" diagnostics need no scan at all. Businesses are
+    compared with `==` throughout, so a missing (NaN) business is never the same
+    business as another, whether or not it is the same NaN object.
+    """
+
+    def __init__(self, employees: Sequence, rows: Sequence[int]):
+        self.employees = employees
+        self.bucket_rows: List[List[int]] = []
+        self.bucket_business: List[str] = []
+        self.city_buckets: Dict[str, List[int]] = {}
+        self.bucket_index: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            emp = employees[row]
+            businesses = self.bucket_index.setdefault(emp.city, {})
+            if emp.business not in businesses:
+                businesses[emp.business] = len(self.bucket_rows)
+                self.city_buckets.setdefault(emp.city, []).append(len(self.bucket_rows))
+                self.bucket_rows.append([])
+                self.bucket_business.append(emp.business)
+            self.bucket_rows[businesses[emp.business]].append(row)
+
+        # Linked list nodes are rows; bucket b's head is node n + b
+        n = len(employees)
+        self.head = n
+        self.next = [-1] * (n + len(self.bucket_rows))
+        self.prev = [-1] * (n + len(self.bucket_rows))
+        self.free = [False] * n
+        self.bucket_of = {}
+        self.position = {}
+        for b, members in enumerate(self.bucket_rows):
+            node = n + b
+            for pos, row in enumerate(members):
+                self.bucket_of[row] = b
+                self.position[row] = pos
+                self.free[row] = True
+                self.next[node], self.prev[row] = row, node
+                node = row
+        self.bucket_free = [len(members) for members in self.bucket_rows]
+        self.city_total = {city: sum(len(self.bucket_rows[b]) for b in buckets)
+                           for city, buckets in self.city_buckets.items()}
+        self.city_free = dict(self.city_total)
+
+    def is_free(self, row: int) -> bool:
+        return self.free[row]
+
+    def take(self, row: int) -> None:
+        self.free[row] = False
+        before, after = self.prev[row], self.next[row]
+        self.next[before] = after
+        if after >= 0:
+            self.prev[after] = before
+        b = self.bucket_of[row]
+        self.bucket_free[b] -= 1
+        self.city_free[self.employees[row].city] -= 1
+
+    def put_back(self, row: int) -> None:
+        # Relink after the nearest free row before it; rows put back are usually ones
+        # just taken from the front of the list, so the walk is short
+        b = self.bucket_of[row]
+        members = self.bucket_rows[b]
+        pos = self.position[row] - 1
+        while pos >= 0 and not self.free[members[pos]]:
+            pos -= 1
+        before = members[pos] if pos >= 0 else self.head + b
+        after = self.next[before]
+        self.next[before], self.prev[row], self.next[row] = row, before, after
+        if after >= 0:
+            self.prev[after] = row
+        self.free[row] = True
+        self.bucket_free[b] += 1
+        self.city_free[self.employees[row].city] += 1
+
+    def free_rows(self, city: str, exclude_business=None) -> Iterator[int]:
+        """Free rows in the city outside `exclude_business`; take() them only after iterating."""
+        for b in self.city_buckets.get(city, ()):
+            if self.bucket_business[b] == exclude_business:
+                continue
+            row = self.next[self.head + b]
+            while row >= 0:
+                yield row
+                row = self.next[row]
+
+    def city_size(self, city: str) -> int:
+        return self.city_total.get(city, 0)
+
+    def _bucket(self, city: str, business):
+        # A dict lookup matches a NaN key to itself; free_rows' `==` never does
+        if business != business:
+            return None
+        return self.bucket_index.get(city, {}).get(business)
+
+    def business_size(self, city: str, business) -> int:
+        b = self._bucket(city, business)
+        return len(self.bucket_rows[b]) if b is not None else 0
+
+    def free_outside(self, city: str, business) -> int:
+        """Free candidates in the city outside `business`."""
+        b = self._bucket(city, business)
+        return self.city_free.get(city, 0) - (self.bucket_free[b] if b is not None else 0)
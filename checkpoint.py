@@ -0,0 +1,107 @@
+import argparse
+import json
+import sqlite3
+import time
+from typing import List, Optional
+
+PENDING, DONE, FAILED = 'pending', 'done', 'failed'
+
+
+class Frontier:
+    """Durable crawl frontier: every facet listing the crawl has scheduled, with its result once done.
+
+    A listing URL is recorded as pending before it is fetched and as done, together with
+    its parsed facets, right after. Re-running a crawl against the same file serves the
+    done listings from here, so an interrupted crawl resumes without re-fetching them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                toggle TEXT NOT NULL,
+                path TEXT NOT NULL,
+                state TEXT NOT NULL,
+                facets TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state)')
+        self._conn.commit()
+
+    def result(self, url: str) -> Optional[List[List[str]]]:
+        row = self._conn.execute('SELECT facets FROM frontier WHERE url = ? AND state = ?', (url, DONE)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def schedule(self, url: str, toggle_id: str, path: List[str]) -> None:
+        # Done entries stay done; pending/failed ones are (re)queued
+        self._conn.execute('''
+            INSERT INTO frontier (url, toggle, path, state, updated_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at
+            WHERE frontier.state != ?''', (url, toggle_id, json.dumps(path), PENDING, time.time(), DONE))
+        self._conn.commit()
+
+    def complete(self, url: str, facets: List[List[str]]) -> None:
+        self._conn.execute('UPDATE frontier SET state = ?, facets = ?, error = NULL, attempts = attempts + 1, '
+                           'updated_at = ? WHERE url = ?', (DONE, json.dumps(facets), time.time(), url))
+        self._conn.commit()
+
+    def fail(self, url: str, error: BaseException) -> None:
+        self._conn.execute('UPDATE frontier SET state = ?, error = ?, attempts = attempts + 1, updated_at = ? '
+                           'WHERE url = ?', (FAILED, f'{type(error).__name__}: {error}', time.time(), url))
+        self._conn.commit()
+
+    def counts(self) -> dict:
+        return dict(self._conn.execute('SELECT state, COUNT(*) FROM frontier GROUP BY state').fetchall())
+
+    def entries(self, state: Optional[str] = None, limit: int = 50) -> List[tuple]:
+        query = 'SELECT url, toggle, path, state, error, attempts FROM frontier'
+        params = ()
+        if state:
+            query += ' WHERE state = ?'
+            params = (state,)
+        return self._conn.execute(query + ' ORDER BY updated_at LIMIT ?', params + (limit,)).fetchall()
+
+    def reset(self, state: Optional[str] = None) -> int:
+        # Forget entries so the next crawl fetches them again (all of them if no state is given)
+        if state:
+            cursor = self._conn.execute('DELETE FROM frontier WHERE state = ?', (state,))
+        else:
+            cursor = self._conn.execute('DELETE FROM frontier')
+        self._conn.commit()
+        return cursor.rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect a crawl checkpoint written by scrape.py --checkpoint")
+    parser.add_argument("checkpoint", help="SQLite checkpoint file")
+    parser.add_argument("command", nargs="?", default="status", choices=["status", "list", "reset"])
+    parser.add_argument("--state", choices=[PENDING, DONE, FAILED], help="only entries in this state")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    frontier = Frontier(args.checkpoint)
+    if args.command == "status":
+        counts = frontier.counts()
+        print(f"{sum(counts.values())} listings: " + ", ".join(f"{counts.get(s, 0)} {s}" for s in (DONE, PENDING, FAILED)))
+    elif args.command == "list":
+        for url, toggle, path, state, error, attempts in frontier.entries(args.state, args.limit):
+            print(f"{state:8} {toggle:16} {' > '.join(json.loads(path)) or '(root)'}  attempts={attempts}")
+            if error:
+                print(f"         {error}")
+            print(f"         {url}")
+    elif args.command == "reset":
+        print(f"removed {frontier.reset(args.state)} entries")
+    frontier.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+import datetime
+import json
+import sqlite3
+import time
+from typing import Iterable, List, Optional
+
+from job_harvester import facet_count
+from jsonl_sink import LEVELS, iter_records
+
+DAY = 24 * 3600
+
+
+class CountStore:
+    """Append-only history of facet counts, one snapshot per crawl, in SQLite.
+
+    Every facet (a path in the industry/country/region/city tree) gets a small integer
+    key, and each crawl adds one (crawl, facet, count) row per facet. Rows are
+    clustered by crawl, so comparing two crawls only reads those two crawls' rows,
+    and a second index by facet serves a single facet's history.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS facets (
+                facet INTEGER PRIMARY KEY,
+                level TEXT NOT NULL,
+                path TEXT NOT NULL UNIQUE,
+                facet_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS facets_level ON facets (level);
+            CREATE TABLE IF NOT EXISTS crawls (
+                crawl INTEGER PRIMARY KEY,
+                crawled_at REAL NOT NULL,
+                source TEXT
+            );
+            CREATE INDEX IF NOT EXISTS crawls_time ON crawls (crawled_at);
+            CREATE TABLE IF NOT EXISTS counts (
+                crawl INTEGER NOT NULL,
+                facet INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (crawl, facet)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS counts_facet ON counts (facet, crawl);
+        ''')
+        self._conn.commit()
+
+    def record_crawl(self, records: Iterable[dict], crawled_at: Optional[float] = None,
+                     source: Optional[str] = None) -> int:
+        """Add one crawl's facet records ({'path', 'count', 'id'}); returns the new crawl number."""
+        crawled_at = time.time() if crawled_at is None else crawled_at
+        rows = {}
+        for record in records:
+            # The same facet twice (a resumed crawl appends to its output) keeps the last count
+            rows[json.dumps(record['path'], ensure_ascii=False)] = record
+        with self._conn:
+            crawl = self._conn.execute('INSERT INTO crawls (crawled_at, source) VALUES (?, ?)',
+                                       (crawled_at, source)).lastrowid
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO facets (level, path, facet_id) VALUES (?, ?, ?)',
+                [(LEVELS[len(record['path']) - 1], path, record.get('id')) for path, record in rows.items()])
+            keys = dict(self._conn.execute('SELECT path, facet FROM facets'))
+            self._conn.executemany('INSERT INTO counts (crawl, facet, count) VALUES (?, ?, ?)',
+                                   [(crawl, keys[path], facet_count(record['count'])) for path, record in rows.items()])
+        return crawl
+
+    def crawls(self) -> List[tuple]:
+        return self._conn.execute('SELECT crawl, crawled_at, source FROM crawls ORDER BY crawled_at').fetchall()
+
+    def _crawl_at(self, when: float, first_after: bool) -> Optional[int]:
+        if first_after:
+            query = 'SELECT crawl FROM crawls WHERE crawled_at >= ? ORDER BY crawled_at LIMIT 1'
+        else:
+            query = 'SELECT crawl FROM crawls WHERE crawled_at <= ? ORDER BY crawled_at DESC LIMIT 1'
+        row = self._conn.execute(query, (when,)).fetchone()
+        return row[0] if row else None
+
+    def top_growing(self, level: str = 'region', days: float = 30, limit: int = 10, relative: bool = False,
+                    now: Optional[float] = None) -> List[dict]:
+        """Facets of one level whose count grew most between the first and last crawl of the window.
+
+        Growth is the count difference, or the ratio to the starting count with
+        `relative`. A facet missing from the first crawl of the window starts at 0.
+        """
+        now = time.time() if now is None else now
+        last = self._crawl_at(now, first_after=False)
+        first = self._crawl_at(now - days * DAY, first_after=True)
+        if last is None or first is None or first == last:
+            return []
+        growth = ('CAST(b.count - COALESCE(a.count, 0) AS REAL) / MAX(COALESCE(a.count, 0), 1)' if relative
+                  else 'b.count - COALESCE(a.count, 0)')
+        rows = self._conn.execute(f'''
+            SELECT f.path, f.facet_id, COALESCE(a.count, 0), b.count, {growth} AS growth
+            FROM counts b
+            JOIN facets f ON f.facet = b.facet
+            LEFT JOIN counts a ON a.crawl = ? AND a.facet = b.facet
+            WHERE b.crawl = ? AND f.level = ?
+            ORDER BY growth DESC
+            LIMIT ?''', (first, last, level, limit)).fetchall()
+        return [{'path': json.loads(path), 'id': facet_id, 'from': start, 'to': end, 'growth': growth}
+                for path, facet_id, start, end, growth in rows]
+
+    def history(self, path: List[str]) -> List[tuple]:
+        # (crawled_at, count) for one facet, oldest first
+        return self._conn.execute('''
+            SELECT c.crawled_at, n.count FROM facets f
+            JOIN counts n ON n.facet = f.facet
+            JOIN crawls c ON c.crawl = n.crawl
+            WHERE f.path = ? ORDER BY c.crawled_at''', (json.dumps(path, ensure_ascii=False),)).fetchall()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _timestamp(value: str) -> float:
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Facet count history across crawls")
+    parser.add_argument("store", help="SQLite file for the count history")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="add a crawl's JSON lines output (scrape.py --output)")
+    ingest.add_argument("crawl")
+    ingest.add_argument("--at", type=_timestamp, default=None, help="crawl time, ISO format (default: now)")
+    top = commands.add_parser("top", help="fastest growing facets over a window")
+    top.add_argument("--level", choices=LEVELS, default="region")
+    top.add_argument("--days", type=float, default=30)
+    top.add_argument("--limit", type=int, default=10)
+    top.add_argument("--relative", action="store_true", help="rank by growth relative to the starting count")
+    history = commands.add_parser("history", help="counts of one facet over time")
+    history.add_argument("path", nargs="+", help="industry [country [region [city]]] names")
+    commands.add_parser("crawls", help="list recorded crawls")
+    args = parser.parse_args()
+
+    store = CountStore(args.store)
+    if args.command == "ingest":
+        crawl = store.record_crawl(iter_records(args.crawl), crawled_at=args.at, source=args.crawl)
+        print(f"recorded crawl {crawl}")
+    elif args.command == "top":
+        start = time.perf_counter()
+        rows = store.top_growing(args.level, args.days, args.limit, args.relative)
+        for row in rows:
+            growth = f"{row['growth']:+.1%}" if args.relative else f"{row['growth']:+d}"
+            print(f"{growth:>8}  {row['from']:>6} -> {row['to']:<6} {' > '.join(row['path'])}")
+        print(f"{len(rows)} facets in {1000 * (time.perf_counter() - start):.1f}ms")
+    elif args.command == "history":
+        for crawled_at, count in store.history(args.path):
+            print(f"{datetime.datetime.fromtimestamp(crawled_at).isoformat(timespec='seconds')}  {count}")
+    elif args.command == "crawls":
+        for crawl, crawled_at, source in store.crawls():
+            print(f"{crawl:>5}  {datetime.datetime.fromtimestamp(crawled_at).isoformat(timespec='seconds')}  {source}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Column layout of the workforce exports the grouping modules read
+FIELDS = ('EmployeeID', 'Grade', 'Manager', 'Business', 'City')
+
+
+class EmployeeTable:
+    """Employees as columns: the id column as is, every other field as interned codes.
+
+    Each non-id field is stored as an int32 code per row into that field's array of
+    distinct values (-1 for a missing value), so repeated grades, cities, businesses
+    and manager ids cost 4 bytes a row. Grouping code that wants objects gets them
+    from employees(), which builds them straight from the columns instead of going
+    through DataFrame.iterrows().
+    """
+
+    def __init__(self, ids: np.ndarray, codes: Dict[str, np.ndarray], categories: Dict[str, np.ndarray],
+                 fields: Sequence[str]):
+        self.ids = ids
+        self.codes = codes
+        self.categories = categories
+        self.fields = tuple(fields)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, fields: Sequence[str] = FIELDS) -> 'EmployeeTable':
+        # The first field is the employee id
+        ids = df[fields[0]].to_numpy(dtype=object)
+        codes, categories = {}, {}
+        for field in fields[1:]:
+            code, values = pd.factorize(df[field], sort=False)
+            codes[field] = code.astype(np.int32)
+            categories[field] = np.asarray(values, dtype=object)
+        return cls(ids, codes, categories, fields)
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict], fields: Sequence[str] = FIELDS) -> 'EmployeeTable':
+        return cls.from_frame(pd.DataFrame.from_records(list(records), columns=list(fields)), fields)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def column(self, field: str) -> np.ndarray:
+        """Values of one field per row; missing values come back as NaN, as pandas gives them.
+
+        Every missing cell gets its own NaN object, as DataFrame.iterrows() gives them:
+        one shared NaN would compare equal to itself in dict keys, sets and `in`.
+        """
+        if field == self.fields[0]:
+            return self.ids
+        codes = self.codes[field]
+        values = np.empty(len(codes), dtype=object)
+        present = codes >= 0
+        values[present] = self.categories[field][codes[present]]
+        for row in np.flatnonzero(~present):
+            values[row] = float('nan')
+        return values
+
+    def isin(self, field: str, values: Iterable) -> np.ndarray:
+        # Row mask for field in values, compared on codes
+        wanted = np.flatnonzero(pd.Index(self.categories[field]).isin(list(values)))
+        return np.isin(self.codes[field], wanted)
+
+    def manager_rows(self, field: str = 'Manager') -> np.ndarray:
+        """Row of each employee's manager, or -1 when the manager is not in the table.
+
+        With duplicate ids the last row wins, like `{emp.id: emp for emp in employees}`.
+        """
+        rows = pd.Series(np.arange(len(self.ids)), index=pd.Index(self.ids, dtype=object))
+        rows = rows[~rows.index.duplicated(keep='last')]
+        managers = rows.reindex(pd.Index(self.column(field), dtype=object))
+        return managers.fillna(-1).to_numpy(dtype=np.int64)
+
+    def employees(self, factory=None, fields: Optional[Sequence[str]] = None) -> List:
+        """One object per row: factory(*values of `fields`), in row order."""
+        columns = [self.column(field).tolist() for field in (fields or self.fields)]
+        if factory is None:
+            return list(zip(*columns))
+        return [factory(*values) for values in zip(*columns)]
+
+    def memory_bytes(self) -> int:
+        total = self.ids.nbytes + sum(code.nbytes for code in self.codes.values())
+        return total + sum(values.nbytes for values in self.categories.values())
@@ -0,0 +1,107 @@
+import argparse
+import datetime
+import os
+from typing import Dict, List, Optional
+
+from job_harvester import facet_count
+from jsonl_sink import LEVELS, iter_records
+
+# Parent id columns carried by each level's table, outermost first
+ID_COLUMNS = ['industry_id', 'country_id', 'region_id', 'city_id']
+TABLES = {'industry': 'industries', 'country': 'countries', 'region': 'regions', 'city': 'cities'}
+JOB_COLUMNS = ['job_id', 'title', 'url', 'location', 'date_posted']
+
+
+def facet_rows(records) -> Dict[str, Dict[str, list]]:
+    """Column lists per level table from crawl records.
+
+    Each row carries the data-ids of its ancestors, so the tables join on them
+    (industry_id, country_id, ...) without repeating names; counts become integers.
+    """
+    records = list(records)
+    ids = {tuple(record['path']): record['id'] for record in records}
+    columns = {level: {name: [] for name in ID_COLUMNS[:depth + 1] + ['name', 'count']}
+               for depth, level in enumerate(LEVELS)}
+    for record in records:
+        path = record['path']
+        table = columns[LEVELS[len(path) - 1]]
+        for depth in range(len(path) - 1):
+            table[ID_COLUMNS[depth]].append(ids.get(tuple(path[:depth + 1])))
+        table[ID_COLUMNS[len(path) - 1]].append(record['id'])
+        table['name'].append(path[-1])
+        table['count'].append(facet_count(record['count']))
+    return columns
+
+
+def job_rows(records) -> Dict[str, list]:
+    columns = {name: [] for name in JOB_COLUMNS}
+    for record in records:
+        columns['job_id'].append(record['id'])
+        for name in JOB_COLUMNS[1:]:
+            columns[name].append(record.get(name))
+    return columns
+
+
+def _schema(pa, names: List[str]):
+    return pa.schema([(name, pa.int64() if name == 'count' else pa.string()) for name in names])
+
+
+def write_table(pa, columns: Dict[str, list], path: str, fmt: str) -> None:
+    table = pa.Table.from_pydict(columns, schema=_schema(pa, list(columns)))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp, compression='zstd')
+    else:
+        import pyarrow.ipc
+        with pa.OSFile(tmp, 'wb') as sink, pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def export(crawl_path: str, out_dir: str, crawl_date: Optional[str] = None, jobs_path: Optional[str] = None,
+           fmt: str = 'parquet') -> Dict[str, int]:
+    """Write the crawl (and optionally harvested jobs) as one table per level.
+
+    Files go to OUT/<table>/crawl_date=YYYY-MM-DD/part-0.<ext>, a hive-style layout
+    that pyarrow.dataset, DuckDB and Spark read with crawl_date as a column, so a
+    query for one day only opens that day's files. Re-exporting a date replaces it.
+    Returns the row count per table.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("the columnar export needs pyarrow (pip install pyarrow)") from None
+
+    crawl_date = crawl_date or datetime.date.today().isoformat()
+    ext = 'parquet' if fmt == 'parquet' else 'arrow'
+
+    def partition(table: str) -> str:
+        return os.path.join(out_dir, table, f'crawl_date={crawl_date}', f'part-0.{ext}')
+
+    written = {}
+    for level, columns in facet_rows(iter_records(crawl_path)).items():
+        write_table(pa, columns, partition(TABLES[level]), fmt)
+        written[TABLES[level]] = len(columns['name'])
+    if jobs_path:
+        columns = job_rows(iter_records(jobs_path))
+        write_table(pa, columns, partition('jobs'), fmt)
+        written['jobs'] = len(columns['job_id'])
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a crawl to Parquet or Arrow tables partitioned by date")
+    parser.add_argument("crawl", help="JSON lines output of scrape.py --output")
+    parser.add_argument("out", help="directory for the tables")
+    parser.add_argument("--date", default=None, help="crawl date for the partition (default: today)")
+    parser.add_argument("--jobs", default=None, help="JSON lines output of job_harvester.py to export as well")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    args = parser.parse_args()
+    if args.date:
+        try:
+            datetime.date.fromisoformat(args.date)
+        except ValueError:
+            parser.error("--date must be YYYY-MM-DD")
+    print(export(args.crawl, args.out, crawl_date=args.date, jobs_path=args.jobs, fmt=args.format))
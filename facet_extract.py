@@ -0,0 +1,174 @@
+import re
+import sys
+import time
+from html import unescape
+from typing import List, Optional
+
+# Void elements never get an end tag, so they must not be pushed on the open-tag stack
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+             'source', 'track', 'wbr'}
+
+TOKEN_RE = re.compile(r'<!--.*?-->|<(/?)([a-zA-Z][^\s/>]*)([^>]*)>|[^<]+|<', re.S)
+ATTR_RE = re.compile(r'''([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]*)))?''')
+UL_RE = re.compile(r'<ul\b([^>]*)>', re.I)
+
+
+def _attrs(raw: str) -> dict:
+    attrs = {}
+    for name, double, single, bare in ATTR_RE.findall(raw):
+        value = double or single or bare
+        attrs[name.lower()] = unescape(value) if value else ''
+    return attrs
+
+
+def _has_class(attrs: dict, name: str) -> bool:
+    return name in attrs.get('class', '').split()
+
+
+def _find_list(html_content: str, toggle_id: str) -> Optional[int]:
+    # Position of the <ul class="search-filter-list"> that follows the toggle button
+    button = re.search(r'''<button\b[^>]*(?<![\w-])id\s*=\s*["']?%s(?=["'\s/>])''' % re.escape(toggle_id), html_content, re.I)
+    if button is None:
+        return None
+    for match in UL_RE.finditer(html_content, button.end()):
+        if _has_class(_attrs(match.group(1)), 'search-filter-list'):
+            return match.start()
+    return None
+
+
+def _open_tags_before(html_content: str, end: int) -> set:
+    # Names of the elements still open at `end`, by html.parser's rules: an end tag closes
+    # the nearest open element of that name and everything inside it, or is ignored
+    stack = []
+    for match in TOKEN_RE.finditer(html_content, 0, end):
+        closing, tag = match.group(1), match.group(2)
+        if tag is None:
+            continue
+        tag = tag.lower()
+        if closing:
+            if tag in stack:
+                del stack[len(stack) - 1 - stack[::-1].index(tag):]
+        elif tag not in VOID_TAGS and not match.group(3).rstrip().endswith('/'):
+            stack.append(tag)
+    return set(stack)
+
+
+def extract_facets(html_content, toggle_id: str) -> List[List[str]]:
+    """[name, count, data-id] for every facet under `toggle_id`, without building a parse tree.
+
+    Jumps straight to the toggle button with a regex and tokenizes only the facet <ul>
+    that follows it. The result matches scrape.parse_facets_bs4 (the BeautifulSoup
+    html.parser version): every <li> in the list, nested ones included, contributes its
+    first filter__facet-name span, first filter__facet-count span and first <input>'s
+    data-id, and <li>s missing any of those are skipped.
+    """
+    if isinstance(html_content, bytes):
+        html_content = html_content.decode('utf-8', errors='replace')
+    start = _find_list(html_content, toggle_id)
+    if start is None:
+        return []
+
+    facets = []
+    open_tags = []     # tag names currently open inside the list, the <ul> itself first
+    items = []         # open <li>s: [name, count, data-id], shared with `facets`
+    spans = []         # open facet spans: [text parts, open <span> depth]
+    span_depth = 0
+    enclosing = None   # elements open around the list, worked out only if a stray end tag needs it
+    for match in TOKEN_RE.finditer(html_content, start):
+        closing, tag = match.group(1), match.group(2)
+        if tag is None:
+            text = match.group(0)
+            if spans and not text.startswith('<!--'):
+                for span in spans:
+                    span[0].append(text)
+            continue
+
+        tag = tag.lower()
+        if closing:
+            if tag not in open_tags:
+                if enclosing is None:
+                    enclosing = _open_tags_before(html_content, start)
+                if tag in enclosing:
+                    break  # closes an element around the list, and the list with it
+                continue  # stray end tag; html.parser ignores it too
+            while open_tags:
+                closed = open_tags.pop()
+                if closed == 'span':
+                    span_depth -= 1
+                    while spans and spans[-1][1] > span_depth:
+                        spans.pop()
+                elif closed == 'li':
+                    items.pop()
+                if closed == tag:
+                    break
+            if not open_tags:
+                break  # end of the facet list
+            continue
+
+        attrs = _attrs(match.group(3))
+        if tag == 'li':
+            items.append([None, None, None])
+            facets.append(items[-1])
+        elif tag == 'span':
+            span_depth += 1
+            field = 0 if _has_class(attrs, 'filter__facet-name') else 1 if _has_class(attrs, 'filter__facet-count') else None
+            if field is not None:
+                # Like li.find(), each open <li> takes the first such span that starts inside it;
+                # the text is joined once the whole document has been read
+                spans.append([[], span_depth])
+                for item in items:
+                    if item[field] is None:
+                        item[field] = spans[-1][0]
+        elif tag == 'input':
+            for item in items:
+                if item[2] is None:
+                    # Only the first <input> counts; one without data-id makes the <li> unusable
+                    item[2] = attrs.get('data-id', False)
+        if tag not in VOID_TAGS and not match.group(3).rstrip().endswith('/'):
+            open_tags.append(tag)
+
+    return [[unescape(''.join(name)).strip(), unescape(''.join(count)).strip(), data_id]
+            for name, count, data_id in facets
+            if name is not None and count is not None and data_id is not None and data_id is not False]
+
+
+TOGGLE_IDS = ('industry-toggle', 'country-toggle', 'region-toggle', 'city-toggle')
+
+
+def read_payload(path: str):
+    """Markup of a recorded payload: the cleaned "filters" of a results JSON, or a raw page as bytes."""
+    import json
+    from scrape import clean_filters
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        return clean_filters(json.loads(raw)['filters'])
+    except (ValueError, KeyError, TypeError):
+        return raw
+
+
+def check_parity(paths: List[str]) -> bool:
+    # Compare against the BeautifulSoup extraction on recorded payloads (JSON with "filters", or raw pages)
+    from scrape import parse_facets_bs4
+
+    ok = True
+    fast_time = bs4_time = 0.0
+    for path in paths:
+        html_content = read_payload(path)
+        for toggle_id in TOGGLE_IDS:
+            start = time.perf_counter()
+            fast = extract_facets(html_content, toggle_id)
+            fast_time += time.perf_counter() - start
+            start = time.perf_counter()
+            expected = parse_facets_bs4(html_content, toggle_id)
+            bs4_time += time.perf_counter() - start
+            if fast != expected:
+                ok = False
+                print(f"MISMATCH {path} {toggle_id}: {len(fast)} vs {len(expected)} facets")
+    print(f"{len(paths)} fixtures, extract_facets {fast_time:.3f}s, BeautifulSoup {bs4_time:.3f}s")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_parity(sys.argv[1:]) else 1)
@@ -0,0 +1,185 @@
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, quote_plus, urlsplit, urlunsplit
+
+RESULTS_URL = "https://jobs.citi.com/search-jobs/results"
+
+# FacetFilters[i].FacetType values used by the site
+INDUSTRY, COUNTRY, REGION, CITY = 5, 2, 3, 4
+
+# Query fields that only label or decorate a query; they vary between equivalent requests
+# (counts move between crawls, Display/ActiveFacetID depend on the path taken) and are
+# left out of cache keys
+COSMETIC_FIELDS = {'ActiveFacetID', 'SearchResultsModuleName', 'SearchFiltersModuleName'}
+COSMETIC_FILTER_FIELDS = {'Count', 'Display', 'IsApplied'}
+
+
+class FacetFilter(NamedTuple):
+    id: str
+    facet_type: int
+    display: str
+    count: str = ''
+    field_name: str = ''
+
+
+class FacetQuery(NamedTuple):
+    """One search-jobs/results request, as a structured filter set instead of a query string."""
+
+    filters: Tuple[FacetFilter, ...]
+    search_type: int = 6
+    page: int = 1
+    per_page: int = 10
+    pagination: bool = False
+    active_facet_id: Optional[str] = None
+
+    def params(self) -> List[Tuple[str, str]]:
+        # Same fields, in the same order, as the requests the site itself sends
+        params = [
+            ('ActiveFacetID', self.active_facet_id if self.active_facet_id is not None else self.filters[-1].id),
+            ('CurrentPage', str(self.page)),
+            ('RecordsPerPage', str(self.per_page)),
+            ('Distance', '50'),
+            ('RadiusUnitType', '0'),
+            ('Keywords', ''),
+            ('Location', ''),
+            ('ShowRadius', 'False'),
+            ('IsPagination', str(self.pagination)),
+            ('CustomFacetName', ''),
+            ('FacetTerm', ''),
+            ('FacetType', '0'),
+        ]
+        for i, facet in enumerate(self.filters):
+            prefix = f'FacetFilters[{i}].'
+            params += [
+                (prefix + 'ID', facet.id),
+                (prefix + 'FacetType', str(facet.facet_type)),
+                (prefix + 'Count', str(facet.count)),
+                (prefix + 'Display', facet.display),
+                (prefix + 'IsApplied', 'true'),
+                (prefix + 'FieldName', facet.field_name),
+            ]
+        params += [
+            ('SearchResultsModuleName', 'SearchResults - Technology'),
+            ('SearchFiltersModuleName', 'Search Filters'),
+            ('SortCriteria', '0'),
+            ('SortDirection', '0'),
+            ('SearchType', str(self.search_type)),
+            ('PostalCode', ''),
+            ('ResultsType', '0'),
+        ]
+        params += [(name, '') for name in ('fc', 'fl', 'fcf', 'afc', 'afl', 'afcf')]
+        return params
+
+    def url(self, base: str = RESULTS_URL) -> str:
+        return base + '?' + '&'.join(f'{quote_plus(name)}={quote_plus(value)}' for name, value in self.params())
+
+    def page_query(self, page: int, per_page: int) -> 'FacetQuery':
+        return self._replace(page=page, per_page=per_page, pagination=True)
+
+    def cache_key(self) -> str:
+        return cache_key(self.url())
+
+    @classmethod
+    def for_path(cls, facets: List[List[str]]) -> 'FacetQuery':
+        """Query filtered on every facet of an industry [> country [> region [> city]]] path.
+
+        `facets` are the [name, count, data-id] of each facet on the path, industry first.
+        Filters are labelled the way the crawl's own URLs label them.
+        """
+        if not 1 <= len(facets) <= 4:
+            raise ValueError("a facet path is industry [country [region [city]]]")
+        filters = [FacetFilter(facets[0][0], INDUSTRY, facets[0][0], facets[0][1], 'industry')]
+        places = []
+        for (name, count, facet_id), facet_type in zip(facets[1:], (COUNTRY, REGION, CITY)):
+            places.insert(0, name)
+            filters.append(FacetFilter(facet_id, facet_type, ', '.join(places), count))
+        return cls(tuple(filters))
+
+    @classmethod
+    def from_url(cls, url: str) -> 'FacetQuery':
+        fields = dict(parse_qsl(urlsplit(url).query, keep_blank_values=True))
+        filters = []
+        i = 0
+        while f'FacetFilters[{i}].ID' in fields:
+            prefix = f'FacetFilters[{i}].'
+            filters.append(FacetFilter(fields[prefix + 'ID'], int(fields.get(prefix + 'FacetType') or 0),
+                                       fields.get(prefix + 'Display', ''), fields.get(prefix + 'Count', ''),
+                                       fields.get(prefix + 'FieldName', '')))
+            i += 1
+        return cls(tuple(filters), search_type=int(fields.get('SearchType') or 6),
+                   page=int(fields.get('CurrentPage') or 1), per_page=int(fields.get('RecordsPerPage') or 10),
+                   pagination=fields.get('IsPagination', 'False').lower() == 'true',
+                   active_facet_id=fields.get('ActiveFacetID'))
+
+
+def cache_key(url: str) -> str:
+    """Canonical key for a request: equivalent facet queries map to the same key.
+
+    Parameters are sorted, empty and cosmetic fields are dropped and the facet filters
+    are renumbered in (FacetType, ID) order, so neither counts, display labels nor the
+    order in which the tree was walked change the key.
+    """
+    parts = urlsplit(url)
+    fields = parse_qsl(parts.query, keep_blank_values=True)
+    filters: Dict[str, Dict[str, str]] = {}
+    kept = []
+    for name, value in fields:
+        if name.startswith('FacetFilters['):
+            index, _, field = name[len('FacetFilters['):].partition('].')
+            filters.setdefault(index, {})[field] = value
+        elif value and name not in COSMETIC_FIELDS:
+            kept.append((name, value))
+    ordered = sorted(filters.values(), key=lambda f: (f.get('FacetType', ''), f.get('ID', '')))
+    for i, facet in enumerate(ordered):
+        kept += [(f'FacetFilters[{i}].{field}', value) for field, value in facet.items()
+                 if value and field not in COSMETIC_FILTER_FIELDS]
+    query = '&'.join(f'{quote_plus(name)}={quote_plus(value)}' for name, value in sorted(kept))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+
+class DedupingClient:
+    """Wraps a fetcher so each logical request is made at most once per crawl.
+
+    Requests are keyed by cache_key(): a request whose key is already in flight waits
+    for that response instead of sending its own, and a completed one is answered from
+    memory; both count as `deduplicated` in the client's stats. Keep one instance per
+    crawl, as it holds on to every response until it is dropped.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self._lock = threading.Lock()
+        self._responses: Dict[str, Future] = {}
+
+    @property
+    def stats(self):
+        return self.client.stats
+
+    def rebase(self, url: str) -> str:
+        return self.client.rebase(url)
+
+    def get(self, url: str, **kwargs):
+        key = cache_key(url)
+        with self._lock:
+            future = self._responses.get(key)
+            owner = future is None
+            if owner:
+                future = self._responses[key] = Future()
+            else:
+                self.client.stats.record_deduplicated()
+        if not owner:
+            return future.result()
+        try:
+            response = self.client.get(url, **kwargs)
+        except BaseException as e:
+            # Let a later request for the same key try again
+            with self._lock:
+                del self._responses[key]
+            future.set_exception(e)
+            raise
+        future.set_result(response)
+        return response
+
+    def close(self) -> None:
+        self.client.close()
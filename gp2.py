@@ -1,8 +1,10 @@
 from typing import List, Dict, Tuple
 from collections import defaultdict
+from hierarchy import HierarchyIndex
+from local_search import improve
 
 class Employee:
-    __slots__ = ['id', 'grade', 'manager', 'city', 'timezone', 'team']
+    __slots__ = ['id', 'grade', 'manager', 'city', 'timezone']
 
     def __init__(self, id: str, grade: str, manager: str, city: str, timezone: str):
         self.id = id
@@ -10,37 +12,14 @@ class Employee:
         self.manager = manager
         self.city = city
         self.timezone = timezone
-        self.team = set()
 
-def build_team_hierarchy(employees: Dict[str, Employee]) -> None:
-    for emp in employees.values():
-        current = emp
-        while current.manager and current.manager in employees:
-            employees[current.manager].team.add(emp.id)
-            current = employees[current.manager]
-
-def group_employees_with_c15_c16_managers(employees: List[Dict[str, str]]) -> List[Tuple[str, str]]:
-    emp_dict = {emp['EmployeeID']: Employee(emp['EmployeeID'], emp['Grade'], emp['Manager'], emp['City'], emp['Timezone'])
-                for emp in employees}
-    
-    build_team_hierarchy(emp_dict)
-    
-    c15_c16_managers = {emp_id for emp_id, emp in emp_dict.items() if emp.grade in {'C15', 'C16'}}
-    employees_under_c15_c16 = [emp for emp in emp_dict.values() if emp.manager in c15_c16_managers]
-    
-    city_groups = defaultdict(list)
-    timezone_groups = defaultdict(list)
-    
-    for emp in employees_under_c15_c16:
-        city_groups[emp.city].append(emp)
-        timezone_groups[emp.timezone].append(emp)
-    
+def pair_within(emps: List[Employee], hierarchy: HierarchyIndex, used_employees: set) -> List[Tuple[str, str]]:
+    """Pairs people from different teams, each with the first free partner after them."""
     pairs = []
-    used_employees = set()
     
     def try_pair(emp1: Employee, emp2: Employee) -> bool:
         if emp1.id not in used_employees and emp2.id not in used_employees and \
-           emp1.id not in emp2.team and emp2.id not in emp1.team and \
+           not hierarchy.related(emp1.id, emp2.id) and \
            emp1.manager != emp2.manager:
             pairs.append((emp1.id, emp2.id))
             used_employees.add(emp1.id)
@@ -48,34 +27,68 @@ def group_employees_with_c15_c16_managers(employees: List[Dict[str, str]]) -> Li
             return True
         return False
     
-    # Try pairing within the same city
-    for city_emps in city_groups.values():
-        for i in range(len(city_emps)):
-            for j in range(i + 1, len(city_emps)):
-                if try_pair(city_emps[i], city_emps[j]):
-                    break
+    for i in range(len(emps)):
+        for j in range(i + 1, len(emps)):
+            if try_pair(emps[i], emps[j]):
+                break
+    return pairs
+
+def group_employees_with_c15_c16_managers(employees: List[Dict[str, str]], improve_seconds: float = 0.0,
+                                          workers: int = 1) -> List[Tuple[str, str]]:
+    emp_dict = {emp['EmployeeID']: Employee(emp['EmployeeID'], emp['Grade'], emp['Manager'], emp['City'], emp['Timezone'])
+                for emp in employees}
+    
+    hierarchy = HierarchyIndex.from_employees(emp_dict.values())
+    
+    c15_c16_managers = {emp_id for emp_id, emp in emp_dict.items() if emp.grade in {'C15', 'C16'}}
+    employees_under_c15_c16 = [emp for emp in emp_dict.values() if emp.manager in c15_c16_managers]
+    
+    if workers != 1:
+        # Cities, then time zones, on a process pool (see partitioned)
+        from partitioned import partitioned_gp2
+        pairs = partitioned_gp2(employees_under_c15_c16, hierarchy, workers)
+    else:
+        city_groups = defaultdict(list)
+        timezone_groups = defaultdict(list)
+        
+        for emp in employees_under_c15_c16:
+            city_groups[emp.city].append(emp)
+            timezone_groups[emp.timezone].append(emp)
+        
+        pairs = []
+        used_employees = set()
+        
+        # Try pairing within the same city
+        for city_emps in city_groups.values():
+            pairs.extend(pair_within(city_emps, hierarchy, used_employees))
+        
+        # Try pairing within the same timezone for remaining employees
+        for tz_emps in timezone_groups.values():
+            remaining_emps = [emp for emp in tz_emps if emp.id not in used_employees]
+            pairs.extend(pair_within(remaining_emps, hierarchy, used_employees))
     
-    # Try pairing within the same timezone for remaining employees
-    for tz_emps in timezone_groups.values():
-        remaining_emps = [emp for emp in tz_emps if emp.id not in used_employees]
-        for i in range(len(remaining_emps)):
-            for j in range(i + 1, len(remaining_emps)):
-                if try_pair(remaining_emps[i], remaining_emps[j]):
-                    break
+    if improve_seconds:
+        # Pair up the leftovers by swapping partners (see local_search)
+        improved = improve(employees_under_c15_c16, [[emp_dict[a], emp_dict[b]] for a, b in pairs],
+                           key=lambda e: e.timezone,
+                           compatible=lambda a, b: not hierarchy.related(a.id, b.id) and a.manager != b.manager,
+                           min_size=2, max_size=2, seconds=improve_seconds)
+        pairs = [(a.id, b.id) for a, b in (group for group in improved if len(group) == 2)]
     
     return pairs
 
-# Example usage:
-employee_data = [
-    {"EmployeeID": "1", "Grade": "C11", "Manager": "5", "City": "New York", "Timezone": "EST"},
-    {"EmployeeID": "2", "Grade": "C12", "Manager": "5", "City": "New York", "Timezone": "EST"},
-    {"EmployeeID": "3", "Grade": "C13", "Manager": "6", "City": "London", "Timezone": "GMT"},
-    {"EmployeeID": "4", "Grade": "C14", "Manager": "6", "City": "London", "Timezone": "GMT"},
-    {"EmployeeID": "5", "Grade": "C15", "Manager": "", "City": "New York", "Timezone": "EST"},
-    {"EmployeeID": "6", "Grade": "C16", "Manager": "", "City": "London", "Timezone": "GMT"},
-    {"EmployeeID": "7", "Grade": "C13", "Manager": "5", "City": "Boston", "Timezone": "EST"},
-    {"EmployeeID": "8", "Grade": "C14", "Manager": "6", "City": "Manchester", "Timezone": "GMT"},
-]
+if __name__ == "__main__":
+    # Example usage:
+    employee_data = [
+        {"EmployeeID": "1", "Grade": "C11", "Manager": "5", "City": "New York", "Timezone": "EST"},
+        {"EmployeeID": "2", "Grade": "C12", "Manager": "5", "City": "New York", "Timezone": "EST"},
+        {"EmployeeID": "3", "Grade": "C13", "Manager": "6", "City": "London", "Timezone": "GMT"},
+        {"EmployeeID": "4", "Grade": "C14", "Manager": "6", "City": "London", "Timezone": "GMT"},
+        {"EmployeeID": "5", "Grade": "C15", "Manager": "", "City": "New York", "Timezone": "EST"},
+        {"EmployeeID": "6", "Grade": "C16", "Manager": "", "City": "London", "Timezone": "GMT"},
+        {"EmployeeID": "7", "Grade": "C13", "Manager": "5", "City": "Boston", "Timezone": "EST"},
+        {"EmployeeID": "8", "Grade": "C14", "Manager": "6", "City": "Manchester", "Timezone": "GMT"},
+    ]
 
-result = group_employees_with_c15_c16_managers(employee_data)
-print(result)
\ No newline at end of file
+    result = group_employees_with_c15_c16_managers(employee_data)
+    print(result)
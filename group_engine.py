@@ -0,0 +1,90 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _buckets(df: pd.DataFrame, keys: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Rows arranged the way the nested `for key in df[col].unique()` loops visit them.
+
+    Buckets (one per combination of key values) come in order of the outer key's first
+    appearance, then the next key's first appearance within it, and so on; rows keep
+    their file order inside a bucket. Rows with a missing key are left out, as the
+    `df[col] == value` masks never match them. Returns the row positions in that
+    order, each row's bucket number, its position in the bucket and the bucket sizes.
+    """
+    # Rank each level's values by first appearance within the enclosing bucket: a
+    # combination first seen earlier in the file sorts first among its siblings. A
+    # value counts as seen even on rows whose inner keys are missing, as with unique()
+    rank = np.zeros(len(df), dtype=np.int64)
+    for key in keys:
+        code, _ = pd.factorize(df[key], sort=False)
+        rank[code < 0] = -1
+        seen = np.flatnonzero(rank >= 0)
+        if len(seen) == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty
+        width = int(code.max()) + 1
+        combined = rank[seen] * width + code[seen]
+        values, first = np.unique(combined, return_index=True)
+        order = np.lexsort((first, values // width))
+        level_rank = np.empty(len(values), dtype=np.int64)
+        level_rank[order] = np.arange(len(values))
+        rank[seen] = level_rank[np.searchsorted(values, combined)]
+
+    rows = np.flatnonzero(rank >= 0)
+    rank = rank[rows]
+    order = np.argsort(rank, kind='stable')
+    bucket = rank[order]
+    sizes = np.bincount(bucket)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    position = np.arange(len(order)) - starts[bucket]
+    return rows[order], bucket, position, sizes
+
+
+def _ids(n: int, rows: np.ndarray, bucket: np.ndarray, chunk: np.ndarray, kept_chunks: np.ndarray) -> np.ndarray:
+    # Number the kept chunks consecutively in bucket order; everything else gets -1
+    offsets = np.concatenate(([0], np.cumsum(kept_chunks)[:-1]))
+    ids = np.full(n, -1, dtype=np.int64)
+    kept = chunk < kept_chunks[bucket]
+    ids[rows[kept]] = offsets[bucket[kept]] + chunk[kept]
+    return ids
+
+
+def chunk_ids(df: pd.DataFrame, keys: Sequence[str], min_group: int, max_group: int) -> pd.Series:
+    """Group id per row for consecutive chunks of up to `max_group` within each bucket.
+
+    Same groups as slicing `max_group` ids off a bucket while at least `min_group`
+    remain; rows in no group get -1.
+    """
+    rows, bucket, position, sizes = _buckets(df, keys)
+    chunk = position // max_group
+    # Chunk k is taken while n - k * max_group >= min_group
+    kept_chunks = np.where(sizes >= min_group, (sizes - min_group) // max_group + 1, 0)
+    return pd.Series(_ids(len(df), rows, bucket, chunk, kept_chunks), index=df.index, name='Group')
+
+
+def month_chunk_ids(df: pd.DataFrame, keys: Sequence[str], num_months: int) -> pd.Series:
+    """Group id per row for `num_months`-sized chunks, one group per month.
+
+    A bucket gets `len // num_months` groups (leftovers ungrouped), or a single group
+    of everyone when it has fewer than `num_months` rows.
+    """
+    rows, bucket, position, sizes = _buckets(df, keys)
+    chunk = position // num_months
+    kept_chunks = np.maximum(1, sizes // num_months)
+    return pd.Series(_ids(len(df), rows, bucket, chunk, kept_chunks), index=df.index, name='Group')
+
+
+def groups_from_ids(ids: pd.Series, values: pd.Series) -> List[List[str]]:
+    """Member lists in group id order, members in row order."""
+    ids = ids.to_numpy()
+    grouped = np.flatnonzero(ids >= 0)
+    order = grouped[np.argsort(ids[grouped], kind='stable')]
+    bounds = np.flatnonzero(np.diff(ids[order])) + 1
+    members = values.to_numpy()[order].tolist()
+    if not members:
+        return []
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(members)]))
+    return [members[start:end] for start, end in zip(starts, ends)]
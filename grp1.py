@@ -1,8 +1,10 @@
 from typing import List, Dict, Tuple
 from collections import defaultdict
+from hierarchy import HierarchyIndex
+from local_search import improve
 
 class Employee:
-    __slots__ = ['id', 'grade', 'manager', 'city', 'timezone', 'team']
+    __slots__ = ['id', 'grade', 'manager', 'city', 'timezone']
 
     def __init__(self, id: str, grade: str, manager: str, city: str, timezone: str):
         self.id = id
@@ -10,68 +12,87 @@ class Employee:
         self.manager = manager
         self.city = city
         self.timezone = timezone
-        self.team = set()
 
-def build_team_hierarchy(employees: Dict[str, Employee]) -> None:
-    for emp in employees.values():
-        current = emp
-        while current.manager and current.manager in employees:
-            employees[current.manager].team.add(emp.id)
-            current = employees[current.manager]
+def group_city(city_employees: List[Employee], hierarchy: HierarchyIndex) -> Tuple[List[List[str]], List[Employee]]:
+    """Groups of up to five with no reporting line between members, and who was left over."""
+    groups = []
+    ungrouped = []
+    current_group = []
+    for emp in city_employees:
+        if not any(hierarchy.related(emp.id, g_emp.id) for g_emp in current_group):
+            current_group.append(emp)
+            if len(current_group) == 5:
+                groups.append([e.id for e in current_group])
+                current_group = []
+        else:
+            ungrouped.append(emp)
+    
+    if 3 <= len(current_group) <= 5:
+        groups.append([e.id for e in current_group])
+    else:
+        ungrouped.extend(current_group)
+    return groups, ungrouped
 
-def group_by_team_hierarchy_and_city(employees: List[Dict[str, str]]) -> List[List[str]]:
+def group_timezone(tz_employees: List[Employee]) -> List[List[str]]:
+    groups = []
+    for i in range(0, len(tz_employees), 5):
+        group = tz_employees[i:i+5]
+        if len(group) >= 3:
+            groups.append([e.id for e in group])
+    return groups
+
+def group_by_team_hierarchy_and_city(employees: List[Dict[str, str]], improve_seconds: float = 0.0,
+                                     workers: int = 1) -> List[List[str]]:
     emp_dict = {
         emp['EmployeeID']: Employee(emp['EmployeeID'], emp['Grade'], emp['Manager'], emp['City'], emp['Timezone'])
         for emp in employees if emp['Grade'] in {'C11', 'C12', 'C13', 'C14'}
     }
     
-    build_team_hierarchy(emp_dict)
-    
-    city_groups = defaultdict(list)
-    for emp in emp_dict.values():
-        city_groups[emp.city].append(emp)
+    hierarchy = HierarchyIndex.from_employees(emp_dict.values())
     
-    groups = []
-    ungrouped = []
-    
-    for city_employees in city_groups.values():
-        current_group = []
-        for emp in city_employees:
-            if not any(emp.id in g_emp.team or g_emp.id in emp.team for g_emp in current_group):
-                current_group.append(emp)
-                if len(current_group) == 5:
-                    groups.append([e.id for e in current_group])
-                    current_group = []
-            else:
-                ungrouped.append(emp)
+    if workers != 1:
+        # Cities, then time zones, on a process pool (see partitioned)
+        from partitioned import partitioned_grp1
+        groups = partitioned_grp1(emp_dict, hierarchy, workers)
+    else:
+        city_groups = defaultdict(list)
+        for emp in emp_dict.values():
+            city_groups[emp.city].append(emp)
         
-        if 3 <= len(current_group) <= 5:
-            groups.append([e.id for e in current_group])
-        else:
-            ungrouped.extend(current_group)
-    
-    # Group remaining employees by timezone
-    timezone_groups = defaultdict(list)
-    for emp in ungrouped:
-        timezone_groups[emp.timezone].append(emp)
+        groups = []
+        ungrouped = []
+        for city_employees in city_groups.values():
+            city_result, left = group_city(city_employees, hierarchy)
+            groups.extend(city_result)
+            ungrouped.extend(left)
+        
+        # Group remaining employees by timezone
+        timezone_groups = defaultdict(list)
+        for emp in ungrouped:
+            timezone_groups[emp.timezone].append(emp)
+        
+        for tz_employees in timezone_groups.values():
+            groups.extend(group_timezone(tz_employees))
     
-    for tz_employees in timezone_groups.values():
-        for i in range(0, len(tz_employees), 5):
-            group = tz_employees[i:i+5]
-            if len(group) >= 3:
-                groups.append([e.id for e in group])
+    if improve_seconds:
+        # Pull the ungrouped into groups by moving and swapping (see local_search)
+        improved = improve(list(emp_dict.values()), [[emp_dict[id] for id in group] for group in groups],
+                           key=lambda e: e.timezone, compatible=lambda a, b: not hierarchy.related(a.id, b.id),
+                           min_size=3, max_size=5, seconds=improve_seconds)
+        groups = [[e.id for e in group] for group in improved if len(group) >= 3]
     
     return groups
 
-# Example usage:
-employee_data = [
-    {"EmployeeID": "1", "Grade": "C11", "Manager": "5", "City": "New York", "Timezone": "EST"},
-    {"EmployeeID": "2", "Grade": "C12", "Manager": "5", "City": "New York", "Timezone": "EST"},
-    {"EmployeeID": "3", "Grade": "C13", "Manager": "6", "City": "London", "Timezone": "GMT"},
-    {"EmployeeID": "4", "Grade": "C14", "Manager": "6", "City": "London", "Timezone": "GMT"},
-    {"EmployeeID": "5", "Grade": "C15", "Manager": "", "City": "New York", "Timezone": "EST"},
-    {"EmployeeID": "6", "Grade": "C16", "Manager": "", "City": "London", "Timezone": "GMT"},
-]
+if __name__ == "__main__":
+    # Example usage:
+    employee_data = [
+        {"EmployeeID": "1", "Grade": "C11", "Manager": "5", "City": "New York", "Timezone": "EST"},
+        {"EmployeeID": "2", "Grade": "C12", "Manager": "5", "City": "New York", "Timezone": "EST"},
+        {"EmployeeID": "3", "Grade": "C13", "Manager": "6", "City": "London", "Timezone": "GMT"},
+        {"EmployeeID": "4", "Grade": "C14", "Manager": "6", "City": "London", "Timezone": "GMT"},
+        {"EmployeeID": "5", "Grade": "C15", "Manager": "", "City": "New York", "Timezone": "EST"},
+        {"EmployeeID": "6", "Grade": "C16", "Manager": "", "City": "London", "Timezone": "GMT"},
+    ]
 
-result = group_by_team_hierarchy_and_city(employee_data)
-print(result)
\ No newline at end of file
+    result = group_by_team_hierarchy_and_city(employee_data)
+    print(result)
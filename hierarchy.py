@@ -0,0 +1,115 @@
+import warnings
+from typing import Dict, Hashable, Iterable, List
+
+
+class HierarchyIndex:
+    """Reporting lines of an org, answering "is A above or below B" in O(1).
+
+    Built in one pass over (id, manager) pairs: every employee gets the entry and
+    exit number of a depth-first walk down from the top of the org, and A manages B
+    (directly or further up the chain) exactly when B's interval nests inside A's.
+    Managers that are not employees themselves end a chain, as before.
+
+    Manager data with loops (A reports to B, B reports to A) used to hang the chain
+    walks. The loops are kept in `cycles` and reported with a warning; everyone on a
+    loop is treated as being in everyone else's reporting line, and the loop as a
+    whole sits at the top of whatever reports into it. With duplicate ids the last
+    row's manager is used.
+    """
+
+    def __init__(self, ids: Iterable[Hashable], managers: Iterable[Hashable]):
+        manager_of = {}
+        for emp_id, manager in zip(ids, managers):
+            manager_of[emp_id] = manager
+        self.ids = list(manager_of)
+        self.index: Dict[Hashable, int] = {emp_id: i for i, emp_id in enumerate(self.ids)}
+        parent = [self.index.get(manager, -1) for manager in manager_of.values()]
+
+        self.cycles: List[List[Hashable]] = []
+        # node -> tour node; everyone on a loop shares the one of the loop
+        self.node = list(range(len(parent)))
+        self._find_cycles(parent)
+        self._number(parent)
+        if self.cycles:
+            loops = '; '.join(' -> '.join(map(str, cycle + cycle[:1])) for cycle in self.cycles)
+            warnings.warn(f"Manager data has {len(self.cycles)} reporting loop(s): {loops}", stacklevel=2)
+
+    @classmethod
+    def from_employees(cls, employees: Iterable) -> 'HierarchyIndex':
+        employees = list(employees)
+        return cls((emp.id for emp in employees), (emp.manager for emp in employees))
+
+    def _find_cycles(self, parent: List[int]) -> None:
+        # Each employee has one manager, so following managers from anywhere either
+        # stops at the top or runs into a loop; every employee is visited once
+        state = [0] * len(parent)  # 0 new, 1 on the current path, 2 done
+        for start in range(len(parent)):
+            path = []
+            current = start
+            while current >= 0 and state[current] == 0:
+                state[current] = 1
+                path.append(current)
+                current = parent[current]
+            if current >= 0 and state[current] == 1:
+                loop = path[path.index(current):]
+                self.cycles.append([self.ids[i] for i in loop])
+                for i in loop:
+                    self.node[i] = current
+            for i in path:
+                state[i] = 2
+
+    def _number(self, parent: List[int]) -> None:
+        n = len(parent)
+        children = [[] for _ in range(n)]
+        roots = []
+        for i in range(n):
+            if self.node[i] != i:
+                continue  # folded into its loop's node
+            up = parent[i]
+            if up < 0 or self.node[up] == i:
+                roots.append(i)  # top of the org, or a loop
+            else:
+                children[self.node[up]].append(i)
+
+        self.entry = [0] * n
+        self.exit = [0] * n
+        clock = 0
+        for root in roots:
+            stack = [(root, False)]
+            while stack:
+                i, done = stack.pop()
+                if done:
+                    self.exit[i] = clock
+                    continue
+                self.entry[i] = clock
+                clock += 1
+                stack.append((i, True))
+                stack.extend((child, False) for child in reversed(children[i]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, emp_id: Hashable) -> bool:
+        return emp_id in self.index
+
+    def manages(self, manager: Hashable, emp_id: Hashable) -> bool:
+        """True when `manager` is somewhere up `emp_id`'s management chain."""
+        a, b = self.index.get(manager), self.index.get(emp_id)
+        if a is None or b is None or a == b:
+            return False
+        a, b = self.node[a], self.node[b]
+        if a == b:
+            return True  # both on the same loop
+        return self.entry[a] < self.entry[b] and self.exit[b] <= self.exit[a]
+
+    def related(self, a: Hashable, b: Hashable) -> bool:
+        """True when either employee is in the other's reporting line."""
+        i, j = self.index.get(a), self.index.get(b)
+        if i is None or j is None or i == j:
+            return False
+        i, j = self.node[i], self.node[j]
+        if i == j:
+            return True
+        if self.entry[i] > self.entry[j]:
+            i, j = j, i
+        return self.exit[j] <= self.exit[i]
@@ -0,0 +1,230 @@
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import List, NamedTuple, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_control import AdaptiveLimiter
+from response_cache import ResponseCache, cached_response
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class RequestRecord(NamedTuple):
+    url: str
+    status: Optional[int]
+    elapsed: float
+    attempts: int
+
+
+class ClientStats:
+    """Per-request latency and retry counters, shared by every thread using the client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.records: List[RequestRecord] = []
+        self.retries = 0
+        self.failures = 0
+        self.statuses = Counter()
+        self.cache_hits = 0
+        self.revalidated = 0
+        self.deduplicated = 0
+        # Set by HttpClient when an AdaptiveLimiter is in use; its state is part of the summary
+        self.limiter: Optional[AdaptiveLimiter] = None
+
+    def record_deduplicated(self) -> None:
+        with self._lock:
+            self.deduplicated += 1
+
+    def record_cache_hit(self, revalidated: bool = False) -> None:
+        with self._lock:
+            if revalidated:
+                self.revalidated += 1
+            else:
+                self.cache_hits += 1
+
+    def record(self, record: RequestRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            self.retries += record.attempts - 1
+            self.statuses[record.status] += 1
+            if record.status is None or record.status >= 400:
+                self.failures += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = sorted(r.elapsed for r in self.records)
+            retries, failures, statuses = self.retries, self.failures, dict(self.statuses)
+            cache = {'cache_hits': self.cache_hits, 'revalidated': self.revalidated,
+                     'deduplicated': self.deduplicated}
+        if self.limiter is not None:
+            cache['limiter'] = self.limiter.state()
+        if not latencies:
+            return {'requests': 0, 'retries': retries, 'failures': failures, 'statuses': statuses, **cache}
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            'requests': len(latencies),
+            'retries': retries,
+            'failures': failures,
+            'statuses': statuses,
+            'mean': sum(latencies) / len(latencies),
+            'p50': pct(0.50),
+            'p95': pct(0.95),
+            'max': latencies[-1],
+            **cache,
+        }
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    # Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """Pooled keep-alive session with timeouts and jittered exponential backoff.
+
+    Every fetch in scrape.py goes through one of these, so connection reuse, retry
+    policy and the latency counters are configured in a single place.
+    """
+
+    def __init__(self, pool_size: int = 16, timeout: float = 30.0, connect_timeout: float = 10.0,
+                 retries: int = 4, backoff: float = 0.5, max_backoff: float = 30.0,
+                 base_url: Optional[str] = None, headers: Optional[dict] = None,
+                 cache: Optional[ResponseCache] = None, limiter: Optional[AdaptiveLimiter] = None):
+        self.timeout = (connect_timeout, timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.base_url = base_url
+        self.cache = cache
+        self.limiter = limiter
+        self.stats = ClientStats()
+        self.stats.limiter = limiter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def rebase(self, url: str) -> str:
+        # Facet URLs point at the live site; swap in the configured host if there is one
+        if not self.base_url:
+            return url
+        base = urlsplit(self.base_url)
+        return urlunsplit(urlsplit(url)._replace(scheme=base.scheme, netloc=base.netloc))
+
+    def _delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        if response is not None:
+            retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        # "Full jitter": sleep anywhere between 0 and the exponential ceiling
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        # One attempt; with an adaptive limiter it also holds a slot and reports back.
+        # Retry backoff happens outside the slot.
+        if self.limiter is None:
+            return self.session.request(method, url, **kwargs)
+        self.limiter.acquire()
+        start = time.perf_counter()
+        status = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            self.limiter.release(time.perf_counter() - start, status)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        url = self.rebase(url)
+        kwargs.setdefault('timeout', self.timeout)
+        retries = self.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            response = None
+            try:
+                response = self._send(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retries:
+                    self.stats.record(RequestRecord(url, None, time.perf_counter() - start, attempt + 1))
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    self.stats.record(RequestRecord(url, response.status_code, time.perf_counter() - start, attempt + 1))
+                    response.raise_for_status()
+                    return response
+            time.sleep(self._delay(attempt, response))
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        if self.cache is None:
+            return self.request('GET', url, **kwargs)
+
+        # Cache entries are keyed by the logical (live site) URL, not the rebased one
+        entry = self.cache.lookup(url)
+        if entry is not None:
+            if self.cache.is_fresh(entry):
+                self.stats.record_cache_hit()
+                return cached_response(entry)
+            headers = dict(kwargs.pop('headers', None) or {})
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+            kwargs['headers'] = headers
+
+        response = self.request('GET', url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(url)
+            self.stats.record_cache_hit(revalidated=True)
+            return cached_response(entry)
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def set_client(client: HttpClient) -> HttpClient:
+    # Replace the shared client, e.g. with one pointed at a local stand-in or a
+    # browser_fetch.BrowserFetcher; anything with get()/rebase()/stats/close() will do
+    global _client
+    with _client_lock:
+        _client = client
+    return client
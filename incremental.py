@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+from typing import Dict, List, Optional
+
+from async_crawl import AsyncCrawler, print_stage_report
+from scrape import country_url, region_url, city_url
+
+# Level names by depth in the facet tree
+LEVELS = ['industry', 'country', 'region', 'city']
+
+
+def load_snapshot(path: str) -> dict:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_snapshot(path: str, tree: dict) -> None:
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(tree, f)
+    os.replace(tmp, path)
+
+
+def to_nested(tree: dict) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+    # Drop counts and ids to get the {industry: {country: {region: [city, ...]}}} shape main() prints
+    return {
+        industry: {
+            country: {
+                region: list(region_node.get('children', {}))
+                for region, region_node in country_node.get('children', {}).items()
+            }
+            for country, country_node in industry_node.get('children', {}).items()
+        }
+        for industry, industry_node in tree.items()
+    }
+
+
+def diff_trees(old: dict, new: dict, depth: int = 0, path: Optional[list] = None) -> List[dict]:
+    """Added, removed and count-changed facets between two snapshots, parents before children."""
+    path = path or []
+    changes = []
+    level = LEVELS[depth]
+    for name in list(new) + [name for name in old if name not in new]:
+        old_node, new_node = old.get(name), new.get(name)
+        node_path = path + [name]
+        if old_node is None:
+            changes.append({'change': 'added', 'level': level, 'path': node_path, 'new': new_node['count']})
+        elif new_node is None:
+            changes.append({'change': 'removed', 'level': level, 'path': node_path, 'old': old_node['count']})
+        elif old_node['count'] != new_node['count']:
+            changes.append({'change': 'changed', 'level': level, 'path': node_path,
+                            'old': old_node['count'], 'new': new_node['count']})
+        if depth + 1 < len(LEVELS):
+            changes.extend(diff_trees((old_node or {}).get('children', {}), (new_node or {}).get('children', {}),
+                                      depth + 1, node_path))
+    return changes
+
+
+class IncrementalCrawler(AsyncCrawler):
+    """Re-crawls only the subtrees whose facet count changed since the previous snapshot.
+
+    Every facet <li> carries its filter__facet-count, so the listing one level up already
+    tells us whether a subtree moved. A node whose count and data-id match the snapshot
+    keeps its previous children without any request; anything new or changed is
+    fetched and descended into as usual. Counts are only a change signal, so a periodic
+    full crawl (an empty snapshot) is still worth scheduling.
+    """
+
+    def __init__(self, previous: dict, concurrency: int = 16, rate_per_host: float = 10.0, sink=None,
+                 frontier=None, parse_workers: int = 0, parse_queue: int = 64):
+        super().__init__(concurrency=concurrency, rate_per_host=rate_per_host, sink=sink, frontier=frontier,
+                         parse_workers=parse_workers, parse_queue=parse_queue)
+        self.previous = previous
+        self.reused = 0
+
+    def _unchanged(self, facet, previous_node: Optional[dict]) -> bool:
+        return (previous_node is not None and 'children' in previous_node
+                and previous_node['count'] == facet[1] and previous_node['id'] == facet[2])
+
+    def _emit_subtree(self, path: List[str], children: dict) -> None:
+        for name, node in children.items():
+            self.emit(path + [name], [name, node['count'], node['id']])
+            self._emit_subtree(path + [name], node.get('children', {}))
+
+    async def _node(self, path: List[str], facet, previous_node: Optional[dict], fetch_children) -> dict:
+        if self._unchanged(facet, previous_node):
+            self.reused += 1
+            self._emit_subtree(path, previous_node['children'])
+            return {'count': facet[1], 'id': facet[2], 'children': previous_node['children']}
+        return {'count': facet[1], 'id': facet[2], 'children': await fetch_children()}
+
+    async def crawl_cities(self, country, region, industry_name: str, path: List[str]) -> dict:
+        facets = await self.fetch_facets(city_url(country, region, industry_name), 'city-toggle', path)
+        for city in facets:
+            self.emit(path + [city[0]], city)
+        return {city[0]: {'count': city[1], 'id': city[2]} for city in facets}
+
+    async def crawl_regions(self, country, industry_name: str, path: List[str],
+                            previous: Optional[dict] = None) -> dict:
+        previous = previous or {}
+        regions = await self.fetch_facets(region_url(country), 'region-toggle', path)
+        for region in regions:
+            self.emit(path + [region[0]], region)
+        nodes = await asyncio.gather(*(
+            self._node(path + [region[0]], region, previous.get(region[0]),
+                       lambda region=region: self.crawl_cities(country, region, industry_name, path + [region[0]]))
+            for region in regions))
+        return {region[0]: node for region, node in zip(regions, nodes)}
+
+    async def crawl_countries(self, industry, previous: Optional[dict] = None) -> dict:
+        previous = previous or {}
+        industry_name = industry[0]
+        countries = await self.fetch_facets(country_url(industry), 'country-toggle', [industry[0]])
+        for country in countries:
+            self.emit([industry[0], country[0]], country)
+        nodes = await asyncio.gather(*(
+            self._node([industry[0], country[0]], country, previous.get(country[0]),
+                       lambda country=country: self.crawl_regions(
+                           country, industry_name, [industry[0], country[0]],
+                           (previous.get(country[0]) or {}).get('children')))
+            for country in countries))
+        return {country[0]: node for country, node in zip(countries, nodes)}
+
+    async def crawl_industries(self) -> dict:
+        industries = await self.fetch_industries()
+        for industry in industries:
+            self.emit([industry[0]], industry)
+        nodes = await asyncio.gather(*(
+            self._node([industry[0]], industry, self.previous.get(industry[0]),
+                       lambda industry=industry: self.crawl_countries(
+                           industry, (self.previous.get(industry[0]) or {}).get('children')))
+            for industry in industries))
+        return {industry[0]: node for industry, node in zip(industries, nodes)}
+
+
+def crawl_incremental(snapshot_path: str, diff_path: Optional[str] = None, concurrency: int = 16,
+                      rate_per_host: float = 10.0, sink=None, frontier=None, parse_workers: int = 0,
+                      parse_queue: int = 64) -> dict:
+    previous = load_snapshot(snapshot_path)
+    crawler = IncrementalCrawler(previous, concurrency=concurrency, rate_per_host=rate_per_host, sink=sink,
+                                 frontier=frontier, parse_workers=parse_workers, parse_queue=parse_queue)
+    tree = asyncio.run(crawler.crawl())
+    changes = diff_trees(previous, tree)
+    print(f"{crawler.requests_made} requests, {crawler.reused} unchanged subtrees reused, {len(changes)} changes")
+    print_stage_report(crawler)
+
+    if diff_path:
+        with open(diff_path, 'w') as f:
+            for change in changes:
+                f.write(json.dumps(change) + '\n')
+    save_snapshot(snapshot_path, tree)
+    return tree
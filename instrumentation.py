@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds, in seconds, of the duration histogram buckets
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGES = ('fetch', 'decode', 'clean', 'parse')
+
+
+class Histogram:
+    """Cumulative-bucket duration histogram, as Prometheus expects it."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (self.max,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class Metrics:
+    """Stage durations, request counts and bytes for one crawl, shared by all threads.
+
+    span() times a block and files it under its stage; a span log, if one is set,
+    gets one JSON line per span with its attributes (url, status, bytes, ...).
+    render() gives the Prometheus text format that serve() exposes on /metrics and
+    write() saves for a node-exporter textfile collector; summary() is the end of
+    run report.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Histogram] = {}
+        self.requests: Dict[int, int] = {}
+        self.bytes = 0
+        self.span_log = None
+        self._server = None
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def record_response(self, status: Optional[int], size: int) -> None:
+        with self._lock:
+            self.requests[status] = self.requests.get(status, 0) + 1
+            self.bytes += size
+
+    @contextmanager
+    def span(self, stage: str, **attrs):
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException as e:
+            attrs['error'] = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(stage, elapsed)
+            if stage == 'fetch':
+                self.record_response(attrs.get('status'), attrs.get('bytes', 0))
+            if self.span_log is not None:
+                self.span_log.write({'stage': stage, 'start': time.time() - elapsed,
+                                     'seconds': elapsed, **attrs})
+
+    def render(self) -> str:
+        lines = ['# HELP crawl_stage_seconds Time spent per crawl stage.',
+                 '# TYPE crawl_stage_seconds histogram']
+        with self._lock:
+            for stage, histogram in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, n in zip(histogram.buckets, histogram.counts):
+                    cumulative += n
+                    lines.append(f'crawl_stage_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'crawl_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'crawl_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}')
+                lines.append(f'crawl_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+            lines += ['# HELP crawl_responses_total Responses by HTTP status.',
+                      '# TYPE crawl_responses_total counter']
+            for status, n in sorted(self.requests.items(), key=lambda item: str(item[0])):
+                lines.append(f'crawl_responses_total{{status="{status if status is not None else "error"}"}} {n}')
+            lines += ['# HELP crawl_response_bytes_total Response body bytes received.',
+                      '# TYPE crawl_response_bytes_total counter',
+                      f'crawl_response_bytes_total {self.bytes}']
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> None:
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port: int, host: str = '0.0.0.0') -> None:
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def summary(self) -> List[dict]:
+        with self._lock:
+            # Pipeline stages in pipeline order, anything else after them
+            stages = sorted(self.stages.items(),
+                            key=lambda item: (0, STAGES.index(item[0])) if item[0] in STAGES else (1, item[0]))
+            return [{'stage': stage, 'count': h.count, 'total_s': h.total,
+                     'mean_ms': 1000 * h.total / h.count if h.count else 0.0,
+                     'p95_ms': 1000 * h.quantile(0.95), 'max_ms': 1000 * h.max} for stage, h in stages]
+
+
+def print_summary(metrics: 'Metrics') -> None:
+    rows = metrics.summary()
+    total = sum(row['total_s'] for row in rows) or 1.0
+    print(f"{'stage':<10}{'count':>8}{'total s':>10}{'share':>8}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for row in rows:
+        print(f"{row['stage']:<10}{row['count']:>8}{row['total_s']:>10.3f}{row['total_s'] / total:>8.1%}"
+              f"{row['mean_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['max_ms']:>10.2f}")
+    print(f"{metrics.bytes} bytes in {sum(metrics.requests.values())} responses {metrics.requests}")
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+def span(stage: str, **attrs):
+    return _metrics.span(stage, **attrs)
@@ -0,0 +1,163 @@
+import argparse
+import json
+import math
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html import unescape
+from typing import Iterator, List, Optional, Tuple
+
+from facet_query import FacetQuery
+from http_client import HttpClient, get_client, set_client
+from jsonl_sink import JsonlSink, iter_records
+
+JOB_RE = re.compile(r'<a\b([^>]*\bdata-job-id\s*=\s*["\']?([^"\'\s>]+)[^>]*)>(.*?)</a>', re.S | re.I)
+HREF_RE = re.compile(r'\bhref\s*=\s*["\']?([^"\'\s>]+)', re.I)
+TITLE_RE = re.compile(r'<h[1-6]\b[^>]*>(.*?)</h[1-6]>', re.S | re.I)
+TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _span_text(html_content: str, class_name: str) -> Optional[str]:
+    match = re.search(r'<span\b[^>]*class\s*=\s*["\']?[^>]*\b%s\b[^>]*>(.*?)</span>' % re.escape(class_name),
+                      html_content, re.S | re.I)
+    return _text(match.group(1)) if match else None
+
+
+def _text(html_content: str) -> str:
+    return ' '.join(unescape(TAG_RE.sub(' ', html_content)).split())
+
+
+def extract_jobs(results_html: str) -> List[dict]:
+    # One record per <a data-job-id=...> in the `results` HTML of a search-jobs/results payload
+    jobs = []
+    for attrs, job_id, body in JOB_RE.findall(results_html):
+        href = HREF_RE.search(attrs)
+        title = TITLE_RE.search(body)
+        jobs.append({
+            'id': job_id,
+            'title': _text(title.group(1)) if title else _text(body),
+            'url': unescape(href.group(1)) if href else None,
+            'location': _span_text(body, 'job-location'),
+            'date_posted': _span_text(body, 'job-date-posted'),
+        })
+    return jobs
+
+
+def facet_count(count: str) -> int:
+    # Facet counts come as "(1,234)"
+    digits = re.sub(r'[^\d]', '', str(count))
+    return int(digits) if digits else 0
+
+
+def fetch_page(query: FacetQuery, page: int, per_page: int) -> List[dict]:
+    response = get_client().get(query.page_query(page, per_page).url())
+    return extract_jobs(json.loads(response.text).get('results') or '')
+
+
+class JobHarvester:
+    """Pages through the `results` payload of one facet combination (a FacetQuery).
+
+    Page 1 is requested with `max_per_page` records; if the server caps the page size,
+    the number it actually returned becomes the page size. The page count then follows
+    from the facet count, the remaining pages are fetched concurrently, and jobs are
+    yielded as pages arrive, each job id only once. If the facet count was stale and
+    the last page came back full, the following pages are fetched until one is short.
+    """
+
+    def __init__(self, workers: int = 8, max_per_page: int = 100):
+        self.workers = workers
+        self.max_per_page = max_per_page
+        self.pages_fetched = 0
+        self.duplicates = 0
+
+    def harvest(self, query: FacetQuery, count) -> Iterator[dict]:
+        if isinstance(query, str):
+            query = FacetQuery.from_url(query)
+        total = facet_count(count)
+        seen = set()
+
+        def fresh(jobs):
+            for job in jobs:
+                if job['id'] in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(job['id'])
+                yield job
+
+        first = fetch_page(query, 1, self.max_per_page)
+        self.pages_fetched += 1
+        yield from fresh(first)
+        if not first:
+            return
+        # Anything short of max_per_page is either the server's page size cap or the whole listing
+        per_page = len(first)
+        if per_page < self.max_per_page and per_page == total:
+            return
+        pages = max(1, math.ceil(total / per_page))
+
+        last_full = pages == 1
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(fetch_page, query, page, per_page): page for page in range(2, pages + 1)}
+            for future in as_completed(futures):
+                jobs = future.result()
+                self.pages_fetched += 1
+                if futures[future] == pages:
+                    last_full = len(jobs) >= per_page
+                yield from fresh(jobs)
+
+        # The facet count lags behind the listing; keep going while pages are full
+        page = pages
+        while last_full:
+            page += 1
+            jobs = fetch_page(query, page, per_page)
+            self.pages_fetched += 1
+            last_full = len(jobs) >= per_page
+            yield from fresh(jobs)
+
+
+def path_query(records: List[dict], path: List[str]) -> Tuple[FacetQuery, str]:
+    """Results query and facet count for any industry [country [region [city]]] path of a crawl.
+
+    The query carries a filter for every facet on the path, so its listing and the count
+    it is paged against (the last facet's) describe the same jobs.
+    """
+    by_path = {tuple(record['path']): record for record in records}
+    facets = [by_path.get(tuple(path[:depth + 1])) for depth in range(len(path))]
+    if None in facets:
+        raise KeyError(f"{' > '.join(path)} is not in the crawl output")
+    return FacetQuery.for_path([[record['path'][-1], record['count'], record['id']] for record in facets]), \
+        facets[-1]['count']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvest job listings for one facet of a crawl")
+    parser.add_argument("crawl", help="JSON lines output of scrape.py --output")
+    parser.add_argument("path", nargs="+", help="industry [country [region [city]]] names")
+    parser.add_argument("--output", default=None, help="JSON lines file for the jobs (default: stdout)")
+    parser.add_argument("--workers", type=int, default=8, help="pages fetched concurrently")
+    parser.add_argument("--max-per-page", type=int, default=100, help="largest RecordsPerPage to ask for")
+    parser.add_argument("--base-url", default=None, help="site to query instead of jobs.citi.com")
+    args = parser.parse_args()
+
+    client = set_client(HttpClient(pool_size=args.workers, base_url=args.base_url))
+    query, count = path_query(list(iter_records(args.crawl)), args.path)
+    harvester = JobHarvester(workers=args.workers, max_per_page=args.max_per_page)
+    sink = JsonlSink(args.output) if args.output else None
+    jobs = 0
+    try:
+        for job in harvester.harvest(query, count):
+            jobs += 1
+            if sink is not None:
+                sink.write(job)
+            else:
+                print(json.dumps(job, ensure_ascii=False))
+    finally:
+        if sink is not None:
+            sink.close()
+    print(f"{jobs} jobs (facet count {count}) from {harvester.pages_fetched} pages "
+          f"({harvester.duplicates} duplicates dropped) for {query.cache_key()}", file=sys.stderr)
+    print(client.stats.summary(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import gzip
+import json
+import os
+import threading
+import time
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+# Level names by depth in a record's path
+LEVELS = ['industry', 'country', 'region', 'city']
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class JsonlSink:
+    """Writes one JSON line per crawled facet as soon as it is resolved.
+
+    Lines are buffered and written every `flush_every` records; the file is fsynced
+    at most once per `fsync_interval` seconds, so a crash loses at most that window
+    instead of the whole crawl. Paths ending in .gz are gzip-compressed.
+    """
+
+    def __init__(self, path: str, flush_every: int = 500, fsync_interval: float = 1.0, append: bool = False):
+        self.path = path
+        self.flush_every = flush_every
+        self.fsync_interval = fsync_interval
+        self.records_written = 0
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._file = _open(path, 'a' if append else 'w')
+        self._last_fsync = time.monotonic()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.flush_every:
+                self._flush(force_sync=False)
+
+    def write_facet(self, path: List[str], count: str, facet_id: str) -> None:
+        self.write({'level': LEVELS[len(path) - 1], 'path': path, 'count': count, 'id': facet_id})
+
+    def _flush(self, force_sync: bool) -> None:
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self.records_written += len(self._buffer)
+            self._buffer = []
+        now = time.monotonic()
+        if force_sync or now - self._last_fsync >= self.fsync_interval:
+            self._file.flush()
+            raw = self._file
+            if isinstance(getattr(self._file, 'buffer', None), gzip.GzipFile):
+                # Sync-flush the compressor so what reaches the disk is decodable
+                self._file.buffer.flush()
+                raw = self._file.buffer.fileobj
+            raw.flush()
+            os.fsync(raw.fileno())
+            self._last_fsync = now
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush(force_sync=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush(force_sync=True)
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_records(path: str) -> Iterator[dict]:
+    with _open(path, 'r') as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A crash can leave a truncated last line; everything before it is intact
+                    return
+        except EOFError:
+            # Gzip stream cut off before close(); keep what was synced
+            return
+
+
+def _insert(tree: dict, path: List[str]) -> None:
+    countries = tree.setdefault(path[0], {})
+    if len(path) > 1:
+        regions = countries.setdefault(path[1], {})
+        if len(path) > 2:
+            cities = regions.setdefault(path[2], [])
+            if len(path) > 3:
+                cities.append(path[3])
+
+
+def load_nested(path: str, industry: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+    # Rebuild main()'s {industry: {country: {region: [city, ...]}}} dict, optionally for one industry
+    tree = {}
+    for record in iter_records(path):
+        if industry is None or record['path'][0] == industry:
+            _insert(tree, record['path'])
+    return tree
+
+
+class LazyTree(Mapping):
+    """Read-only {industry: {country: {region: [city, ...]}}} view over a JSONL crawl file.
+
+    Only the industry names are read up front; each industry's subtree is built from
+    the file the first time it is accessed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._industries = list(dict.fromkeys(record['path'][0] for record in iter_records(path)))
+        self._loaded = {}
+
+    def __getitem__(self, industry: str):
+        if industry not in self._loaded:
+            if industry not in self._industries:
+                raise KeyError(industry)
+            self._loaded[industry] = load_nested(self.path, industry).get(industry, {})
+        return self._loaded[industry]
+
+    def __iter__(self):
+        return iter(self._industries)
+
+    def __len__(self):
+        return len(self._industries)
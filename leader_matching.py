@@ -0,0 +1,201 @@
+from collections import deque
+from typing import Dict, List, Sequence, Tuple
+
+from candidate_index import AvailabilityIndex
+from hierarchy import HierarchyIndex
+
+LEADER_GRADES = ('C15', 'C16')
+
+
+class LeaderMatcher:
+    """Assigns members to C15/C16 leaders as a flow problem instead of first come, first served.
+
+    A leader and a candidate are compatible when they share a city, work in different
+    businesses and neither is in the other's reporting line. Every leader wants between
+    `min_members` and `max_members` candidates and every candidate joins at most one
+    group.
+
+    Leaders are taken in input order and first grab up to `max_members` free candidates
+    exactly as the greedy grouping did, so nothing changes while candidates are plentiful.
+    A leader left short looks for augmenting paths over the compatibility graph: it takes
+    a candidate from an earlier group, that group takes a replacement elsewhere, and so on
+    until the chain ends at a free candidate or at a group above its minimum. A grouped
+    leader never drops below `min_members`, so nobody the greedy pass would have grouped
+    is lost to make room. A leader that still cannot reach the minimum gives its partial
+    members back and is retried once at the end.
+
+    The compatibility graph is never built: edges are found from the free lists of the
+    AvailabilityIndex and the groups in the leader's city as the search needs them. Leaders found unable to reach a
+    free candidate or a spare member are remembered until the next change that could help
+    them, so a city that has run dry costs one search, not one per leader.
+    """
+
+    def __init__(self, employees: Sequence, hierarchy: HierarchyIndex, min_members: int, max_members: int,
+                 leader_grades: Sequence[str] = LEADER_GRADES):
+        self.employees = employees
+        self.hierarchy = hierarchy
+        self.min_members = min_members
+        self.max_members = max_members
+        self.leaders = [i for i, emp in enumerate(employees) if emp.grade in leader_grades]
+
+        self.available = AvailabilityIndex(
+            employees, [i for i, emp in enumerate(employees) if emp.grade not in leader_grades])
+
+        self.city_leaders: Dict[str, List[int]] = {}
+        for leader in self.leaders:
+            self.city_leaders.setdefault(employees[leader].city, []).append(leader)
+
+        self.owner = [-1] * len(employees)
+        self.members: Dict[int, List[int]] = {leader: [] for leader in self.leaders}
+        # Groups with a member to spare per city. A search can only succeed if the
+        # city has one of these or a free candidate. Kept in the order they came up (a
+        # dict, not a set of row numbers) so the pick does not depend on row numbering
+        self.spare: Dict[str, Dict[int, None]] = {city: {} for city in self.city_leaders}
+        # Changes per city; a change in one city never helps a leader in another,
+        # and a city's result does not depend on what the other cities do
+        self.version: Dict[str, int] = {city: 0 for city in self.city_leaders}
+        self.dead: Dict[int, int] = {}
+
+    def _compatible(self, leader: int, candidate: int) -> bool:
+        a, b = self.employees[leader], self.employees[candidate]
+        return a.business != b.business and not self.hierarchy.related(a.id, b.id)
+
+    def _free_candidates(self, leader: int, limit: int) -> List[int]:
+        emp = self.employees[leader]
+        found = []
+        if self.available.free_outside(emp.city, emp.business) == 0:
+            return found
+        for candidate in self.available.free_rows(emp.city, emp.business):
+            if not self.hierarchy.related(emp.id, self.employees[candidate].id):
+                found.append(candidate)
+                if len(found) == limit:
+                    break
+        return found
+
+    def _resized(self, leader: int) -> None:
+        spare = self.spare[self.employees[leader].city]
+        if len(self.members[leader]) > self.min_members:
+            spare[leader] = None
+        else:
+            spare.pop(leader, None)
+
+    def _take(self, leader: int, candidate: int) -> None:
+        if self.owner[candidate] == -1:
+            self.available.take(candidate)
+        self.owner[candidate] = leader
+        self.members[leader].append(candidate)
+        self._resized(leader)
+
+    def _release(self, leader: int) -> None:
+        for candidate in self.members[leader]:
+            self.owner[candidate] = -1
+            self.available.put_back(candidate)
+        if self.members[leader]:
+            self.version[self.employees[leader].city] += 1
+        self.members[leader] = []
+        self._resized(leader)
+
+    def _augment(self, leader: int) -> bool:
+        """Find one more member for `leader` along an augmenting path."""
+        city = self.employees[leader].city
+        if not self.available.city_free.get(city) and not self.spare[city]:
+            return False
+        parent = {leader: None}
+        # A spare member the leader can use directly ends the search at once
+        for other in self.spare[city]:
+            candidate = next((c for c in self.members[other] if self._compatible(leader, c)), None)
+            if candidate is not None:
+                parent[other] = (leader, candidate)
+                self._apply(parent, other)
+                return True
+        queue = deque([leader])
+        # Nearly every group in a city takes part, so each group is reached once, from
+        # the first leader on the path that can use one of its members
+        unreached = [other for other in self.city_leaders[city]
+                     if other != leader and self.members[other] and self.dead.get(other) != self.version[city]]
+        while queue and unreached:
+            current = queue.popleft()
+            left = []
+            for other in unreached:
+                candidate = next((c for c in self.members[other] if self._compatible(current, c)), None)
+                if candidate is None:
+                    left.append(other)
+                    continue
+                parent[other] = (current, candidate)
+                if len(self.members[other]) > self.min_members:
+                    self._apply(parent, other)
+                    return True
+                free = self._free_candidates(other, 1)
+                if free:
+                    self._apply(parent, other)
+                    self._take(other, free[0])
+                    return True
+                queue.append(other)
+            unreached = left
+        for visited in parent:
+            if visited != leader:
+                self.dead[visited] = self.version[city]
+        return False
+
+    def _apply(self, parent: Dict, end: int) -> None:
+        # Hand each candidate on the path back one step towards the leader that asked
+        node = end
+        while parent[node] is not None:
+            previous, candidate = parent[node]
+            self.members[node].remove(candidate)
+            self._resized(node)
+            self._take(previous, candidate)
+            node = previous
+
+    def _assign(self, leader: int) -> bool:
+        for candidate in self._free_candidates(leader, self.max_members):
+            self._take(leader, candidate)
+        while len(self.members[leader]) < self.min_members:
+            if not self._augment(leader):
+                self._release(leader)
+                return False
+        # A new group only opens paths for others if it has a member to spare or may
+        # have stopped short of further free candidates
+        if len(self.members[leader]) > self.min_members or len(self.members[leader]) == self.max_members:
+            self.version[self.employees[leader].city] += 1
+        return True
+
+    def _reason(self, leader: int) -> str:
+        # Same wording as the greedy grouping, from the index's counters; only the free
+        # candidates are walked, to split them into same-team and compatible
+        emp = self.employees[leader]
+        same_city = self.available.city_size(emp.city)
+        same_business = self.available.business_size(emp.city, emp.business)
+        same_team = compatible = 0
+        for candidate in self.available.free_rows(emp.city, emp.business):
+            if self.hierarchy.related(emp.id, self.employees[candidate].id):
+                same_team += 1
+            else:
+                compatible += 1
+        if same_city == 0:
+            return f"No other employees in the same city ({emp.city})"
+        if same_business == same_city:
+            return f"All potential matches in the same business ({emp.business})"
+        if same_team == same_city - same_business:
+            return "All potential matches in the same team hierarchy"
+        return f"Not enough compatible employees (found {compatible}, need at least {self.min_members})"
+
+    def run(self) -> Tuple[List[List[str]], Dict[str, str]]:
+        """Groups as [leader id, member ids...] in leader order, and why the rest were left out."""
+        ungrouped = [leader for leader in self.leaders if not self._assign(leader)]
+        ungrouped = [leader for leader in ungrouped if not self._assign(leader)]
+
+        groups = []
+        for leader in self.leaders:
+            if self.members[leader]:
+                groups.append([self.employees[i].id for i in [leader] + self.members[leader]])
+        reasons = {self.employees[leader].id: self._reason(leader) for leader in ungrouped}
+        return groups, reasons
+
+
+def match_leaders(employees: Sequence, min_group: int, max_group: int,
+                  hierarchy: HierarchyIndex = None) -> Tuple[List[List[str]], Dict[str, str]]:
+    """Groups of a C15/C16 leader plus `min_group - 1` to `max_group - 1` members."""
+    if hierarchy is None:
+        hierarchy = HierarchyIndex.from_employees(employees)
+    return LeaderMatcher(employees, hierarchy, min_group - 1, max_group - 1).run()
@@ -0,0 +1,201 @@
+import math
+import random
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+
+class LocalSearch:
+    """Improves a finished grouping by moving and swapping people between groups.
+
+    Works on any strategy's output: `items` are the people (any objects), `groups` the
+    greedy result as lists of items, `key(item)` the neighbourhood a group must stay
+    within (city, time zone) and `compatible(a, b)` the pairwise rule every two members
+    of a group must pass. Items with a missing key (NaN) stay where they are.
+
+    The score is the number of people in groups of at least `min_size`. Everyone not in
+    a seed group starts as a group of one. Each step tries one of:
+
+    - move someone from an undersized group into another group of the neighbourhood;
+    - move someone out of a group above `min_size` into an undersized one;
+    - swap two members of different groups, which keeps the score and lets the search
+      drift across plateaus.
+
+    A step only checks the moved people against the members of the group they join, so
+    it costs O(group size), and the score change comes from the two group sizes alone.
+    Steps that lower the score are refused (with `temperature` > 0 they are taken with
+    probability exp(delta / temperature), annealed towards zero), and the result is the
+    best grouping seen.
+    """
+
+    def __init__(self, items: Sequence, groups: Sequence[Sequence], key: Callable[[object], Hashable],
+                 compatible: Callable[[object, object], bool], min_size: int, max_size: int, seed: int = 0):
+        self.items = list(items)
+        self.compatible = compatible
+        self.min_size = min_size
+        self.max_size = max_size
+        self.rng = random.Random(seed)
+
+        index = {id(item): i for i, item in enumerate(self.items)}
+        self.members: List[List[int]] = []
+        self.group_of = [-1] * len(self.items)
+        for group in groups:
+            self._new_group([index[id(item)] for item in group])
+        for i in range(len(self.items)):
+            if self.group_of[i] < 0:
+                self._new_group([i])
+
+        # Groups and movable items per neighbourhood, for sampling
+        self.bucket_of: List[Optional[int]] = [None] * len(self.items)
+        self.bucket_items: List[List[int]] = []
+        buckets: Dict[Hashable, int] = {}
+        for i, item in enumerate(self.items):
+            value = key(item)
+            if value != value:
+                continue
+            if value not in buckets:
+                buckets[value] = len(self.bucket_items)
+                self.bucket_items.append([])
+            self.bucket_of[i] = buckets[value]
+            self.bucket_items[buckets[value]].append(i)
+        self.bucket_groups: List[List[int]] = [[] for _ in self.bucket_items]
+        self.slot: Dict[int, int] = {}
+        for g, members in enumerate(self.members):
+            bucket = self.bucket_of[members[0]]
+            if bucket is not None and all(self.bucket_of[i] == bucket for i in members):
+                self.slot[g] = len(self.bucket_groups[bucket])
+                self.bucket_groups[bucket].append(g)
+
+        # People in undersized groups that can be moved
+        self.loose: List[int] = []
+        self.loose_slot: Dict[int, int] = {}
+        for g, members in enumerate(self.members):
+            if len(members) < min_size:
+                for i in members:
+                    self._set_loose(i, True)
+        self.score = sum(self._value(len(members)) for members in self.members)
+        self.initial_score = self.score
+        self.moves = self.accepted = 0
+
+    def _new_group(self, members: List[int]) -> int:
+        g = len(self.members)
+        self.members.append(members)
+        for i in members:
+            self.group_of[i] = g
+        return g
+
+    def _value(self, size: int) -> int:
+        return size if size >= self.min_size else 0
+
+    def _set_loose(self, i: int, loose: bool) -> None:
+        if loose == (i in self.loose_slot) or (loose and self.bucket_of[i] is None):
+            return
+        if loose:
+            self.loose_slot[i] = len(self.loose)
+            self.loose.append(i)
+        else:
+            # Swap-remove in O(1)
+            pos, last = self.loose_slot.pop(i), self.loose.pop()
+            if last != i:
+                self.loose[pos] = last
+                self.loose_slot[last] = pos
+
+    def _resized(self, g: int, before: int) -> None:
+        # Members change loose status only when the group crosses min_size
+        after = len(self.members[g])
+        if (before < self.min_size) != (after < self.min_size):
+            for i in self.members[g]:
+                self._set_loose(i, after < self.min_size)
+
+    def _fits(self, i: int, g: int, leaving: int = -1) -> bool:
+        return all(j == leaving or self.compatible(self.items[i], self.items[j]) for j in self.members[g])
+
+    def _accept(self, delta: int, temperature: float) -> bool:
+        if delta >= 0:
+            return True
+        return temperature > 0 and self.rng.random() < math.exp(delta / temperature)
+
+    def _move(self, i: int, target: int, temperature: float) -> bool:
+        source = self.group_of[i]
+        if target == source or target not in self.slot or len(self.members[target]) >= self.max_size:
+            return False
+        a, b = len(self.members[source]), len(self.members[target])
+        delta = self._value(a - 1) - self._value(a) + self._value(b + 1) - self._value(b)
+        if not self._accept(delta, temperature) or not self._fits(i, target):
+            return False
+        self.members[source].remove(i)
+        self.members[target].append(i)
+        self.group_of[i] = target
+        self._set_loose(i, False)
+        self._resized(source, a)
+        self._resized(target, b)
+        if b + 1 < self.min_size:
+            self._set_loose(i, True)
+        self.score += delta
+        return True
+
+    def _swap(self, i: int, j: int) -> bool:
+        a, b = self.group_of[i], self.group_of[j]
+        if a == b or a not in self.slot or b not in self.slot:
+            return False
+        if not self._fits(i, b, leaving=j) or not self._fits(j, a, leaving=i):
+            return False
+        self.members[a][self.members[a].index(i)] = j
+        self.members[b][self.members[b].index(j)] = i
+        self.group_of[i], self.group_of[j] = b, a
+        loose_i, loose_j = i in self.loose_slot, j in self.loose_slot
+        self._set_loose(i, loose_j)
+        self._set_loose(j, loose_i)
+        return True
+
+    def step(self, temperature: float = 0.0) -> bool:
+        """Try one random move; True when it was applied."""
+        self.moves += 1
+        if not self.loose:
+            return False
+        i = self.loose[self.rng.randrange(len(self.loose))]
+        bucket = self.bucket_of[i]
+        groups, people = self.bucket_groups[bucket], self.bucket_items[bucket]
+        kind = self.rng.random()
+        if kind < 0.5:
+            done = self._move(i, groups[self.rng.randrange(len(groups))], temperature)
+        elif kind < 0.8:
+            donor = people[self.rng.randrange(len(people))]
+            done = (len(self.members[self.group_of[donor]]) > self.min_size and
+                    self._move(donor, self.group_of[i], temperature))
+        else:
+            done = self._swap(i, people[self.rng.randrange(len(people))])
+        self.accepted += done
+        return done
+
+    def run(self, seconds: float = 1.0, max_moves: Optional[int] = None, temperature: float = 0.0) -> List[List]:
+        """Search for `seconds` (or `max_moves` steps) and return the best grouping found."""
+        best_score, best = self.score, self.groups() if temperature > 0 else None
+        deadline = time.perf_counter() + seconds
+        start_temperature = temperature
+        while self.loose and (max_moves is None or self.moves < max_moves):
+            # Check the clock every few hundred steps, not on each one
+            if self.moves % 256 == 0:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if start_temperature:
+                    temperature = start_temperature * max(0.0, deadline - now) / seconds
+            self.step(temperature)
+            if best is not None and self.score > best_score:
+                best_score, best = self.score, self.groups()
+        if best is not None and best_score > self.score:
+            return best
+        return self.groups()
+
+    def groups(self) -> List[List]:
+        """Non-empty groups as lists of items, seed groups first, in their order."""
+        return [[self.items[i] for i in members] for members in self.members if members]
+
+
+def improve(items: Sequence, groups: Sequence[Sequence], key: Callable[[object], Hashable],
+            compatible: Callable[[object, object], bool], min_size: int, max_size: int,
+            seconds: float = 1.0, seed: int = 0, max_moves: Optional[int] = None,
+            temperature: float = 0.0) -> List[List]:
+    """Run LocalSearch from a greedy result; every group, undersized ones included."""
+    search = LocalSearch(items, groups, key, compatible, min_size, max_size, seed)
+    return search.run(seconds, max_moves, temperature)
@@ -0,0 +1,259 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from facet_query import cache_key, INDUSTRY, COUNTRY, REGION, CITY
+from response_cache import ResponseCache
+
+LIVE_URL = "https://jobs.citi.com"
+MAX_PER_PAGE = 50
+
+
+def _facet_id(*parts: str) -> str:
+    return str(int(hashlib.md5('/'.join(parts).encode()).hexdigest()[:8], 16))
+
+
+def facets_html(toggle_id: str, facets: List[Tuple[str, int, str]]) -> str:
+    # Same markup as the site's filter sections: a toggle button followed by the facet list
+    items = ''.join(
+        f'<li><input type="checkbox" data-id="{facet_id}"><label>'
+        f'<span class="filter__facet-name">{name}</span> <span class="filter__facet-count">({count})</span>'
+        f'</label></li>' for name, count, facet_id in facets)
+    return (f'<section><button id="{toggle_id}" class="search-filter-toggle">Toggle</button>'
+            f'<ul class="search-filter-list">{items}</ul></section>')
+
+
+def jobs_html(facet_id: str, total: int, page: int, per_page: int) -> str:
+    start = (page - 1) * per_page
+    # Job ids on the site are numbers; industry ids have spaces
+    slug = facet_id.replace(' ', '-')
+    items = ''.join(
+        f'<li><a href="/job/{slug}/{i}" data-job-id="{slug}-{i}"><h2>Job {i}</h2>'
+        f'<span class="job-location">City, Country</span><span class="job-date-posted">01/01/2024</span></a></li>'
+        for i in range(start, min(total, start + per_page)))
+    return f'<section id="search-results-list"><ul>{items}</ul></section>'
+
+
+class SyntheticSite:
+    """Generated industry/country/region/city tree, deterministic for a given size."""
+
+    def __init__(self, industries: int = 4, countries: int = 5, regions: int = 3, cities: int = 3):
+        self.industries = [(f"Industry {i}", 0, f"Industry {i}") for i in range(industries)]
+        self.countries = [(f"Country {i}", 0, _facet_id('country', str(i))) for i in range(countries)]
+        self.regions = regions
+        self.cities = cities
+
+    def _regions(self, country_id: str):
+        return [(f"Region {country_id[:4]} {i}", 0, _facet_id('region', country_id, str(i)))
+                for i in range(self.regions)]
+
+    def _cities(self, region_id: str):
+        return [(f"City {region_id[:4]} {i}", i + 1, _facet_id('city', region_id, str(i)))
+                for i in range(self.cities)]
+
+    def _count(self, level: str, facet_id: str) -> int:
+        # Counts sum up the tree, as on the site
+        if level == 'region':
+            return sum(city[1] for city in self._cities(facet_id))
+        if level == 'country':
+            return sum(self._count('region', region[2]) for region in self._regions(facet_id))
+        return sum(self._count('country', country[2]) for country in self.countries)
+
+    def _counted(self, level: str, facets):
+        return [(name, self._count(level, facet_id), facet_id) for name, _, facet_id in facets]
+
+    def search_page(self) -> bytes:
+        facets = self._counted('industry', self.industries)
+        return f'<html><body>{facets_html("industry-toggle", facets)}</body></html>'.encode()
+
+    def results(self, query: Dict[str, str]) -> bytes:
+        filters = {}
+        i = 0
+        while f'FacetFilters[{i}].ID' in query:
+            filters[int(query.get(f'FacetFilters[{i}].FacetType') or 0)] = query[f'FacetFilters[{i}].ID']
+            i += 1
+        if CITY in filters:
+            # A single city has no further facets, only its listing
+            cities = self._cities(filters.get(REGION, ''))
+            html_content, facet_id = '', filters[CITY]
+            total = sum(city[1] for city in cities if city[2] == facet_id)
+        elif REGION in filters:
+            cities = self._cities(filters[REGION])
+            html_content, facet_id = facets_html('city-toggle', cities), filters[REGION]
+            total = sum(city[1] for city in cities)
+        elif COUNTRY in filters:
+            html_content = facets_html('region-toggle', self._counted('region', self._regions(filters[COUNTRY])))
+            facet_id, total = filters[COUNTRY], self._count('country', filters[COUNTRY])
+        elif INDUSTRY in filters:
+            html_content = facets_html('country-toggle', self._counted('country', self.countries))
+            facet_id, total = filters[INDUSTRY], self._count('industry', filters[INDUSTRY])
+        else:
+            html_content, facet_id, total = '', 'all', 0
+        page = int(query.get('CurrentPage') or 1)
+        per_page = min(MAX_PER_PAGE, int(query.get('RecordsPerPage') or 10))
+        return json.dumps({'filters': html_content, 'results': jobs_html(facet_id, total, page, per_page)}).encode()
+
+    def response(self, path: str, query: Dict[str, str]) -> Optional[Tuple[str, bytes]]:
+        if path == '/search-jobs':
+            return 'text/html; charset=utf-8', self.search_page()
+        if path == '/search-jobs/results':
+            return 'application/json; charset=utf-8', self.results(query)
+        return None
+
+
+class MockSite:
+    """Local stand-in for jobs.citi.com for benchmarks and offline runs.
+
+    Requests are answered from recorded fixtures when there are any: a response cache
+    file written by `scrape.py --cache FILE` against the live site, looked up by the
+    same cache_key() the crawler uses. No such file ships with the repo, so replay
+    needs one recorded beforehand; without `fixtures` every response comes from a
+    SyntheticSite, as does anything the recording does not cover. Each
+    response waits `latency` seconds give or take up to `jitter`, and a share of
+    them is answered with 429 (`throttle_rate`) or 503 (`error_rate`) instead. Bodies
+    carry an ETag, so conditional requests get 304s.
+    """
+
+    def __init__(self, fixtures: Optional[str] = None, synthetic: Optional[SyntheticSite] = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: float = 0.0, seed: Optional[int] = None):
+        self.recorded: Dict[str, Tuple[str, bytes]] = {}
+        if fixtures:
+            if not os.path.exists(fixtures):
+                # ResponseCache would quietly create an empty file and nothing would replay
+                raise FileNotFoundError(f"no recorded response cache at {fixtures}; record one with "
+                                        f"scrape.py --cache {fixtures}")
+            cache = ResponseCache(fixtures)
+            try:
+                for key, entry in cache.entries():
+                    self.recorded[key] = (entry.headers.get('Content-Type', 'application/json'), entry.body)
+            finally:
+                cache.close()
+        self.synthetic = synthetic or SyntheticSite()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.served = 0
+        self.replayed = 0
+        self.injected = 0
+        self.not_modified = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _inject(self) -> Optional[int]:
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def handle(self, target: str, if_none_match: Optional[str]) -> Tuple[int, Dict[str, str], bytes]:
+        time.sleep(self._delay())
+        status = self._inject()
+        if status is not None:
+            with self._lock:
+                self.injected += 1
+            headers = {'Retry-After': f'{self.retry_after:g}'} if status == 429 else {}
+            return status, headers, b''
+
+        parts = urlsplit(target)
+        found = self.recorded.get(cache_key(LIVE_URL + target))
+        if found is not None:
+            with self._lock:
+                self.replayed += 1
+        else:
+            found = self.synthetic.response(parts.path, dict(parse_qsl(parts.query, keep_blank_values=True)))
+        if found is None:
+            return 404, {}, b''
+        content_type, body = found
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        with self._lock:
+            self.served += 1
+            if if_none_match == etag:
+                self.not_modified += 1
+                return 304, {'ETag': etag}, b''
+        return 200, {'Content-Type': content_type, 'ETag': etag}, body
+
+    def start(self, port: int = 0, host: str = '127.0.0.1') -> str:
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this, keep-alive
+            # requests stall on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status, headers, body = site.handle(self.path, self.headers.get('If-None-Match'))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def counts(self) -> dict:
+        with self._lock:
+            return {'served': self.served, 'replayed': self.replayed, 'injected_errors': self.injected,
+                    'not_modified': self.not_modified}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for jobs.citi.com")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=None,
+                        help="replay this response cache, recorded beforehand with scrape.py --cache FILE against "
+                             "the live site (none ships with the repo); without it every response is synthetic")
+    parser.add_argument("--size", type=int, nargs=4, default=[4, 5, 3, 3], metavar=("IND", "CTRY", "REG", "CITY"),
+                        help="synthetic industries, countries, regions per country and cities per region")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- seconds added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    site = MockSite(fixtures=args.fixtures, synthetic=SyntheticSite(*args.size), latency=args.latency,
+                    jitter=args.jitter, error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=args.seed)
+    print(f"serving on {site.start(args.port)} ({len(site.recorded)} recorded responses)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(site.counts())
+        site.stop()
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from facet_extract import extract_facets
+from instrumentation import get_metrics
+
+
+class StageStats:
+    """Throughput of one pipeline stage: items handled, time spent on them, and queueing."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.waited = 0.0
+        self.max_depth = 0
+        self.started = None
+        self.finished = None
+
+    def record(self, elapsed: float, waited: float = 0.0) -> None:
+        now = time.perf_counter()
+        if self.started is None:
+            self.started = now - elapsed
+        self.finished = now
+        self.items += 1
+        self.busy += elapsed
+        self.waited += waited
+
+    def report(self) -> dict:
+        wall = (self.finished - self.started) if self.items else 0.0
+        return {
+            'stage': self.name,
+            'workers': self.workers,
+            'items': self.items,
+            'items_per_sec': self.items / wall if wall else 0.0,
+            # Share of the stage's worker capacity that was busy; near 1.0 means it is the bottleneck
+            'utilisation': self.busy / (wall * self.workers) if wall else 0.0,
+            'mean_item_ms': 1000 * self.busy / self.items if self.items else 0.0,
+            'mean_queue_wait_ms': 1000 * self.waited / self.items if self.items else 0.0,
+            'max_queue_depth': self.max_depth,
+        }
+
+
+def _parse(html_content, toggle_id: str):
+    # Runs in a worker process
+    start = time.perf_counter()
+    facets = extract_facets(html_content, toggle_id)
+    return facets, time.perf_counter() - start
+
+
+class ParseStage:
+    """Parses raw `filters` payloads on a process pool, fed through a bounded queue.
+
+    Fetchers hand payloads over with `submit()`, which blocks while the queue is full;
+    the crawler keeps its fetch slot until then, so a saturated parse stage slows
+    fetching down instead of piling up payloads in memory.
+    """
+
+    def __init__(self, workers: Optional[int] = None, queue_size: int = 64):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.stats = StageStats('parse', self.workers)
+        self._queue = None
+        self._pool = None
+        self._tasks = []
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def submit(self, html_content, toggle_id: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((html_content, toggle_id, future, time.perf_counter()))
+        self.stats.max_depth = max(self.stats.max_depth, self._queue.qsize())
+        return future
+
+    async def parse(self, html_content, toggle_id: str) -> List[List[str]]:
+        return await (await self.submit(html_content, toggle_id))
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            html_content, toggle_id, future, queued_at = await self._queue.get()
+            waited = time.perf_counter() - queued_at
+            try:
+                facets, elapsed = await loop.run_in_executor(self._pool, _parse, html_content, toggle_id)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.stats.record(elapsed, waited)
+                get_metrics().observe('parse', elapsed)
+                if not future.done():
+                    future.set_result(facets)
+            finally:
+                self._queue.task_done()
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._pool.shutdown(wait=True)
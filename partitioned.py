@@ -0,0 +1,181 @@
+import os
+import random
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import gp2
+import grp1
+import Task1
+from hierarchy import HierarchyIndex
+from leader_matching import LeaderMatcher
+
+# Read-only data every worker needs (the org's reporting lines), set once per worker
+# process by the pool initializer instead of being pickled with every task. With the
+# default fork start method the workers inherit it without any copying at all
+_shared: Dict[str, object] = {}
+
+
+def _share(shared: Dict[str, object]) -> None:
+    _shared.clear()
+    _shared.update(shared)
+
+
+def shard_by(items: Sequence, key: Callable[[object], Hashable]) -> List[List]:
+    """Items split by key, shards in order of first appearance, items in input order."""
+    shards = defaultdict(list)
+    for item in items:
+        shards[key(item)].append(item)
+    return list(shards.values())
+
+
+def run_shards(task: Callable, shards: Sequence[tuple], shared: Optional[Dict[str, object]] = None,
+               workers: Optional[int] = None) -> List:
+    """task(*shard) for every shard on a process pool; results come back in shard order.
+
+    The first argument of each shard is its list of employees. The largest shards are
+    submitted first so a big city does not start last and hold up the merge. With one
+    worker or one shard everything runs in this process.
+    """
+    shared = shared or {}
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    if workers <= 1:
+        _share(shared)
+        try:
+            return [task(*shard) for shard in shards]
+        finally:
+            _shared.clear()
+    order = sorted(range(len(shards)), key=lambda i: -len(shards[i][0]))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_share, initargs=(shared,)) as pool:
+        futures = {i: pool.submit(task, *shards[i]) for i in order}
+        return [futures[i].result() for i in range(len(shards))]
+
+
+class _Candidate:
+    # The fields LeaderMatcher reads, rebuilt in the worker from plain tuples
+    __slots__ = ['id', 'grade', 'manager', 'business', 'city']
+
+    def __init__(self, id, grade, manager, business, city):
+        self.id = id
+        self.grade = grade
+        self.manager = manager
+        self.business = business
+        self.city = city
+
+
+def _match_city(rows: List[tuple], min_members: int, max_members: int):
+    # Runs in a worker process
+    employees = [_Candidate(*row) for row in rows]
+    matcher = LeaderMatcher(employees, _shared['hierarchy'], min_members, max_members)
+    groups, reasons = matcher.run()
+    grouped = [leader for leader in matcher.leaders if matcher.members[leader]]
+    ungrouped = [leader for leader in matcher.leaders if not matcher.members[leader]]
+    return list(zip(grouped, groups)), [(leader, employees[leader].id) for leader in ungrouped], reasons
+
+
+def partitioned_leaders(employees: Sequence, min_group: int, max_group: int, hierarchy: HierarchyIndex = None,
+                        workers: Optional[int] = None) -> Tuple[List[List[str]], Dict[str, str]]:
+    """match_leaders with one task per city; the same groups and reasons, in the same order.
+
+    Leaders only take members from their own city, and LeaderMatcher keeps its state per
+    city, so the cities are independent. Reporting lines cross cities, so every worker
+    gets the hierarchy of the whole org.
+    """
+    if hierarchy is None:
+        hierarchy = HierarchyIndex.from_employees(employees)
+    cities = shard_by(range(len(employees)), lambda i: employees[i].city)
+    shards = [([(employees[i].id, employees[i].grade, employees[i].manager, employees[i].business,
+                 employees[i].city) for i in rows], min_group - 1, max_group - 1) for rows in cities]
+    results = run_shards(_match_city, shards, {'hierarchy': hierarchy}, workers)
+
+    # Back to input order: a city's rows are ascending, so map each leader to its row
+    groups, left = [], []
+    for rows, (city_groups, city_left, reasons) in zip(cities, results):
+        groups.extend((rows[leader], group) for leader, group in city_groups)
+        left.extend((rows[leader], emp_id, reasons[emp_id]) for leader, emp_id in city_left)
+    groups.sort(key=lambda item: item[0])
+    left.sort(key=lambda item: item[0])
+    return [group for _, group in groups], {emp_id: reason for _, emp_id, reason in left}
+
+
+def _grp1_city(employees: List[grp1.Employee]):
+    # Runs in a worker process
+    groups, ungrouped = grp1.group_city(employees, _shared['hierarchy'])
+    return groups, [emp.id for emp in ungrouped]
+
+
+def _grp1_timezone(employees: List[grp1.Employee]):
+    # Runs in a worker process
+    return grp1.group_timezone(employees)
+
+
+def partitioned_grp1(emp_dict: Dict[str, grp1.Employee], hierarchy: HierarchyIndex,
+                     workers: Optional[int] = None) -> List[List[str]]:
+    """grp1's city pass with one task per city, then its time zone pass one task per time zone.
+
+    Same groups in the same order as the serial version: city groups in city order, then
+    the leftovers of all cities by time zone.
+    """
+    cities = shard_by(emp_dict.values(), lambda emp: emp.city)
+    results = run_shards(_grp1_city, [(city,) for city in cities], {'hierarchy': hierarchy}, workers)
+    groups = [group for city_groups, _ in results for group in city_groups]
+    ungrouped = [emp_dict[emp_id] for _, left in results for emp_id in left]
+
+    timezones = shard_by(ungrouped, lambda emp: emp.timezone)
+    for tz_groups in run_shards(_grp1_timezone, [(tz,) for tz in timezones], workers=workers):
+        groups.extend(tz_groups)
+    return groups
+
+
+def _gp2_pairs(employees: List[gp2.Employee]):
+    # Runs in a worker process
+    return gp2.pair_within(employees, _shared['hierarchy'], set())
+
+
+def partitioned_gp2(employees: List[gp2.Employee], hierarchy: HierarchyIndex,
+                    workers: Optional[int] = None) -> List[Tuple[str, str]]:
+    """gp2's pairing by city, one task per city, then by time zone for whoever is left.
+
+    Same pairs in the same order as the serial version.
+    """
+    shared = {'hierarchy': hierarchy}
+    cities = shard_by(employees, lambda emp: emp.city)
+    pairs = [pair for city_pairs in run_shards(_gp2_pairs, [(city,) for city in cities], shared, workers)
+             for pair in city_pairs]
+
+    used = {emp_id for pair in pairs for emp_id in pair}
+    timezones = [[emp for emp in tz if emp.id not in used] for tz in shard_by(employees, lambda emp: emp.timezone)]
+    for tz_pairs in run_shards(_gp2_pairs, [(tz,) for tz in timezones], shared, workers):
+        pairs.extend(tz_pairs)
+    return pairs
+
+
+def _task1_pool(pool: List[Task1.Employee], min_group_size: int, max_group_size: int, seed: str):
+    # Runs in a worker process; groups come back as positions in the pool
+    position = {id(emp): i for i, emp in enumerate(pool)}
+    groups = Task1.groups_from_pool(list(pool), min_group_size, max_group_size, random.Random(seed).shuffle)
+    return [[position[id(emp)] for emp in group] for group in groups]
+
+
+def partitioned_task1(employees: Dict[str, Task1.Employee], min_group_size: int = 3, max_group_size: int = 5,
+                      workers: Optional[int] = None, seed: int = 0) -> List[List[Task1.Employee]]:
+    """Task1's pools, one task per city and then per time zone for whoever is left.
+
+    Each pool is shuffled by its own generator, seeded from `seed` and the city or time
+    zone, so the result depends on the seed alone and not on the number of workers or
+    the order the pools finish in. It is not the serial result, which uses the global
+    random state.
+    """
+    cities = shard_by(employees.values(), lambda emp: emp.city)
+    shards = [(city, min_group_size, max_group_size, f'{seed}:city:{city[0].city}') for city in cities]
+    groups = [[city[i] for i in group]
+              for city, city_groups in zip(cities, run_shards(_task1_pool, shards, workers=workers))
+              for group in city_groups]
+
+    grouped = {id(emp) for group in groups for emp in group}
+    timezones = [[emp for emp in tz if id(emp) not in grouped]
+                 for tz in shard_by(employees.values(), lambda emp: emp.time_zone)]
+    shards = [(tz, min_group_size, max_group_size, f'{seed}:tz:{tz[0].time_zone}') for tz in timezones if tz]
+    for (tz, *_), tz_groups in zip(shards, run_shards(_task1_pool, shards, workers=workers)):
+        groups.extend([tz[i] for i in group] for group in tz_groups)
+    return groups
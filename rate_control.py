@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+import time
+from typing import List, Optional
+
+THROTTLE_STATUSES = {429, 503}
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by the latency and errors of completed requests.
+
+    Callers take a slot with acquire() before sending a request and hand it back with
+    release(), passing the request's latency and status (None for a connection error
+    or timeout). Every `window` completions the limit is re-evaluated: it grows by
+    `increase` while the window's p95 stays within `latency_tolerance` times the best
+    p95 seen so far and errors stay under `max_error_rate`, and is multiplied by
+    `decrease` otherwise. A 429/503 cuts the limit right away, at most once per window,
+    so a burst of throttled responses does not collapse it to the minimum.
+
+    state() reports the current limit, requests in flight and the last window's
+    figures; with `state_path` the same dict is written there as JSON on every change.
+    """
+
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 64, window: int = 20,
+                 increase: float = 1.0, decrease: float = 0.5, latency_tolerance: float = 2.0,
+                 max_error_rate: float = 0.05, state_path: Optional[str] = None):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.state_path = state_path
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self.completed = 0
+        self.increases = 0
+        self.decreases = 0
+        self.baseline_p95: Optional[float] = None
+        self.last_p95: Optional[float] = None
+        self.last_error_rate = 0.0
+        self.last_change = 'start'
+        self._latencies: List[float] = []
+        self._errors = 0
+        self._throttled_in_window = False
+        self._started = time.monotonic()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, elapsed: float, status: Optional[int]) -> None:
+        changed = False
+        with self._cond:
+            self.in_flight -= 1
+            self.completed += 1
+            self._latencies.append(elapsed)
+            if status is None or status >= 500 or status == 429:
+                self._errors += 1
+            if status in THROTTLE_STATUSES and not self._throttled_in_window:
+                # Back off now rather than at the end of the window
+                self._throttled_in_window = True
+                self._set_limit(self.limit * self.decrease, f'throttled ({status})')
+                changed = True
+            if len(self._latencies) >= self.window:
+                self._evaluate()
+                changed = True
+            self._cond.notify_all()
+        if changed and self.state_path:
+            self._write_state()
+
+    def _evaluate(self) -> None:
+        latencies = sorted(self._latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        error_rate = self._errors / len(latencies)
+        self.last_p95, self.last_error_rate = p95, error_rate
+        if error_rate > self.max_error_rate:
+            if not self._throttled_in_window:
+                self._set_limit(self.limit * self.decrease, f'error rate {error_rate:.0%}')
+        elif self.baseline_p95 is not None and p95 > self.latency_tolerance * self.baseline_p95:
+            self._set_limit(self.limit * self.decrease, f'p95 {p95 * 1000:.0f}ms')
+        else:
+            if self.baseline_p95 is None or p95 < self.baseline_p95:
+                self.baseline_p95 = p95
+            self._set_limit(self.limit + self.increase, 'healthy')
+        self._latencies = []
+        self._errors = 0
+        self._throttled_in_window = False
+
+    def _set_limit(self, limit: float, reason: str) -> None:
+        limit = min(max(limit, float(self.min_limit)), float(self.max_limit))
+        if limit > self.limit:
+            self.increases += 1
+        elif limit < self.limit:
+            self.decreases += 1
+        self.limit = limit
+        self.last_change = reason
+
+    def state(self) -> dict:
+        with self._cond:
+            elapsed = time.monotonic() - self._started
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'requests_per_sec': self.completed / elapsed if elapsed else 0.0,
+                'p95': self.last_p95,
+                'baseline_p95': self.baseline_p95,
+                'error_rate': self.last_error_rate,
+                'increases': self.increases,
+                'decreases': self.decreases,
+                'last_change': self.last_change,
+            }
+
+    def _write_state(self) -> None:
+        with self._write_lock:
+            tmp = self.state_path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump(self.state(), f)
+            os.replace(tmp, self.state_path)
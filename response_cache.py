@@ -0,0 +1,140 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from facet_query import cache_key
+
+
+class CacheEntry(NamedTuple):
+    url: str
+    body: bytes
+    headers: dict
+    stored_at: float
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get('Last-Modified')
+
+
+def normalize_url(url: str) -> str:
+    # Same logical facet query (any parameter order, counts or labels) is the same cache entry
+    return cache_key(url)
+
+
+class ResponseCache:
+    """Persistent response cache for facet requests, stored zlib-compressed in SQLite.
+
+    Entries younger than `ttl` seconds are served without a request; older ones are
+    revalidated with If-None-Match / If-Modified-Since. The store is kept under
+    `max_bytes` of compressed body by evicting the least recently used entries.
+    """
+
+    # Only the validators and content type are worth keeping from the response headers
+    KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+    def __init__(self, path: str, ttl: float = 24 * 3600, max_bytes: int = 256 * 1024 * 1024,
+                 compression_level: int = 6):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._conn.commit()
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT url, headers, body, stored_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+        return CacheEntry(row[0], zlib.decompress(row[2]), json.loads(row[1]), row[3])
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry.stored_at < self.ttl
+
+    def store(self, url: str, response: requests.Response) -> None:
+        headers = {name: response.headers[name] for name in self.KEPT_HEADERS if name in response.headers}
+        body = zlib.compress(response.content, self.compression_level)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (normalize_url(url), url, json.dumps(headers), body, len(body), now, now))
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str) -> None:
+        # A 304 means the stored body is still current; restart its TTL
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?',
+                               (now, now, normalize_url(url)))
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at').fetchall():
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def entries(self) -> Iterator[Tuple[str, CacheEntry]]:
+        # Every stored response with its key, e.g. for replaying a recorded crawl
+        with self._lock:
+            rows = self._conn.execute('SELECT key, url, headers, body, stored_at FROM responses').fetchall()
+        for key, url, headers, body, stored_at in rows:
+            yield key, CacheEntry(url, zlib.decompress(body), json.loads(headers), stored_at)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return {'entries': entries, 'bytes': size}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def cached_response(entry: CacheEntry) -> requests.Response:
+    # Rebuild a Response so callers can keep using .text / .content / .json()
+    response = requests.Response()
+    response.status_code = 200
+    response.url = entry.url
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response._content = entry.body
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers) or 'utf-8'
+    return response
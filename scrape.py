@@ -1,311 +1,282 @@
-import requests
+import argparse
 from bs4 import BeautifulSoup
 import json
 
-# URL for scraping jobs by country
-country_template="https://jobs.citi.com/search-jobs/results?ActiveFacetID={industry}&CurrentPage=1&RecordsPerPage=10&Distance=50&RadiusUnitType=0&Keywords=&Location=&ShowRadius=False&IsPagination=False&CustomFacetName=&FacetTerm=&FacetType=0&FacetFilters%5B0%5D.ID={industry}&FacetFilters%5B0%5D.FacetType=5&FacetFilters%5B0%5D.Count={count}&FacetFilters%5B0%5D.Display={industry}&FacetFilters%5B0%5D.IsApplied=true&FacetFilters%5B0%5D.FieldName=industry&SearchResultsModuleName=SearchResults+-+Technology&SearchFiltersModuleName=Search+Filters&SortCriteria=0&SortDirection=0&SearchType=6&PostalCode=&ResultsType=0&fc=&fl=&fcf=&afc=&afl=&afcf="
+from http_client import HttpClient, get_client, set_client
+from rate_control import AdaptiveLimiter
+from response_cache import ResponseCache
+from facet_extract import extract_facets
+from jsonl_sink import JsonlSink, iter_records
+from checkpoint import Frontier
+from instrumentation import get_metrics, print_summary, span
+from facet_query import FacetFilter, FacetQuery, DedupingClient, INDUSTRY, COUNTRY, REGION
 
-url_template = "https://jobs.citi.com/search-jobs/results?ActiveFacetID={id}&CurrentPage=1&RecordsPerPage=10&Distance=50&RadiusUnitType=0&Keywords=&Location=&ShowRadius=False&IsPagination=False&CustomFacetName=&FacetTerm=&FacetType=0&FacetFilters%5B0%5D.ID={id}&FacetFilters%5B0%5D.FacetType=2&FacetFilters%5B0%5D.Count={count}&FacetFilters%5B0%5D.Display={country}&FacetFilters%5B0%5D.IsApplied=true&FacetFilters%5B0%5D.FieldName=&SearchResultsModuleName=SearchResults+-+Technology&SearchFiltersModuleName=Search+Filters&SortCriteria=0&SortDirection=0&SearchType=5&PostalCode=&ResultsType=0&fc=&fl=&fcf=&afc=&afl=&afcf="
+BASE_URL = "https://jobs.citi.com"
+search_url = BASE_URL + "/search-jobs"
 
-city_template = "https://jobs.citi.com/search-jobs/results?ActiveFacetID={id}&CurrentPage=1&RecordsPerPage=10&Distance=50&RadiusUnitType=0&Keywords=&Location=&ShowRadius=False&IsPagination=False&CustomFacetName=&FacetTerm=&FacetType=0&FacetFilters%5B0%5D.ID={industry}&FacetFilters%5B0%5D.FacetType=5&FacetFilters%5B0%5D.Count=14&FacetFilters%5B0%5D.Display={industry}&FacetFilters%5B0%5D.IsApplied=true&FacetFilters%5B0%5D.FieldName=industry&FacetFilters%5B1%5D.ID={country_id}&FacetFilters%5B1%5D.FacetType=2&FacetFilters%5B1%5D.Count={country_count}&FacetFilters%5B1%5D.Display={country}&FacetFilters%5B1%5D.IsApplied=true&FacetFilters%5B1%5D.FieldName=&FacetFilters%5B2%5D.ID={id}&FacetFilters%5B2%5D.FacetType=3&FacetFilters%5B2%5D.Count={count}&FacetFilters%5B2%5D.Display={region}%2C+{country}&FacetFilters%5B2%5D.IsApplied=true&FacetFilters%5B2%5D.FieldName=&SearchResultsModuleName=SearchResults+-+Technology&SearchFiltersModuleName=Search+Filters&SortCriteria=0&SortDirection=0&SearchType=6&PostalCode=&ResultsType=0&fc=&fl=&fcf=&afc=&afl=&afcf="
-# Function to fetch the list of countries from the main page
 
-def fetch_cities_by_region(country_name,fileds,industry):
-    country_encoded = country_name[0].replace(" ", "+")
-    print(country_encoded)
+def country_url(industry_name):
+    # Countries listed under one industry
+    industry = FacetFilter(industry_name[0], INDUSTRY, industry_name[0], industry_name[1], 'industry')
+    return FacetQuery((industry,)).url()
 
-    # Use the URL template with the encoded country name
-    url = city_template.format(country=country_encoded, country_count =country_name[1],country_id=country_name[2],region=fileds[0],id=fileds[2],count=fileds[1],industry=industry)
 
-    # Send the GET request to f
-    # etch the page
-    response = requests.get(url)
-    data = json.loads(response.text)
-    html_content = data["filters"]
+def region_url(country_name):
+    country = FacetFilter(country_name[2], COUNTRY, country_name[0], country_name[1])
+    return FacetQuery((country,), search_type=5).url()
 
-# Clean up the string to make it a valid HTML
-    html_content = html_content.replace('\"', '').replace('\r\n', '').replace('  ', ' ').strip()
 
-# Parse the cleaned HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-    region_section = soup.find('button', {'id': 'city-toggle'})
+def city_url(country_name, fileds, industry):
+    # `industry` is the plain industry name; FacetQuery does the URL encoding
+    filters = (FacetFilter(industry, INDUSTRY, industry, '14', 'industry'),
+               FacetFilter(country_name[2], COUNTRY, country_name[0], country_name[1]),
+               FacetFilter(fileds[2], REGION, f"{fileds[0]}, {country_name[0]}", fileds[1]))
+    return FacetQuery(filters).url()
 
 
-    # Navigate to the parent section and then to the <ul> containing countries
-    region_list = region_section.find_next('ul', class_='search-filter-list')
+def clean_filters(html_content):
+    # Clean up the string to make it a valid HTML
+    return html_content.replace('\"', '').replace('\r\n', '').replace('  ', ' ').strip()
 
-    # List to store country names
-    cities = []
 
-    # Loop through each <li> element and extract the country name
-    for li in region_list.find_all('li'):
-        try:
-            # Extract the country name from the <span> with class 'filter__facet-name'
-            city_name=li.find('span', class_='filter__facet-name').text.strip()
-            cities.append(city_name)
-            
-        except AttributeError:
-            # Skip if there is no country name found
-            continue
-    return cities
+def fetch(url):
+    with span('fetch', url=url) as attrs:
+        response = get_client().get(url)
+        attrs.update(status=response.status_code, bytes=len(response.content))
+    return response
 
 
-def fetch_industry():
-    url = "https://jobs.citi.com/search-jobs"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, "html.parser")
+def fetch_filters(url):
+    # The results endpoint returns JSON; the facet lists live in the "filters" HTML
+    response = fetch(url)
+    with span('decode', url=url):
+        data = json.loads(response.text)
+    with span('clean', url=url):
+        return clean_filters(data["filters"])
+
 
-    # print(soup.prettify())
+def parse_facets(html_content, toggle_id):
+    # Returns [name, count, data-id] for every facet under the given toggle button
+    with span('parse', toggle=toggle_id):
+        return extract_facets(html_content, toggle_id)
 
-    industry_section = soup.find('button', {'id': 'industry-toggle'})
-    industry_list = industry_section.find_next('ul', class_='search-filter-list')
 
-    # List to store country names
-    industry_names = []
+def parse_facets_bs4(html_content, toggle_id):
+    # Reference BeautifulSoup implementation; facet_extract.check_parity compares against it
+    soup = BeautifulSoup(html_content, "html.parser")
+    section = soup.find('button', {'id': toggle_id})
+    if section is None:
+        return []
+
+    # Navigate to the parent section and then to the <ul> containing the facets
+    facet_list = section.find_next('ul', class_='search-filter-list')
+    if facet_list is None:
+        return []
 
-    # Loop through each <li> element and extract the country name
-    for li in industry_list.find_all('li'):
-        fileds=[]
+    facets = []
+    for li in facet_list.find_all('li'):
         try:
-            # Extract the country name from the <span> with class 'filter__facet-name'
-            # country_name = li.find('span', class_='filter__facet-name').text.strip()
-            fileds.append(li.find('span', class_='filter__facet-name').text.strip()) # Country name
-            fileds.append(li.find('span', class_='filter__facet-count').text.strip())  # Count
-            fileds.append(li.find('input')['data-id'])
-            print(fileds)
-            # print(count)
-            industry_names.append(fileds)
-        except AttributeError:
-            # Skip if there is no country name found
+            name = li.find('span', class_='filter__facet-name').text.strip()
+            count = li.find('span', class_='filter__facet-count').text.strip()
+            facets.append([name, count, li.find('input')['data-id']])
+        except (AttributeError, TypeError, KeyError):
+            # Skip if there is no name, count or id found
             continue
-    print(len(industry_names))
-    return industry_names
+    return facets
 
-def fetch_country_list():
-    url = "https://jobs.citi.com/search-jobs"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, "html.parser")
 
-    # print(soup.prettify())
+# Function to fetch the list of countries from the main page
+def fetch_cities_by_region(country_name,fileds,industry):
+    print(country_name[0].replace(" ", "+"))
 
-    industry_section = soup.find('button', {'id': 'industry-toggle'})
-    country_list = country_section.find_next('ul', class_='search-filter-list')
+    # Use the URL template with the encoded country name
+    html_content = fetch_filters(city_url(country_name, fileds, industry))
 
-    # List to store country names
-    country_names = []
+    # List to store city names
+    cities = [facet[0] for facet in parse_facets(html_content, 'city-toggle')]
+    return cities
 
-    # Loop through each <li> element and extract the country name
-    for li in country_list.find_all('li'):
-        fileds=[]
-        try:
-            # Extract the country name from the <span> with class 'filter__facet-name'
-            # country_name = li.find('span', class_='filter__facet-name').text.strip()
-            fileds.append(li.find('span', class_='filter__facet-name').text.strip()) # Country name
-            fileds.append(li.find('span', class_='filter__facet-count').text.strip())  # Count
-            fileds.append(li.find('input')['data-id'])
-            print(fileds)
-            # print(count)
-            country_names.append(fileds)
-        except AttributeError:
-            # Skip if there is no country name found
-            continue
-    print(len(country_names))
-    return country_names
 
-    #Find the section where the country-toggle button is present
-    country_section = soup.find('button', {'id': 'country-toggle'})
+def fetch_industry():
+    response = fetch(search_url)
 
-    # Navigate to the parent section and then to the <ul> containing countries
-    country_list = country_section.find_next('ul', class_='search-filter-list')
+    # List to store industry names
+    industry_names = parse_facets(response.content, 'industry-toggle')
+    for fileds in industry_names:
+        print(fileds)
+    print(len(industry_names))
+    return industry_names
 
-    # List to store country names
-    country_names = []
+def fetch_country_list():
+    response = fetch(search_url)
 
-    # Loop through each <li> element and extract the country name
-    for li in country_list.find_all('li'):
-        fileds=[]
-        try:
-            # Extract the country name from the <span> with class 'filter__facet-name'
-            # country_name = li.find('span', class_='filter__facet-name').text.strip()
-            fileds.append(li.find('span', class_='filter__facet-name').text.strip()) # Country name
-            fileds.append(li.find('span', class_='filter__facet-count').text.strip())  # Count
-            fileds.append(li.find('input')['data-id'])
-            print(fileds)
-            # print(count)
-            country_names.append(fileds)
-        except AttributeError:
-            # Skip if there is no country name found
-            continue
+    #Find the section where the country-toggle button is present
+    country_names = parse_facets(response.content, 'country-toggle')
+    for fileds in country_names:
+        print(fileds)
     print(len(country_names))
     return country_names
 
 # Function to fetch regions for each country
 def fetch_regions_for_country(country_name,industry):
-    # Replace spaces with "+" in the country name for URL encoding
-    country_encoded = country_name[0].replace(" ", "+")
-    print(country_encoded)
+    print(country_name[0].replace(" ", "+"))
 
     # Use the URL template with the encoded country name
-    url = url_template.format(country=country_encoded, count =country_name[1],id=country_name[2])
-
-    # Send the GET request to f
-    # etch the page
-    response = requests.get(url)
-    data = json.loads(response.text)
-    html_content = data["filters"]
+    html_content = fetch_filters(region_url(country_name))
 
-# Clean up the string to make it a valid HTML
-    html_content = html_content.replace('\"', '').replace('\r\n', '').replace('  ', ' ').strip()
-
-# Parse the cleaned HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # soup = BeautifulSoup(response.content, "html.parser")
-
-    # print(soup.prettify('button'))
-
-
-    region_section = soup.find('button', {'id': 'region-toggle'})
-
-
-    # Navigate to the parent section and then to the <ul> containing countries
-    region_list = region_section.find_next('ul', class_='search-filter-list')
-
-    # List to store country names
     regions = {}
-
-    # Loop through each <li> element and extract the country name
-    for li in region_list.find_all('li'):
-        fields=[]
-        try:
-            # Extract the country name from the <span> with class 'filter__facet-name'
-            fields.append(li.find('span', class_='filter__facet-name').text.strip()) # Country name
-            fields.append(li.find('span', class_='filter__facet-count').text.strip())  # Count
-            fields.append(li.find('input')['data-id'])
-            print(fields)
-            regions[fields[0]]=fetch_cities_by_region(country_name,fields,industry)
-            regions.append(region_name)
-            
-        except AttributeError:
-            # Skip if there is no country name found
-            continue
-
-    # regions = []
-    
-    # # Parse the region elements (adjust selectors based on actual HTML)
-    # region_elements = soup.select("ul.search-filter-list.expandable-childlist-open > li")
-    # for region in region_elements:
-    #     try:
-    #         label = region.find("label")
-    #         region_name = label.find("span", class_="filter__facet-name").text.strip()
-    #         if region_name:
-    #             regions.append(region_name)
-    #     except Exception as e:
-    #         print(f"Could not extract region for {country_name}: {e}")
+    for fields in parse_facets(html_content, 'region-toggle'):
+        print(fields)
+        regions[fields[0]]=fetch_cities_by_region(country_name,fields,industry)
     print(regions)
-    
+
     return regions
 
 def fetch_countries_and_regions(industry_name):
-    # Replace spaces with "+" in the country name for URL encoding
-    industry_encoded = industry_name[0].replace(" ", "+")
-
-    # Use the URL template with the encoded country name
-    url = country_template.format(industry=industry_encoded, count =industry_name[1])
+    # Use the URL template with the industry facet
+    html_content = fetch_filters(country_url(industry_name))
 
-    # Send the GET request to f
-    # etch the page
-    response = requests.get(url)
-    data = json.loads(response.text)
-    html_content = data["filters"]
-
-    # Clean up the string to make it a valid HTML
-    html_content = html_content.replace('\"', '').replace('\r\n', '').replace('  ', ' ').strip()
-
-    # Parse the cleaned HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # soup = BeautifulSoup(response.content, "html.parser")
-
-    # print(soup.prettify('button'))
-
-
-    region_section = soup.find('button', {'id': 'country-toggle'})
-
-    print(region_section)
-
-    # Navigate to the parent section and then to the <ul> containing countries
-    region_list = region_section.find_next('ul', class_='search-filter-list')
-
-    # List to store country names
     countries = {}
+    for fileds in parse_facets(html_content, 'country-toggle'):
+        print(fileds)
+        countries[fileds[0]]=fetch_regions_for_country(fileds, industry_name[0])
 
-    # Loop through each <li> element and extract the country name
-    for li in region_list.find_all('li'):
-
-        fileds=[]
-        try:
-            # Extract the country name from the <span> with class 'filter__facet-name'
-            # country_name = li.find('span', class_='filter__facet-name').text.strip()
-            fileds.append(li.find('span', class_='filter__facet-name').text.strip()) # Country name
-            fileds.append(li.find('span', class_='filter__facet-count').text.strip())  # Count
-            fileds.append(li.find('input')['data-id'])
-            print(fileds)
-            countries[fileds[0]]=fetch_regions_for_country(fileds, industry_encoded)
-            # print(count)
-        except AttributeError:
-            continue
-            # Skip if the
-        # try:
-        #     # Extract the country name from the <span> with class 'filter__facet-name'
-        #     region_name = li.find('span', class_='filter__facet-name').text.strip()
-        #     regions.append(region_name)
-        # except AttributeError:
-        #     # Skip if there is no country name found
-        #     continue
-
-
-    # print(regions)
     return countries
 
 def main():
-    # Step 1: Fetch country names
-    industries = fetch_industry()
-    countries_by_industry={}
-
-    for industry in industries:
-        print(f"Fetching regions for {industry}...")
-        countries = fetch_countries_and_regions(industry)
-        countries_by_industry[industry[0]] = countries
-
-    # # Step 3: Output results
-    # for country, regions in regions_by_country.items():
-    #     print(f"{country}: {', '.join(regions)}")
-
-    # # Optionally, write the results to a file
-    # with open("countries_and_regions.txt", "w") as f:
-    #     for country, regions in regions_by_country.items():
-    #         f.write(f"{country}: {', '.join(regions)}\n")
-    # countries = fetch_country_list()
-
-    # # Dictionary to store countries and corresponding regions
-    # regions_by_country = {}
-
-    # # Step 2: Loop through each country and fetch its regions
-    # for country in countries:
-    #     print(f"Fetching regions for {country}...")
-    #     regions = fetch_regions_for_country(country)
-    #     regions_by_country[country[0]] = regions
-
-    # # Step 3: Output results
-    # for country, regions in regions_by_country.items():
-    #     print(f"{country}: {', '.join(regions)}")
-
-    # # Optionally, write the results to a file
-    # with open("countries_and_regions.txt", "w") as f:
-    #     for country, regions in regions_by_country.items():
-    #         f.write(f"{country}: {', '.join(regions)}\n")
-    print(countries_by_industry)
+    parser = argparse.ArgumentParser(description="Crawl the jobs.citi.com industry/country/region/city facets")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="fan out each level of the crawl concurrently")
+    parser.add_argument("--trio", dest="use_trio", action="store_true",
+                        help="concurrent crawl on trio nurseries with per-country deadlines")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="maximum number of requests in flight (async and trio modes)")
+    parser.add_argument("--rate", type=float, default=10.0,
+                        help="maximum requests per second per host (async mode)")
+    parser.add_argument("--base-url", default=None,
+                        help="site to crawl instead of jobs.citi.com, e.g. a local stand-in serving recorded payloads")
+    parser.add_argument("--pool-size", type=int, default=16, help="keep-alive connections per host")
+    parser.add_argument("--timeout", type=float, default=30.0, help="read timeout per request, in seconds")
+    parser.add_argument("--retries", type=int, default=4, help="retries for timeouts, connection errors and 429/5xx")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="adjust requests in flight to the site's latency and errors (AIMD), up to --concurrency")
+    parser.add_argument("--adaptive-state", default=None,
+                        help="JSON file the adaptive limiter keeps its current limit and figures in")
+    parser.add_argument("--cache", default=None, help="SQLite file for the on-disk response cache")
+    parser.add_argument("--cache-ttl", type=float, default=24 * 3600,
+                        help="seconds a cached response is used without revalidating it")
+    parser.add_argument("--cache-size", type=float, default=256, help="cache size limit in MB (compressed)")
+    parser.add_argument("--incremental", metavar="SNAPSHOT", default=None,
+                        help="only re-crawl facets whose counts changed since SNAPSHOT, then update it")
+    parser.add_argument("--diff", default=None, help="write added/removed/changed facets as JSON lines (incremental mode)")
+    parser.add_argument("--output", default=None,
+                        help="stream every facet to this JSON lines file as it is resolved (.gz to compress)")
+    parser.add_argument("--counts", default=None,
+                        help="append this crawl's facet counts to a count_store history file (needs --output)")
+    parser.add_argument("--checkpoint", default=None,
+                        help="SQLite crawl frontier; re-running with the same file resumes an interrupted crawl")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="parse payloads on this many worker processes instead of inline (async modes)")
+    parser.add_argument("--parse-queue", type=int, default=64,
+                        help="payloads allowed to wait for a parse worker before fetching is held back")
+    parser.add_argument("--fetcher", choices=["http", "browser"], default="http",
+                        help="plain HTTP client, or a pool of headless Chrome sessions for dynamic pages")
+    parser.add_argument("--browsers", type=int, default=2, help="warm browser sessions in the pool (browser fetcher)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve stage histograms in Prometheus format on this port at /metrics")
+    parser.add_argument("--metrics-file", default=None,
+                        help="write the Prometheus metrics to this file at the end of the run")
+    parser.add_argument("--spans", default=None,
+                        help="JSON lines file with one span (stage, url, status, bytes, seconds) per step")
+    parser.add_argument("--country-timeout", type=float, default=None,
+                        help="seconds each country subtree may take before it is cancelled (trio mode)")
+    parser.add_argument("--per-country", type=int, default=None,
+                        help="requests in flight within one country subtree (trio mode)")
+    args = parser.parse_args()
+    if args.output and not (args.use_async or args.incremental or args.use_trio):
+        parser.error("--output needs --async, --incremental or --trio")
+    if args.counts and not args.output:
+        parser.error("--counts needs --output")
+    if args.checkpoint and not (args.use_async or args.incremental):
+        parser.error("--checkpoint needs --async or --incremental")
+    if args.adaptive and args.fetcher == "browser":
+        parser.error("--adaptive works with the http fetcher only")
+
+    if args.fetcher == "browser":
+        from browser_fetch import BrowserFetcher
+        client = set_client(BrowserFetcher(sessions=args.browsers, timeout=args.timeout, base_url=args.base_url))
+    else:
+        cache = None
+        if args.cache:
+            cache = ResponseCache(args.cache, ttl=args.cache_ttl, max_bytes=int(args.cache_size * 1024 * 1024))
+        concurrent = args.use_async or args.incremental or args.use_trio
+        limiter = None
+        if args.adaptive:
+            limiter = AdaptiveLimiter(initial=min(4, args.concurrency), max_limit=args.concurrency,
+                                      state_path=args.adaptive_state)
+        client = set_client(HttpClient(pool_size=max(args.pool_size, args.concurrency if concurrent else 1),
+                                       timeout=args.timeout, retries=args.retries, base_url=args.base_url,
+                                       cache=cache, limiter=limiter))
+    # Equivalent facet queries reached through different paths are fetched once per crawl
+    set_client(DedupingClient(client))
+
+    metrics = get_metrics()
+    if args.spans:
+        metrics.span_log = JsonlSink(args.spans)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+
+    sink = JsonlSink(args.output) if args.output else None
+    frontier = Frontier(args.checkpoint) if args.checkpoint else None
+    try:
+        if args.incremental:
+            from incremental import crawl_incremental, to_nested
+            tree = crawl_incremental(args.incremental, args.diff, concurrency=args.concurrency,
+                                     rate_per_host=args.rate, sink=sink, frontier=frontier,
+                                     parse_workers=args.parse_workers, parse_queue=args.parse_queue)
+            countries_by_industry = to_nested(tree)
+        elif args.use_async:
+            from async_crawl import crawl
+            countries_by_industry = crawl(concurrency=args.concurrency, rate_per_host=args.rate, sink=sink,
+                                          frontier=frontier, parse_workers=args.parse_workers,
+                                          parse_queue=args.parse_queue)
+        elif args.use_trio:
+            import math
+            from trio_crawl import crawl
+            countries_by_industry = crawl(concurrency=args.concurrency, per_country=args.per_country,
+                                          country_timeout=args.country_timeout or math.inf, sink=sink)
+        else:
+            # Step 1: Fetch industry names
+            industries = fetch_industry()
+            countries_by_industry={}
+
+            for industry in industries:
+                print(f"Fetching regions for {industry}...")
+                countries = fetch_countries_and_regions(industry)
+                countries_by_industry[industry[0]] = countries
+
+        print(countries_by_industry)
+        print(client.stats.summary())
+    finally:
+        # Quits the browser sessions too, and closes the cache
+        get_client().close()
+        print_summary(metrics)
+        if args.metrics_file:
+            metrics.write(args.metrics_file)
+        if metrics.span_log is not None:
+            metrics.span_log.close()
+        metrics.close()
+        if sink is not None:
+            sink.close()
+        if frontier is not None:
+            print(frontier.counts())
+            frontier.close()
+
+    if args.counts:
+        from count_store import CountStore
+        store = CountStore(args.counts)
+        print(f"recorded crawl {store.record_crawl(iter_records(args.output), source=args.output)} in {args.counts}")
+        store.close()
 
 if __name__ == "__main__":
     main()
@@ -1,61 +1,38 @@
 import streamlit as st
 import pandas as pd
 from typing import List, Dict, Tuple
-from collections import defaultdict
+from group_engine import chunk_ids, month_chunk_ids, groups_from_ids
+from leader_matching import match_leaders
+from employee_store import EmployeeTable
 import time
 import io
+import base64
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill
 import random
 
 class Employee:
+    __slots__ = ['id', 'grade', 'manager', 'business', 'city']
+
     def __init__(self, id: str, grade: str, manager: str, business: str, city: str):
         self.id = id
         self.grade = grade
         self.manager = manager
         self.business = business
         self.city = city
-        self.team = set()
-
-def build_team_hierarchy(employees: List[Employee]) -> None:
-    emp_dict = {emp.id: emp for emp in employees}
-    for emp in employees:
-        current = emp
-        while current.manager and current.manager in emp_dict:
-            emp_dict[current.manager].team.add(emp.id)
-            current = emp_dict[current.manager]
 
 def group_by_business_and_grade(df: pd.DataFrame, min_group: int, max_group: int) -> List[List[str]]:
-    groups = []
-    for business in df['Business'].unique():
-        business_df = df[df['Business'] == business]
-        for grade in business_df['Grade'].unique():
-            grade_df = business_df[business_df['Grade'] == grade]
-            employee_ids = grade_df['EmployeeID'].tolist()
-            while len(employee_ids) >= min_group:
-                group = employee_ids[:max_group]
-                groups.append(group)
-                employee_ids = employee_ids[max_group:]
-    return groups
+    # Chunks of up to max_group per business/grade, in one pass (see group_engine)
+    return groups_from_ids(chunk_ids(df, ['Business', 'Grade'], min_group, max_group), df['EmployeeID'])
 
 def group_by_city_and_grade(df: pd.DataFrame, num_months: int) -> List[List[str]]:
-    groups = []
-    for city in df['City'].unique():
-        city_df = df[df['City'] == city]
-        for grade in city_df['Grade'].unique():
-            grade_df = city_df[city_df['Grade'] == grade]
-            employee_ids = grade_df['EmployeeID'].tolist()
-            num_groups = max(1, len(employee_ids) // num_months)
-            for i in range(num_groups):
-                start = i * num_months
-                end = start + num_months
-                group = employee_ids[start:end]
-                if group:
-                    groups.append(group)
-    return groups
+    # num_months-sized chunks per city/grade, one group per month (see group_engine)
+    return groups_from_ids(month_chunk_ids(df, ['City', 'Grade'], num_months), df['EmployeeID'])
 
 def group_employees_complex(df: pd.DataFrame) -> Tuple[List[List[str]], Dict[str, str]]:
-    # ... [The complex grouping function remains the same] ...
+    # A C15/C16 leader plus 2-3 members, as in Final3 (see leader_matching)
+    employees = EmployeeTable.from_frame(df).employees(Employee)
+    return match_leaders(employees, 3, 4)
 
 def create_download_link(df, filename, color_coded=False):
     output = io.BytesIO()
@@ -72,7 +49,7 @@ def create_download_link(df, filename, color_coded=False):
         # Write data and apply color coding
         colors = [PatternFill(start_color=f"00{random.randint(0, 0xFFFFFF):06x}", end_color=f"00{random.randint(0, 0xFFFFFF):06x}", fill_type="solid") for _ in range(len(df))]
         
-        for row, (_, data_row) in enumerate(df.iterrows(), start=2):
+        for row, data_row in enumerate(df.itertuples(index=False, name=None), start=2):
             for col, value in enumerate(data_row, start=1):
                 cell = sheet.cell(row=row, column=col, value=value)
                 cell.fill = colors[row-2]
@@ -83,7 +60,7 @@ def create_download_link(df, filename, color_coded=False):
             df.to_excel(writer, index=False, sheet_name='Sheet1')
     
     excel_data = output.getvalue()
-    return f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{pd.compat.base64.b64encode(excel_data).decode()}" download="{filename}">Download {filename}</a>'
+    return f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{base64.b64encode(excel_data).decode()}" download="{filename}">Download {filename}</a>'
 
 def main():
     st.title("Employee Grouping Application")
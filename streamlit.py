@@ -1,111 +1,37 @@
 import streamlit as st
 import pandas as pd
 from typing import List, Dict, Tuple
-from collections import defaultdict
+from group_engine import chunk_ids, groups_from_ids
+from leader_matching import match_leaders
+from employee_store import EmployeeTable
 import time
 
 class Employee:
+    __slots__ = ['id', 'grade', 'manager', 'business', 'city']
+
     def __init__(self, id: str, grade: str, manager: str, business: str, city: str):
         self.id = id
         self.grade = grade
         self.manager = manager
         self.business = business
         self.city = city
-        self.team = set()
-
-def build_team_hierarchy(employees: List[Employee]) -> None:
-    emp_dict = {emp.id: emp for emp in employees}
-    for emp in employees:
-        current = emp
-        while current.manager and current.manager in emp_dict:
-            emp_dict[current.manager].team.add(emp.id)
-            current = emp_dict[current.manager]
 
 def group_by_business_and_grade(df: pd.DataFrame, min_group: int, max_group: int) -> List[List[str]]:
-    groups = []
-    for business in df['Business'].unique():
-        business_df = df[df['Business'] == business]
-        for grade in business_df['Grade'].unique():
-            grade_df = business_df[business_df['Grade'] == grade]
-            employee_ids = grade_df['EmployeeID'].tolist()
-            while len(employee_ids) >= min_group:
-                group = employee_ids[:max_group]
-                groups.append(group)
-                employee_ids = employee_ids[max_group:]
-    return groups
+    # Chunks of up to max_group per business/grade, in one pass (see group_engine)
+    return groups_from_ids(chunk_ids(df, ['Business', 'Grade'], min_group, max_group), df['EmployeeID'])
 
 def group_by_city_and_grade(df: pd.DataFrame, min_group: int, max_group: int) -> List[List[str]]:
-    groups = []
-    for city in df['City'].unique():
-        city_df = df[df['City'] == city]
-        for grade in city_df['Grade'].unique():
-            grade_df = city_df[city_df['Grade'] == grade]
-            employee_ids = grade_df['EmployeeID'].tolist()
-            while len(employee_ids) >= min_group:
-                group = employee_ids[:max_group]
-                groups.append(group)
-                employee_ids = employee_ids[max_group:]
-    return groups
-
-def group_employees_complex(df: pd.DataFrame, min_group: int, max_group: int) -> Tuple[List[List[str]], Dict[str, str]]:
-    employees = [Employee(row['EmployeeID'], row['Grade'], row['Manager'], row['Business'], row['City']) 
-                 for _, row in df.iterrows()]
-    
-    build_team_hierarchy(employees)
-    
-    high_grade = [emp for emp in employees if emp.grade in ['C15', 'C16']]
-    others = [emp for emp in employees if emp.grade not in ['C15', 'C16']]
-    
-    city_business_index = defaultdict(lambda: defaultdict(list))
-    for emp in others:
-        city_business_index[emp.city][emp.business].append(emp)
-    
-    groups = []
-    used = set()
-    ungrouped_reasons = {}
-
-    def find_compatible_employees(leader: Employee) -> Tuple[List[Employee], str]:
-        compatible = []
-        same_city_count = 0
-        same_business_count = 0
-        same_team_count = 0
-        for business, emps in city_business_index[leader.city].items():
-            same_city_count += len(emps)
-            if business != leader.business:
-                for emp in emps:
-                    if emp.id not in used:
-                        if emp.id not in leader.team and leader.id not in emp.team:
-                            compatible.append(emp)
-                            if len(compatible) == max_group - 1:
-                                return compatible, ""
-                        else:
-                            same_team_count += 1
-            else:
-                same_business_count += len(emps)
-        
-        reason = ""
-        if len(compatible) < min_group - 1:
-            if same_city_count == 0:
-                reason = f"No other employees in the same city ({leader.city})"
-            elif same_business_count == same_city_count:
-                reason = f"All potential matches in the same business ({leader.business})"
-            elif same_team_count == same_city_count - same_business_count:
-                reason = "All potential matches in the same team hierarchy"
-            else:
-                reason = f"Not enough compatible employees (found {len(compatible)}, need at least {min_group - 1})"
-        
-        return compatible, reason
-
-    for leader in high_grade:
-        matches, reason = find_compatible_employees(leader)
-        if len(matches) >= min_group - 1:
-            group = [leader] + matches[:max_group - 1]
-            groups.append([emp.id for emp in group])
-            used.update(emp.id for emp in group)
-        else:
-            ungrouped_reasons[leader.id] = reason
-
-    return groups, ungrouped_reasons
+    return groups_from_ids(chunk_ids(df, ['City', 'Grade'], min_group, max_group), df['EmployeeID'])
+
+def group_employees_complex(df: pd.DataFrame, min_group: int, max_group: int,
+                            workers: int = 1) -> Tuple[List[List[str]], Dict[str, str]]:
+    # Leaders get members by augmenting paths, so later leaders are not starved (see leader_matching)
+    employees = EmployeeTable.from_frame(df).employees(Employee)
+    if workers != 1:
+        # One city per task on a process pool; same result (see partitioned)
+        from partitioned import partitioned_leaders
+        return partitioned_leaders(employees, min_group, max_group, workers=workers)
+    return match_leaders(employees, min_group, max_group)
 
 def main():
     st.title("Employee Grouping Application")
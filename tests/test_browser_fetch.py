@@ -0,0 +1,177 @@
+import json
+import shutil
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from browser_fetch import BrowserFetcher
+from facet_extract import extract_facets
+from mock_site import facets_html
+from scrape import clean_filters
+
+CHROME = any(shutil.which(name) for name in ('google-chrome', 'google-chrome-stable', 'chromium',
+                                                'chromium-browser', 'chrome'))
+needs_chrome = pytest.mark.skipif(not (CHROME and shutil.which('chromedriver')),
+                                  reason='needs a Chrome binary and chromedriver on PATH')
+
+COUNTRIES = [('United States', 2210, '6252001'), ('India', 1315, '1269750')]
+REGIONS = [('Maharashtra', 288, '1269750-1264418'), ('Tamil Nadu', 71, '1269750-1255053')]
+# A search page as the site serves it: facets in the document, results fetched by XHR,
+# and an image, a stylesheet and a web font the fetcher should never request
+PAGE = '''<!DOCTYPE html><html><head>
+<link rel="stylesheet" href="/static/site.css">
+<style>@font-face { font-family: Brand; src: url(/static/brand.woff2) format("woff2"); }
+body { font-family: Brand, sans-serif; }</style></head>
+<body><img src="/static/logo.png" alt="logo">%s
+<script>
+var request = new XMLHttpRequest();
+request.open("GET", "/search-jobs/results?CurrentPage=1&RecordsPerPage=10");
+request.send();
+</script></body></html>''' % facets_html('country-toggle', COUNTRIES)
+
+
+class FakeDriver:
+    # Just enough of a Chrome session for BrowserFetcher's pool: serves one document per get()
+    def __init__(self):
+        self.crashed = False
+        self.quit_called = False
+        self.pages = 0
+        self._log = []
+
+    def set_page_load_timeout(self, timeout):
+        pass
+
+    def execute_cdp_cmd(self, command, params):
+        if command == 'Network.getResponseBody':
+            return {'body': 'ok', 'base64Encoded': False}
+        return {}
+
+    def get(self, url):
+        if self.crashed:
+            raise WebDriverException('chrome not reachable')
+        self.pages += 1
+        events = [{'method': 'Network.responseReceived',
+                   'params': {'requestId': '1', 'type': 'Document',
+                              'response': {'status': 200, 'url': url, 'headers': {}}}},
+                  {'method': 'Network.loadingFinished', 'params': {'requestId': '1'}}]
+        self._log = [{'message': json.dumps({'message': event})} for event in events]
+
+    def get_log(self, kind):
+        log, self._log = self._log, []
+        return log
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def fake_chrome(monkeypatch):
+    started = []
+    failures = []
+
+    def start(self):
+        if failures and failures.pop(0):
+            raise WebDriverException('cannot start chrome')
+        driver = FakeDriver()
+        started.append(driver)
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    monkeypatch.setattr(BrowserFetcher, '_start_driver', start)
+    return started, failures
+
+
+def test_crashed_session_is_replaced(fake_chrome):
+    started, _ = fake_chrome
+    fetcher = BrowserFetcher(sessions=1)
+    started[0].crashed = True
+    with pytest.raises(WebDriverException):
+        fetcher.get('http://localhost/search-jobs')
+    assert started[0].quit_called and len(started) == 2
+    assert fetcher.get('http://localhost/search-jobs').content == b'ok'
+    assert started[1].pages == 1 and fetcher.sessions == 1
+
+
+def test_failed_restart_shrinks_the_pool(fake_chrome):
+    started, failures = fake_chrome
+    fetcher = BrowserFetcher(sessions=2)
+    for driver in started:
+        driver.crashed = True
+    failures.extend([True, True])
+    for _ in range(2):
+        with pytest.raises(WebDriverException):
+            fetcher.get('http://localhost/search-jobs')
+    # The dead sessions never went back into the pool, and an empty pool fails fast
+    assert fetcher.sessions == 0 and fetcher._drivers == []
+    with pytest.raises(WebDriverException, match='no browser sessions left'):
+        fetcher.get('http://localhost/search-jobs')
+
+
+def test_failed_restart_keeps_the_other_sessions(fake_chrome):
+    started, failures = fake_chrome
+    fetcher = BrowserFetcher(sessions=2)
+    first, second = started
+    first.crashed = True
+    failures.append(True)
+    with pytest.raises(WebDriverException):
+        fetcher.get('http://localhost/search-jobs')
+    # Only the healthy session is left to serve
+    for _ in range(3):
+        assert fetcher.get('http://localhost/search-jobs').content == b'ok'
+    assert fetcher.sessions == 1 and len(fetcher._drivers) == 1
+    assert sum(driver.pages for driver in started) == 3
+
+
+@pytest.fixture(scope='module')
+def static_site(tmp_path_factory):
+    root = tmp_path_factory.mktemp('site')
+    (root / 'search-jobs.html').write_text(PAGE)
+    (root / 'search-jobs').mkdir()
+    (root / 'search-jobs' / 'results').write_text(json.dumps({'filters': facets_html('region-toggle', REGIONS),
+                                                              'results': ''}))
+    (root / 'static').mkdir()
+    (root / 'static' / 'site.css').write_text('body { color: #333; }')
+    (root / 'static' / 'brand.woff2').write_bytes(b'wOF2')
+    (root / 'static' / 'logo.png').write_bytes(b'\x89PNG\r\n\x1a\n')
+    requested = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(root), **kwargs)
+
+        def do_GET(self):
+            requested.append(self.path)
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}', requested
+    server.shutdown()
+    server.server_close()
+
+
+@needs_chrome
+def test_renders_facets_and_blocks_resources(static_site):
+    base_url, requested = static_site
+    fetcher = BrowserFetcher(sessions=1, timeout=20)
+    try:
+        page = fetcher.get(base_url + '/search-jobs.html')
+        expected = [[name, f'({count})', facet_id] for name, count, facet_id in COUNTRIES]
+        assert extract_facets(page.content, 'country-toggle') == expected
+
+        payloads = fetcher.results_payloads(base_url + '/search-jobs.html')
+        assert len(payloads) == 1
+        expected = [[name, f'({count})', facet_id] for name, count, facet_id in REGIONS]
+        assert extract_facets(clean_filters(payloads[0]['filters']), 'region-toggle') == expected
+    finally:
+        fetcher.close()
+
+    assert '/search-jobs.html' in requested
+    assert any(path.startswith('/search-jobs/results') for path in requested)
+    assert not [path for path in requested if path.startswith('/static/')]
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from candidate_index import AvailabilityIndex
+from employee_store import EmployeeTable
+from leader_matching import match_leaders
+from test_employee_store import Employee
+
+
+def test_missing_business_is_never_the_same_business():
+    # One shared NaN object, as a dict or set would see it
+    employees = [Employee(name, 'C10', 'm', np.nan, 'X') for name in 'abc']
+    index = AvailabilityIndex(employees, range(3))
+    assert index.business_size('X', np.nan) == 0
+    assert index.free_outside('X', np.nan) == 3
+    assert sorted(index.free_rows('X', np.nan)) == [0, 1, 2]
+    index.take(1)
+    assert index.free_outside('X', np.nan) == 2
+    assert sorted(index.free_rows('X', np.nan)) == [0, 2]
+
+
+@pytest.mark.parametrize('shared', [True, False])
+def test_leader_with_missing_business_gets_a_group(shared):
+    if shared:
+        employees = [Employee(name, grade, 'm', np.nan, 'X')
+                     for name, grade in [('L', 'C15'), ('a', 'C10'), ('b', 'C10'), ('c', 'C10')]]
+    else:
+        df = pd.DataFrame({'EmployeeID': ['L', 'a', 'b', 'c'], 'Grade': ['C15', 'C10', 'C10', 'C10'],
+                           'Manager': ['m'] * 4, 'Business': [np.nan] * 4, 'City': ['X'] * 4})
+        employees = EmployeeTable.from_frame(df).employees(Employee)
+    assert match_leaders(employees, 3, 4) == ([['L', 'a', 'b', 'c']], {})
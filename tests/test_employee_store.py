@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+import Task1
+from employee_store import EmployeeTable
+from leader_matching import match_leaders
+
+
+class Employee:
+    __slots__ = ['id', 'grade', 'manager', 'business', 'city']
+
+    def __init__(self, id, grade, manager, business, city):
+        self.id = id
+        self.grade = grade
+        self.manager = manager
+        self.business = business
+        self.city = city
+
+
+def frame(**columns):
+    return pd.DataFrame(columns)
+
+
+def test_columns_match_the_frame():
+    df = frame(EmployeeID=['e1', 'e2', 'e3', 'e4'], Grade=['C10', 'C15', 'C10', np.nan],
+               Manager=['e2', np.nan, 'e2', 'x'], Business=['B1', 'B1', np.nan, 'B2'],
+               City=['London', 'Paris', 'London', np.nan])
+    table = EmployeeTable.from_frame(df)
+    for field in table.fields:
+        expected = df[field].tolist()
+        got = table.column(field).tolist()
+        assert [None if isinstance(v, float) and math.isnan(v) else v for v in got] == \
+            [None if isinstance(v, float) and math.isnan(v) else v for v in expected]
+
+
+def test_every_missing_cell_is_its_own_nan():
+    table = EmployeeTable.from_frame(frame(EmployeeID=['a', 'b', 'c'], Grade=['C10'] * 3,
+                                           Manager=[np.nan] * 3, Business=['B'] * 3, City=[np.nan] * 3))
+    cities = table.column('City').tolist()
+    assert all(math.isnan(city) for city in cities)
+    # As with iterrows on an object column: dict keys, sets and `in` never match one NaN to another
+    assert len({id(city) for city in cities}) == 3
+    assert len(set(cities)) == 3
+
+
+def test_leader_with_missing_city_has_no_one_in_its_city():
+    df = frame(EmployeeID=['L', 'a', 'b', 'c'], Grade=['C15', 'C10', 'C10', 'C10'],
+               Manager=['m1', 'm2', 'm3', 'm4'], Business=['B1', 'B2', 'B3', 'B4'], City=[np.nan] * 4)
+    groups, reasons = match_leaders(EmployeeTable.from_frame(df).employees(Employee), 3, 4)
+    assert groups == []
+    assert reasons == {'L': 'No other employees in the same city (nan)'}
+
+
+def test_missing_direct_managers_do_not_clash():
+    df = frame(**{'Employee': ['a', 'b', 'c'], 'Direct Manager': [np.nan] * 3,
+                  'Middle Manager': ['x', 'y', 'z'], 'Top Manager': ['t', 'u', 'v'], 'City': ['London'] * 3})
+    table = EmployeeTable.from_frame(df, fields=Task1.EMPLOYEE_FIELDS)
+    employees = {emp.name: emp for emp in table.employees(Task1.Employee)}
+    groups = Task1.create_groups(employees)
+    assert [sorted(emp.name for emp in group) for group in groups] == [['a', 'b', 'c']]
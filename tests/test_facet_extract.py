@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from facet_extract import TOGGLE_IDS, extract_facets, read_payload
+from scrape import parse_facets_bs4
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'facets')
+PAYLOADS = sorted(os.listdir(FIXTURES))
+
+# Markup the tokenizer has to get through the same way html.parser does
+MALFORMED = {
+    'empty': '',
+    'no-button': '<ul class="search-filter-list"><li><input data-id="1"><span class="filter__facet-name">A</span>'
+                 '<span class="filter__facet-count">(1)</span></li></ul>',
+    'no-list': '<button id="city-toggle">City</button><ul class="other"><li>x</li></ul>',
+    'unclosed': '<button id="city-toggle"></button><ul class="search-filter-list"><li><input data-id="1">'
+                '<span class="filter__facet-name">A<li><input data-id="2"><span class="filter__facet-count">(2)',
+    'stray-end-tags': '<button id="city-toggle"></button><ul class="search-filter-list"></span></div><li>'
+                      '<input data-id="1"></label><span class="filter__facet-name">A</span></p>'
+                      '<span class="filter__facet-count">(1)</span></li></ul>',
+    'nested-spans': '<button id="city-toggle"></button><ul class="search-filter-list"><li><input data-id="1">'
+                    '<span class="filter__facet-name">A <span>inner</span> B</span>'
+                    '<span class="filter__facet-count"><span>(</span>3)</span></li></ul>',
+    'entities': '<button id="city-toggle"></button><ul class="search-filter-list"><li><input data-id="a&amp;b">'
+                '<span class="filter__facet-name">R&amp;D &#8211; S&#227;o</span>'
+                '<span class="filter__facet-count">(1)</span></li></ul>',
+    'truncated-tag': '<button id="city-toggle"></button><ul class="search-filter-list"><li><input data-id="1"'
+}
+
+
+@pytest.mark.parametrize('toggle_id', TOGGLE_IDS)
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_recorded_payloads_match_bs4(payload, toggle_id):
+    html_content = read_payload(os.path.join(FIXTURES, payload))
+    assert extract_facets(html_content, toggle_id) == parse_facets_bs4(html_content, toggle_id)
+
+
+@pytest.mark.parametrize('name', sorted(MALFORMED))
+def test_malformed_markup_matches_bs4(name):
+    assert extract_facets(MALFORMED[name], 'city-toggle') == parse_facets_bs4(MALFORMED[name], 'city-toggle')
+
+
+def test_payloads_have_facets():
+    # Parity on empty results would prove nothing
+    found = {toggle_id: 0 for toggle_id in TOGGLE_IDS}
+    for payload in PAYLOADS:
+        html_content = read_payload(os.path.join(FIXTURES, payload))
+        for toggle_id in TOGGLE_IDS:
+            found[toggle_id] += len(extract_facets(html_content, toggle_id))
+    assert all(found.values()), found
+    page = read_payload(os.path.join(FIXTURES, 'search-jobs.html'))
+    assert extract_facets(page, 'industry-toggle')[1] == ['Operations & Processing', '(875)', 'Operations & Processing']
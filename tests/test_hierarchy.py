@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from hierarchy import HierarchyIndex
+
+
+def walk_manages(manager_of, manager, emp_id):
+    # The chain walk the index replaced, with a visited set so loops end
+    seen = {emp_id}
+    current = manager_of.get(emp_id)
+    while current in manager_of and current not in seen:
+        if current == manager:
+            return True
+        seen.add(current)
+        current = manager_of[current]
+    return False
+
+
+def random_org(n, seed, loops=0):
+    rng = random.Random(seed)
+    ids = [f'e{i}' for i in range(n)]
+    # Managers earlier in the list, a few from outside the org, and nobody for the top
+    manager_of = {emp_id: (ids[rng.randrange(i)] if rng.random() < 0.85 else f'x{i}') if i else None
+                  for i, emp_id in enumerate(ids)}
+    while loops:
+        # Point someone at a person in their own reporting line, which closes a loop
+        a = rng.choice(ids)
+        below = [b for b in ids if walk_manages(manager_of, a, b)]
+        if below:
+            manager_of[a] = rng.choice(below)
+            loops -= 1
+    return manager_of
+
+
+def build(manager_of):
+    return HierarchyIndex(list(manager_of), list(manager_of.values()))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_chain_walks(seed):
+    manager_of = random_org(40, seed)
+    index = build(manager_of)
+    assert index.cycles == []
+    for a in manager_of:
+        for b in manager_of:
+            assert index.manages(a, b) == (a != b and walk_manages(manager_of, a, b)), (a, b)
+            assert index.related(a, b) == (index.manages(a, b) or index.manages(b, a))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_chain_walks_with_loops(seed):
+    manager_of = random_org(40, seed, loops=3)
+    with pytest.warns(UserWarning, match='reporting loop'):
+        index = build(manager_of)
+    assert index.cycles
+    on_loop = {emp_id for cycle in index.cycles for emp_id in cycle}
+    for cycle in index.cycles:
+        # Each loop is listed in reporting order
+        for emp_id, manager in zip(cycle, cycle[1:] + cycle[:1]):
+            assert manager_of[emp_id] == manager
+    for a in manager_of:
+        for b in manager_of:
+            assert index.manages(a, b) == (a != b and walk_manages(manager_of, a, b)), (a, b)
+    assert all(index.related(a, b) for cycle in index.cycles for a in cycle for b in cycle if a != b)
+    assert on_loop
+
+
+def test_two_person_loop():
+    with pytest.warns(UserWarning, match='1 reporting loop'):
+        index = HierarchyIndex(['a', 'b', 'c', 'd'], ['b', 'a', 'a', None])
+    assert [sorted(cycle) for cycle in index.cycles] == [['a', 'b']]
+    assert index.manages('a', 'b') and index.manages('b', 'a')
+    # c reports into the loop, so both of its members are above c
+    assert index.manages('a', 'c') and index.manages('b', 'c')
+    assert not index.manages('c', 'a')
+    assert not index.related('d', 'a')
+    assert not index.related('a', 'a')
+    assert not index.related('a', 'unknown')
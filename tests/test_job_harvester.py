@@ -0,0 +1,47 @@
+import pytest
+
+from async_crawl import crawl
+from facet_query import CITY, COUNTRY, INDUSTRY, REGION, FacetQuery
+from http_client import HttpClient, set_client
+from job_harvester import JobHarvester, facet_count, path_query
+from jsonl_sink import JsonlSink, iter_records
+from mock_site import MockSite, SyntheticSite
+
+
+@pytest.fixture(scope='module')
+def records(tmp_path_factory):
+    site = MockSite(synthetic=SyntheticSite(2, 2, 2, 2))
+    site.start()
+    set_client(HttpClient(pool_size=4, retries=0, base_url=site.url))
+    path = str(tmp_path_factory.mktemp('crawl') / 'crawl.jsonl')
+    sink = JsonlSink(path)
+    try:
+        crawl(concurrency=4, rate_per_host=1000, sink=sink)
+    finally:
+        sink.close()
+    yield list(iter_records(path))
+    site.stop()
+
+
+@pytest.mark.parametrize('depth', [1, 2, 3, 4])
+def test_every_path_depth_harvests_its_own_listing(records, depth):
+    record = next(record for record in records if len(record['path']) == depth)
+    query, count = path_query(records, record['path'])
+    assert count == record['count']
+    assert [facet.facet_type for facet in query.filters] == [INDUSTRY, COUNTRY, REGION, CITY][:depth]
+    assert query.filters[-1].id == record['id']
+    # Every filter on the path survives into the page requests and their cache keys
+    page = FacetQuery.from_url(query.page_query(3, 25).url())
+    assert page.filters == query.filters
+    assert page.cache_key() == query.page_query(3, 25).cache_key() != query.cache_key()
+
+    harvester = JobHarvester(workers=2, max_per_page=2)
+    jobs = list(harvester.harvest(query, count))
+    assert len(jobs) == facet_count(count)
+    assert len({job['id'] for job in jobs}) == len(jobs)
+    assert {job['id'].rsplit('-', 1)[0] for job in jobs} == {record['id'].replace(' ', '-')}
+
+
+def test_unknown_path(records):
+    with pytest.raises(KeyError):
+        path_query(records, ['No such industry'])
@@ -0,0 +1,119 @@
+import itertools
+import random
+from collections import defaultdict
+
+import pytest
+
+from hierarchy import HierarchyIndex
+from leader_matching import LEADER_GRADES, match_leaders
+from test_employee_store import Employee
+
+
+def random_org(n, seed, leader_share=0.3, cities=2):
+    rng = random.Random(seed)
+    employees = []
+    for i in range(n):
+        employees.append(Employee(
+            f'e{i}', 'C15' if rng.random() < leader_share else rng.choice(['C10', 'C12']),
+            f'e{rng.randrange(i)}' if i and rng.random() < 0.7 else None,
+            rng.choice(['B1', 'B2', 'B3']), f'City {rng.randrange(cities)}'))
+    return employees
+
+
+def compatible(hierarchy, leader, candidate):
+    return (leader.city == candidate.city and leader.business != candidate.business and
+            not hierarchy.related(leader.id, candidate.id))
+
+
+def greedy(employees, min_group, max_group):
+    # First come, first served: the loop match_leaders replaced
+    hierarchy = HierarchyIndex.from_employees(employees)
+    index = defaultdict(lambda: defaultdict(list))
+    for emp in employees:
+        if emp.grade not in LEADER_GRADES:
+            index[emp.city][emp.business].append(emp)
+    groups, used = [], set()
+    for leader in (emp for emp in employees if emp.grade in LEADER_GRADES):
+        found = [emp for business, emps in index[leader.city].items() if business != leader.business
+                 for emp in emps if emp.id not in used and not hierarchy.related(leader.id, emp.id)]
+        if len(found) >= min_group - 1:
+            group = [leader] + found[:max_group - 1]
+            groups.append([emp.id for emp in group])
+            used.update(emp.id for emp in group)
+    return groups
+
+
+def can_fill(leaders, candidates, hierarchy, need):
+    # Bipartite matching with `need` slots per leader (Kuhn's augmenting paths)
+    slots = [leader for leader in leaders for _ in range(need)]
+    owner = {}
+
+    def place(slot, seen):
+        for candidate in candidates:
+            if candidate.id in seen or not compatible(hierarchy, slots[slot], candidate):
+                continue
+            seen.add(candidate.id)
+            if candidate.id not in owner or place(owner[candidate.id], seen):
+                owner[candidate.id] = slot
+                return True
+        return False
+
+    return all(place(slot, set()) for slot in range(len(slots)))
+
+
+def most_groups(employees, min_group):
+    hierarchy = HierarchyIndex.from_employees(employees)
+    leaders = [emp for emp in employees if emp.grade in LEADER_GRADES]
+    candidates = [emp for emp in employees if emp.grade not in LEADER_GRADES]
+    for size in range(len(leaders), 0, -1):
+        if any(can_fill(chosen, candidates, hierarchy, min_group - 1)
+               for chosen in itertools.combinations(leaders, size)):
+            return size
+    return 0
+
+
+def check(employees, groups, reasons, min_group, max_group):
+    hierarchy = HierarchyIndex.from_employees(employees)
+    by_id = {emp.id: emp for emp in employees}
+    members = [emp_id for group in groups for emp_id in group]
+    assert len(members) == len(set(members))
+    leaders = [emp.id for emp in employees if emp.grade in LEADER_GRADES]
+    assert [group[0] for group in groups] == [emp_id for emp_id in leaders if emp_id not in reasons]
+    for leader, *rest in groups:
+        assert min_group <= len(rest) + 1 <= max_group
+        for emp_id in rest:
+            assert by_id[emp_id].grade not in LEADER_GRADES
+            assert compatible(hierarchy, by_id[leader], by_id[emp_id])
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_groups_as_many_leaders_as_possible(seed):
+    employees = random_org(14, seed)
+    groups, reasons = match_leaders(employees, 3, 4)
+    check(employees, groups, reasons, 3, 4)
+    assert len(groups) == most_groups(employees, 3)
+
+
+@pytest.mark.parametrize('leader_share', [0.08, 0.3])
+@pytest.mark.parametrize('seed', range(10))
+def test_never_fewer_groups_than_greedy(seed, leader_share):
+    employees = random_org(200, seed, leader_share=leader_share, cities=3)
+    groups, reasons = match_leaders(employees, 3, 4)
+    check(employees, groups, reasons, 3, 4)
+    before = greedy(employees, 3, 4)
+    assert len(groups) >= len(before)
+    if len(before) == sum(emp.grade in LEADER_GRADES for emp in employees):
+        # While candidates are plentiful nothing changes
+        assert groups == before
+
+
+def test_takes_a_member_from_an_earlier_group():
+    # Greedy gives L1 a and b; L2 can only use b and c, and d (L2's report) is left for L1
+    employees = [Employee('L1', 'C15', None, 'B1', 'X'), Employee('L2', 'C16', None, 'B2', 'X'),
+                 Employee('a', 'C10', None, 'B2', 'X'), Employee('b', 'C10', None, 'B3', 'X'),
+                 Employee('c', 'C10', None, 'B3', 'X'), Employee('d', 'C10', 'L2', 'B4', 'X')]
+    assert greedy(employees, 3, 3) == [['L1', 'a', 'b']]
+    groups, reasons = match_leaders(employees, 3, 3)
+    check(employees, groups, reasons, 3, 3)
+    assert groups == [['L1', 'a', 'd'], ['L2', 'c', 'b']]
+    assert reasons == {}
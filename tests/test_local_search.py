@@ -0,0 +1,100 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from local_search import LocalSearch, improve
+
+
+class Person:
+    __slots__ = ['name', 'city', 'team']
+
+    def __init__(self, name, city, team):
+        self.name = name
+        self.city = city
+        self.team = team
+
+
+def people(n=60, seed=0):
+    rng = random.Random(seed)
+    # A few without a city; they cannot be placed and stay on their own
+    return [Person(f'p{i}', rng.choice(['London', 'Paris', 'Tokyo', np.nan]) if i % 10 == 0 else
+                   rng.choice(['London', 'Paris', 'Tokyo']), rng.randrange(6)) for i in range(n)]
+
+
+def key(person):
+    return person.city
+
+
+def compatible(a, b):
+    return a.team != b.team
+
+
+def score(groups, min_size):
+    return sum(len(group) for group in groups if len(group) >= min_size)
+
+
+def check(items, groups, min_size, max_size):
+    assert Counter(id(item) for group in groups for item in group) == Counter(id(item) for item in items)
+    for group in groups:
+        assert len(group) <= max_size
+        if len(group) > 1:
+            assert len({key(item) for item in group}) == 1
+        assert all(compatible(a, b) for a in group for b in group if a is not b)
+
+
+@pytest.mark.parametrize('temperature', [0.0, 1.0])
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_search_from_an_empty_seed(seed, temperature):
+    items = people(seed=seed)
+    search = LocalSearch(items, [], key, compatible, min_size=3, max_size=5, seed=seed)
+    assert search.initial_score == 0
+    groups = search.run(seconds=60, max_moves=5000, temperature=temperature)
+    check(items, groups, 3, 5)
+    assert score(groups, 3) >= search.initial_score
+    assert score(groups, 3) > 0
+
+
+def test_score_never_drops_without_temperature():
+    items = people(seed=3)
+    # Start from a valid but poor grouping: pairs of compatible people
+    by_city = {}
+    for item in items:
+        if item.city == item.city:
+            by_city.setdefault(item.city, []).append(item)
+    seed_groups = []
+    for city in by_city.values():
+        for a, b in zip(city[::2], city[1::2]):
+            if compatible(a, b):
+                seed_groups.append([a, b])
+    search = LocalSearch(items, seed_groups, key, compatible, min_size=3, max_size=4, seed=3)
+    initial = search.initial_score
+    for _ in range(3000):
+        search.step()
+        assert search.score >= initial
+        assert search.score == score(search.groups(), 3)
+    check(items, search.groups(), 3, 4)
+
+
+def test_annealing_returns_the_best_grouping_seen():
+    items = people(seed=4)
+    seed_groups = LocalSearch(items, [], key, compatible, min_size=3, max_size=5, seed=4).run(max_moves=2000)
+    search = LocalSearch(items, seed_groups, key, compatible, min_size=3, max_size=5, seed=5)
+    # Hot enough that the search does go downhill on the way
+    lowest = search.score
+    for _ in range(500):
+        search.step(temperature=5.0)
+        lowest = min(lowest, search.score)
+    assert lowest < search.initial_score
+
+    search = LocalSearch(items, seed_groups, key, compatible, min_size=3, max_size=5, seed=5)
+    groups = search.run(seconds=60, max_moves=3000, temperature=5.0)
+    check(items, groups, 3, 5)
+    assert score(groups, 3) >= search.initial_score
+
+
+def test_improve_without_seed_groups():
+    items = people(seed=6)
+    groups = improve(items, [], key, compatible, min_size=3, max_size=4, seconds=60, seed=6, max_moves=3000)
+    check(items, groups, 3, 4)
@@ -0,0 +1,33 @@
+import pytest
+
+from http_client import HttpClient
+from mock_site import MockSite, SyntheticSite
+from response_cache import ResponseCache
+from scrape import search_url
+
+
+def test_replays_a_recorded_cache(tmp_path):
+    fixtures = str(tmp_path / 'recorded.sqlite')
+    live = MockSite(synthetic=SyntheticSite(industries=3))
+    client = HttpClient(base_url=live.start(), cache=ResponseCache(fixtures))
+    try:
+        recorded = client.get(search_url).content
+    finally:
+        client.close()
+        live.stop()
+
+    # A different synthetic tree, so only replay can produce the recorded page
+    replay = MockSite(fixtures=fixtures, synthetic=SyntheticSite(industries=1))
+    client = HttpClient(base_url=replay.start())
+    try:
+        assert client.get(search_url).content == recorded
+        assert replay.counts()['replayed'] == 1
+    finally:
+        client.close()
+        replay.stop()
+
+
+def test_missing_fixtures_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        MockSite(fixtures=str(tmp_path / 'missing.sqlite'))
+    assert not (tmp_path / 'missing.sqlite').exists()
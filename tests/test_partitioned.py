@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+
+import gp2
+import grp1
+import Task1
+from employee_store import EmployeeTable
+from leader_matching import match_leaders
+from partitioned import partitioned_leaders
+from test_employee_store import Employee
+
+CITIES = {'London': 'GMT', 'Paris': 'CET', 'New York': 'ET', 'Chicago': 'CT', 'Tokyo': 'JST'}
+
+
+def org(n=150, seed=0):
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        city = rng.choice(list(CITIES))
+        records.append({
+            'EmployeeID': f'e{i}',
+            'Grade': rng.choice(['C11', 'C12', 'C13', 'C14', 'C15', 'C16']),
+            # Managers come earlier in the list, so there are no reporting loops
+            'Manager': f'e{rng.randrange(i)}' if i and rng.random() < 0.9 else np.nan,
+            'Business': rng.choice(['B1', 'B2', 'B3', np.nan]),
+            'City': city,
+            'Timezone': CITIES[city],
+        })
+    return records
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_grp1_matches_serial(seed):
+    records = org(seed=seed)
+    serial = grp1.group_by_team_hierarchy_and_city(records, workers=1)
+    assert serial
+    assert grp1.group_by_team_hierarchy_and_city(records, workers=3) == serial
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_gp2_matches_serial(seed):
+    records = org(seed=seed)
+    serial = gp2.group_employees_with_c15_c16_managers(records, workers=1)
+    assert serial
+    assert gp2.group_employees_with_c15_c16_managers(records, workers=3) == serial
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_leaders_match_serial(seed):
+    # A leader alone in its city, so there are reasons to compare as well
+    records = org(seed=seed) + [{'EmployeeID': 'solo', 'Grade': 'C15', 'Manager': 'e0', 'Business': 'B1',
+                                 'City': 'Sydney'}]
+    employees = EmployeeTable.from_records(records).employees(Employee)
+    serial = match_leaders(employees, 3, 4)
+    assert serial[0] and serial[1]
+    assert partitioned_leaders(employees, 3, 4, workers=1) == serial
+    assert partitioned_leaders(employees, 3, 4, workers=3) == serial
+
+
+def task1_employees(seed):
+    rng = random.Random(seed)
+    cities = list(CITIES) + ['Sydney', np.nan]
+    employees = {}
+    for i in range(80):
+        managers = [rng.choice(['m1', 'm2', 'm3', 'm4', np.nan]), rng.choice(['mm1', 'mm2']), 't']
+        employees[f'e{i}'] = Task1.Employee(f'e{i}', *managers, rng.choice(cities))
+    return employees
+
+
+def names(groups):
+    return [[emp.name for emp in group] for group in groups]
+
+
+@pytest.mark.parametrize('seed', [0, 7])
+def test_task1_depends_on_the_seed_not_the_workers(seed):
+    employees = task1_employees(seed)
+    assert any(isinstance(emp.city, float) for emp in employees.values())
+    two = names(Task1.create_groups(employees, workers=2, seed=seed))
+    assert two
+    assert names(Task1.create_groups(employees, workers=3, seed=seed)) == two
+    assert names(Task1.create_groups(employees, workers=2, seed=seed)) == two
+    grouped = [name for group in two for name in group]
+    assert len(grouped) == len(set(grouped))
@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from http_client import HttpClient
+from mock_site import MockSite, SyntheticSite
+from rate_control import AdaptiveLimiter
+from scrape import search_url
+
+
+@pytest.fixture
+def site():
+    site = MockSite(synthetic=SyntheticSite(2, 2, 1, 1), latency=0.005, seed=7)
+    site.start()
+    yield site
+    site.stop()
+
+
+def fetch_all(client, requests):
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        statuses = list(executor.map(lambda _: client.get(search_url).status_code, range(requests)))
+    assert statuses == [200] * requests
+
+
+@pytest.mark.parametrize('rate', ['throttle_rate', 'error_rate'])
+def test_backs_off_on_throttling_and_recovers(site, rate):
+    # A loose latency tolerance keeps the test about status codes, not scheduler noise
+    limiter = AdaptiveLimiter(initial=8, max_limit=16, window=10, latency_tolerance=50.0)
+    client = HttpClient(pool_size=16, retries=10, backoff=0.005, max_backoff=0.02, base_url=site.url,
+                        limiter=limiter)
+    try:
+        setattr(site, rate, 0.4)
+        fetch_all(client, 60)
+        throttled = limiter.state()
+        assert site.counts()['injected_errors'] > 0
+        assert throttled['decreases'] > 0
+        assert throttled['limit'] < 8
+
+        setattr(site, rate, 0.0)
+        fetch_all(client, 200)
+        recovered = limiter.state()
+        assert recovered['last_change'] == 'healthy'
+        assert recovered['limit'] > throttled['limit']
+        assert recovered['limit'] == 16
+    finally:
+        client.close()
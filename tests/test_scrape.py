@@ -0,0 +1,51 @@
+import sys
+
+import pytest
+import requests
+
+import scrape
+from facet_query import COUNTRY, INDUSTRY, REGION, FacetQuery
+from http_client import HttpClient, set_client
+from mock_site import MockSite, SyntheticSite
+from scrape import city_url
+
+
+def test_city_url_keeps_plus_in_industry_name():
+    country = ['United Kingdom', '(120)', '2635167']
+    region = ['England', '(100)', '6269131']
+    query = FacetQuery.from_url(city_url(country, region, 'Mergers + Acquisitions'))
+    by_type = {f.facet_type: f for f in query.filters}
+    assert by_type[INDUSTRY].id == 'Mergers + Acquisitions'
+    assert by_type[INDUSTRY].display == 'Mergers + Acquisitions'
+    assert by_type[COUNTRY].id == '2635167'
+    assert by_type[REGION].display == 'England, United Kingdom'
+
+
+@pytest.fixture
+def closed(monkeypatch):
+    calls = []
+    close = HttpClient.close
+    monkeypatch.setattr(HttpClient, 'close', lambda self: (calls.append(self), close(self)))
+    yield calls
+    set_client(HttpClient())
+
+
+def test_main_closes_the_client(monkeypatch, tmp_path, closed, capsys):
+    site = MockSite(synthetic=SyntheticSite(1, 1, 1, 1))
+    try:
+        monkeypatch.setattr(sys, 'argv', ['scrape.py', '--async', '--base-url', site.start(),
+                                          '--cache', str(tmp_path / 'cache.sqlite')])
+        scrape.main()
+    finally:
+        site.stop()
+    assert len(closed) == 1
+
+
+def test_main_closes_the_client_when_the_crawl_fails(monkeypatch, closed, capsys):
+    site = MockSite()
+    base_url = site.start()
+    site.stop()
+    monkeypatch.setattr(sys, 'argv', ['scrape.py', '--base-url', base_url, '--retries', '0'])
+    with pytest.raises(requests.ConnectionError):
+        scrape.main()
+    assert len(closed) == 1
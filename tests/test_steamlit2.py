@@ -0,0 +1,87 @@
+import base64
+import io
+import re
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+import steamlit2
+import streamlit
+
+
+def org(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = [f'e{i}' for i in range(n)]
+    return pd.DataFrame({
+        'EmployeeID': ids,
+        'Grade': rng.choice(['C10', 'C11', 'C12', 'C15', 'C16'], n, p=[.3, .3, .2, .1, .1]),
+        'Manager': [ids[rng.integers(i)] if i else np.nan for i in range(n)],
+        'Business': rng.choice(['B1', 'B2', 'B3'], n),
+        'City': rng.choice(['London', 'Paris', 'Tokyo'], n),
+    })
+
+
+def test_complex_grouping_matches_streamlit():
+    for seed in range(5):
+        df = org(seed=seed)
+        assert steamlit2.group_employees_complex(df) == streamlit.group_employees_complex(df, 3, 4)
+
+
+def test_complex_grouping():
+    df = pd.DataFrame({'EmployeeID': ['L', 'a', 'b', 'c', 'M'], 'Grade': ['C15', 'C10', 'C10', 'C10', 'C16'],
+                       'Manager': ['x', 'L', 'y', 'y', 'x'], 'Business': ['B1', 'B2', 'B2', 'B3', 'B1'],
+                       'City': ['X', 'X', 'X', 'X', 'Y']})
+    groups, reasons = steamlit2.group_employees_complex(df)
+    # a reports to L, so L gets the other two
+    assert groups == [['L', 'b', 'c']]
+    assert reasons == {'M': 'No other employees in the same city (Y)'}
+
+
+def chunked_by(df, keys, min_group, max_group):
+    # The loops these groupings replaced
+    groups = []
+    for first in df[keys[0]].unique():
+        first_df = df[df[keys[0]] == first]
+        for second in first_df[keys[1]].unique():
+            ids = first_df[first_df[keys[1]] == second]['EmployeeID'].tolist()
+            while len(ids) >= min_group:
+                groups.append(ids[:max_group])
+                ids = ids[max_group:]
+    return groups
+
+
+def monthly_by(df, keys, num_months):
+    groups = []
+    for first in df[keys[0]].unique():
+        first_df = df[df[keys[0]] == first]
+        for second in first_df[keys[1]].unique():
+            ids = first_df[first_df[keys[1]] == second]['EmployeeID'].tolist()
+            for i in range(max(1, len(ids) // num_months)):
+                group = ids[i * num_months:(i + 1) * num_months]
+                if group:
+                    groups.append(group)
+    return groups
+
+
+def test_groupings_match_the_loops():
+    for seed in range(5):
+        df = org(seed=seed)
+        # Missing businesses and cities are left out, as `==` left them out
+        df.loc[df.index % 7 == 0, 'Business'] = np.nan
+        df.loc[df.index % 11 == 0, 'City'] = np.nan
+        for min_group, max_group in [(2, 3), (3, 4), (4, 4)]:
+            assert steamlit2.group_by_business_and_grade(df, min_group, max_group) == \
+                chunked_by(df, ['Business', 'Grade'], min_group, max_group)
+        for num_months in (1, 2, 3, 12):
+            assert steamlit2.group_by_city_and_grade(df, num_months) == monthly_by(df, ['City', 'Grade'], num_months)
+
+
+def test_color_coded_export_writes_every_cell():
+    df = pd.DataFrame({'Group Leader': ['a', 'd'], 'Group Members': ['a, b, c', 'd, e, f'], 'Size': [3, 3]})
+    link = steamlit2.create_download_link(df, 'groups.xlsx', color_coded=True)
+    data = base64.b64decode(re.search(r'base64,([^"]+)"', link).group(1))
+    sheet = openpyxl.load_workbook(io.BytesIO(data)).active
+    rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+    assert rows == [list(df.columns)] + [list(row) for _, row in df.iterrows()]
+    assert sheet.cell(row=2, column=1).fill.fill_type == 'solid'
@@ -0,0 +1,29 @@
+import random
+
+import numpy as np
+
+import Task1
+
+
+def employee(name, direct_manager, city='London'):
+    return Task1.Employee(name, direct_manager, 'mm', 'tm', city)
+
+
+def test_missing_direct_managers_do_not_clash_in_either_stage():
+    # One shared NaN object: set membership alone would call it a clash
+    employees = {name: employee(name, np.nan) for name in 'abc'}
+    groups = Task1.create_groups(employees)
+    assert [sorted(emp.name for emp in group) for group in groups] == [['a', 'b', 'c']]
+    assert Task1.compatible(employees['a'], employees['b'])
+
+
+def test_greedy_and_improved_groups_follow_the_same_rule():
+    rng = random.Random(5)
+    managers = ['m1', 'm2', 'm3', np.nan]
+    employees = {f'e{i}': employee(f'e{i}', rng.choice(managers), rng.choice(['London', 'Paris']))
+                 for i in range(40)}
+    for improve_seconds in (0.0, 0.2):
+        groups = Task1.create_groups(employees, improve_seconds=improve_seconds)
+        assert groups
+        for group in groups:
+            assert all(Task1.compatible(a, b) for a in group for b in group if a is not b)
@@ -0,0 +1,51 @@
+import pytest
+
+from http_client import HttpClient, set_client
+from jsonl_sink import JsonlSink, iter_records
+from mock_site import MockSite, SyntheticSite
+from trio_crawl import crawl
+
+
+def tree_paths(tree):
+    paths = set()
+    for industry, countries in tree.items():
+        paths.add((industry,))
+        for country, regions in countries.items():
+            paths.add((industry, country))
+            for region, cities in regions.items():
+                paths.add((industry, country, region))
+                paths.update((industry, country, region, city) for city in cities)
+    return paths
+
+
+@pytest.fixture
+def site():
+    site = MockSite(synthetic=SyntheticSite(2, 3, 2, 2), latency=0.1)
+    site.start()
+    set_client(HttpClient(pool_size=32, retries=0, base_url=site.url))
+    yield site
+    site.stop()
+
+
+def crawl_to_sink(tmp_path, country_timeout):
+    path = str(tmp_path / 'crawl.jsonl')
+    sink = JsonlSink(path)
+    try:
+        tree = crawl(concurrency=32, country_timeout=country_timeout, sink=sink)
+    finally:
+        sink.close()
+    return tree, {tuple(record['path']) for record in iter_records(path)}
+
+
+def test_sink_matches_the_tree(site, tmp_path):
+    tree, written = crawl_to_sink(tmp_path, country_timeout=30)
+    assert written == tree_paths(tree)
+    assert len([path for path in written if len(path) == 4]) == 2 * 3 * 2 * 2
+
+
+def test_timed_out_countries_leave_nothing_in_the_sink(site, tmp_path):
+    # The region listing arrives in time (0.1s), the city listings would not (0.2s), so
+    # every country is cancelled after its regions were found
+    tree, written = crawl_to_sink(tmp_path, country_timeout=0.15)
+    assert all(countries == {} for countries in tree.values())
+    assert written == tree_paths(tree) == {(industry,) for industry in tree}
@@ -0,0 +1,114 @@
+import math
+import time
+from typing import Dict, List, Optional
+
+import trio
+
+from scrape import search_url, country_url, region_url, city_url, fetch_filters, parse_facets
+from scrape import fetch as fetch_page
+
+
+class TrioCrawler:
+    """Structured-concurrency variant of the facet crawl, built on trio nurseries.
+
+    Each level of industry -> country -> region -> city runs in its own nursery. The
+    blocking HttpClient calls go through trio.to_thread with a global CapacityLimiter
+    (`concurrency`) and a per-country one (`per_country`), so one large country cannot
+    take every slot. Each country subtree also gets `country_timeout` seconds: when it
+    runs out, only that country's scope is cancelled and it is left out of the result
+    and listed in `timed_out`, while the rest of the crawl carries on. A country's
+    records reach the sink only once its subtree is complete, so the sink never holds
+    a country the result leaves out.
+    """
+
+    def __init__(self, concurrency: int = 16, per_country: Optional[int] = None,
+                 country_timeout: float = math.inf, sink=None):
+        self.limiter = trio.CapacityLimiter(concurrency)
+        self.per_country = per_country or concurrency
+        self.country_timeout = country_timeout
+        self.sink = sink
+        self.requests_made = 0
+        self.timed_out: List[List[str]] = []
+
+    def emit(self, path: List[str], facet, records: Optional[list] = None) -> None:
+        if records is not None:
+            records.append((path, facet))
+        elif self.sink is not None:
+            self.sink.write_facet(path, facet[1], facet[2])
+
+    async def fetch_facets(self, url: str, toggle_id: str, subtree: Optional[trio.CapacityLimiter] = None):
+        if url == search_url:
+            fetch = lambda url: fetch_page(url).content
+        else:
+            fetch = fetch_filters
+        self.requests_made += 1
+        if subtree is None:
+            html_content = await trio.to_thread.run_sync(fetch, url, limiter=self.limiter, abandon_on_cancel=True)
+        else:
+            async with subtree:
+                html_content = await trio.to_thread.run_sync(fetch, url, limiter=self.limiter,
+                                                             abandon_on_cancel=True)
+        return parse_facets(html_content, toggle_id)
+
+    async def crawl_cities(self, country, region, industry_name: str, path: List[str],
+                           subtree: trio.CapacityLimiter, regions: Dict[str, List[str]], records: list) -> None:
+        facets = await self.fetch_facets(city_url(country, region, industry_name), 'city-toggle', subtree)
+        for city in facets:
+            self.emit(path + [city[0]], city, records)
+        regions[region[0]] = [city[0] for city in facets]
+
+    async def crawl_regions(self, country, industry_name: str, path: List[str],
+                            records: list) -> Dict[str, List[str]]:
+        subtree = trio.CapacityLimiter(self.per_country)
+        region_list = await self.fetch_facets(region_url(country), 'region-toggle', subtree)
+        regions = {region[0]: [] for region in region_list}
+        async with trio.open_nursery() as nursery:
+            for region in region_list:
+                self.emit(path + [region[0]], region, records)
+                nursery.start_soon(self.crawl_cities, country, region, industry_name, path + [region[0]],
+                                   subtree, regions, records)
+        return regions
+
+    async def crawl_country(self, country, industry_name: str, path: List[str], countries: dict) -> None:
+        # Held back until the subtree is complete; a cancelled country writes nothing
+        records = [(path, country)]
+        with trio.move_on_after(self.country_timeout) as scope:
+            countries[country[0]] = await self.crawl_regions(country, industry_name, path, records)
+        if scope.cancelled_caught:
+            self.timed_out.append(path)
+            return
+        for record_path, facet in records:
+            self.emit(record_path, facet)
+
+    async def crawl_countries(self, industry, industries: dict) -> None:
+        industry_name = industry[0]
+        country_list = await self.fetch_facets(country_url(industry), 'country-toggle')
+        countries = {}
+        async with trio.open_nursery() as nursery:
+            for country in country_list:
+                nursery.start_soon(self.crawl_country, country, industry_name, [industry[0], country[0]],
+                                   countries)
+        # Keep listing order; countries cancelled by their deadline are left out
+        industries[industry[0]] = {country[0]: countries[country[0]]
+                                   for country in country_list if country[0] in countries}
+
+    async def crawl(self) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+        industry_list = await self.fetch_facets(search_url, 'industry-toggle')
+        industries = {}
+        async with trio.open_nursery() as nursery:
+            for industry in industry_list:
+                self.emit([industry[0]], industry)
+                nursery.start_soon(self.crawl_countries, industry, industries)
+        return {industry[0]: industries[industry[0]] for industry in industry_list}
+
+
+def crawl(concurrency: int = 16, per_country: Optional[int] = None, country_timeout: float = math.inf, sink=None):
+    # Same nested {industry: {country: {region: [city, ...]}}} dict that scrape.main() builds
+    crawler = TrioCrawler(concurrency=concurrency, per_country=per_country, country_timeout=country_timeout,
+                          sink=sink)
+    start = time.perf_counter()
+    result = trio.run(crawler.crawl)
+    print(f"{crawler.requests_made} requests in {time.perf_counter() - start:.2f}s")
+    for path in crawler.timed_out:
+        print(f"timed out: {' > '.join(path)}")
+    return result